@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the Store Manager application.
+
+Each module in this package is a standalone script that can be run with
+``python -m benchmarks.<module>`` from the repository root.
+"""
@@ -0,0 +1,62 @@
+"""
+Benchmark for the non-interactive batch mode.
+
+Replays a generated script of order and total commands through
+utils.batch.run_batch, with the JSON results written to memory, and reports
+the commands processed per second and how many of them failed.
+
+Usage:
+    python -m benchmarks.bench_batch [--commands N] [--products N]
+"""
+
+import argparse
+import io
+import json
+import random
+import time
+
+from benchmarks.common import make_products
+from store import Store
+from utils.batch import run_batch
+
+
+def make_script(product_count: int, command_count: int) -> list[str]:
+    """
+    Build a batch script of random single-item orders with an occasional total.
+
+    :param product_count: Number of products in the catalog
+    :param command_count: Number of commands in the script
+    :return: Script lines
+    """
+    lines = []
+    for idx in range(command_count):
+        if idx % 10 == 9:
+            lines.append("2\n")
+        else:
+            name = f"Product {random.randrange(product_count)}"
+            lines.append(json.dumps({"op": "order", "items": [[name, 1]]}) + "\n")
+    return lines
+
+
+def main():
+    """Run the batch mode benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commands", type=int, default=100_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    args = parser.parse_args()
+
+    script = make_script(args.products, args.commands)
+
+    store = Store(make_products(args.products, quantity=1_000_000))
+    output = io.StringIO()
+    start = time.perf_counter()
+    run_batch(store, script, output)
+    seconds = time.perf_counter() - start
+    failures = output.getvalue().count('"ok": false')
+
+    print(f"{'commands':>10} {'seconds':>9} {'commands/s':>12} {'failed':>8}")
+    print(f"{args.commands:>10} {seconds:>9.3f} {args.commands / seconds:>12,.0f} {failures:>8}")
+
+
+if __name__ == "__main__":
+    main()
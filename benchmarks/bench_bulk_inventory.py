@@ -0,0 +1,60 @@
+"""
+Benchmark for bulk inventory aggregates and stock updates.
+
+Compares the vectorized ColumnarStore operations (inventory value, low-stock
+detection, bulk restock) with the equivalent loops over Product objects
+calling get_quantity / set_quantity one by one.
+
+Usage:
+    python -m benchmarks.bench_bulk_inventory [--products N]
+"""
+
+import argparse
+
+import columnar_store
+from benchmarks.common import make_products, time_call
+from columnar_store import ColumnarStore
+
+
+def main():
+    """Run the bulk inventory benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    products = make_products(args.products)
+    store = ColumnarStore(products)
+    views = store.product_list
+    amounts = [5] * len(views)
+
+    def restock_loop():
+        for product in products:
+            product.set_quantity(product.get_quantity() + 5)
+
+    cases = [
+        (
+            "value",
+            lambda: sum(p.price_cents * p.get_quantity() for p in products),
+            store.inventory_value,
+        ),
+        (
+            "low stock",
+            lambda: [p for p in products if p.get_quantity() < 10],
+            lambda: store.low_stock(10),
+        ),
+        ("restock", restock_loop, lambda: store.bulk_restock(views, amounts)),
+    ]
+    backend = "numpy" if columnar_store.np is not None else "python"
+    print(f"bulk backend: {backend}")
+    print(f"{'operation':>10} {'per-object s':>13} {'bulk s':>10} {'speedup':>8}")
+    for label, loop, bulk in cases:
+        loop_seconds = time_call(loop, repeat=1)
+        bulk_seconds = time_call(bulk, repeat=1)
+        print(
+            f"{label:>10} {loop_seconds:>13.4f} {bulk_seconds:>10.4f} "
+            f"{loop_seconds / bulk_seconds:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Memory benchmark comparing Store with the array-backed ColumnarStore.
+
+Builds the same synthetic catalog once as Product objects in a Store and once
+as slots of a ColumnarStore, and measures the memory each holds with
+tracemalloc: after loading, after the first lookup by name (which builds the
+name index) and after the first search (which builds the search index). It
+reports the bytes per product at each stage and the reduction factor.
+
+Usage:
+    python -m benchmarks.bench_columnar_memory [--products N]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from columnar_store import ColumnarStore
+from products import Product
+from store import Store
+
+
+def measure(build) -> list[int]:
+    """
+    Measure the memory held by a store as it is loaded and its indexes are built.
+
+    :param build: Zero-argument callable building a store
+    :return: Bytes allocated with the store alive after each of STAGES
+    """
+    gc.collect()
+    tracemalloc.start()
+    store = build()
+    sizes = [tracemalloc.get_traced_memory()[0]]
+    store.get_product_by_name("Product 1")
+    sizes.append(tracemalloc.get_traced_memory()[0])
+    store.search_prefix("product 1")
+    store.search_tokens("product 1")
+    sizes.append(tracemalloc.get_traced_memory()[0])
+    tracemalloc.stop()
+    del store
+    return sizes
+
+
+STAGES = ("loaded", "+lookup", "+search")
+
+
+def main():
+    """Run the memory benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=1_000_000)
+    args = parser.parse_args()
+    count = args.products
+
+    def rows():
+        return ((f"Product {idx}", float(idx % 1000 + 1), 100) for idx in range(count))
+
+    object_bytes = measure(lambda: Store([Product(*row) for row in rows()]))
+    columnar_bytes = measure(lambda: ColumnarStore.from_rows(rows()))
+
+    print(f"{'bytes/product':>14}" + "".join(f"{stage:>10}" for stage in STAGES))
+    for backend, sizes in (("Store", object_bytes), ("Columnar", columnar_bytes)):
+        print(f"{backend:>14}" + "".join(f"{size / count:>10.1f}" for size in sizes))
+    print(f"{'reduction':>14}" + "".join(
+        f"{store / columnar:>9.1f}x" for store, columnar in zip(object_bytes, columnar_bytes)
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Stress benchmark for concurrent ordering against one shared Store.
+
+Runs N threads that place random orders against a shared catalog, checks
+afterwards that no stock went negative and that the stock removed matches
+the quantities of the successful orders, and reports orders per second for
+each thread count.
+
+Usage:
+    python -m benchmarks.bench_concurrent_orders [--products N] [--orders N]
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.common import make_products
+from store import Store
+
+THREAD_COUNTS = [1, 2, 4, 8, 16]
+
+
+def run(thread_count: int, product_count: int, orders_per_thread: int) -> tuple[float, int]:
+    """
+    Place random orders from several threads and verify the final stock.
+
+    :param thread_count: Number of worker threads
+    :param product_count: Number of products in the catalog
+    :param orders_per_thread: Number of orders each thread places
+    :return: Tuple of (orders per second, number of successful orders)
+    """
+    products = make_products(product_count, quantity=50)
+    store = Store(products)
+    initial_quantity = store.get_total_quantity()
+    sold_per_thread = [0] * thread_count
+    placed_per_thread = [0] * thread_count
+
+    def worker(slot: int) -> None:
+        rng = random.Random(slot)
+        for _ in range(orders_per_thread):
+            picks = rng.sample(products, 3)
+            shopping_list = [(product, rng.randint(1, 3)) for product in picks]
+            try:
+                store.order(shopping_list)
+            except ValueError:
+                continue
+            placed_per_thread[slot] += 1
+            sold_per_thread[slot] += sum(quantity for _, quantity in shopping_list)
+
+    threads = [threading.Thread(target=worker, args=(slot,)) for slot in range(thread_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    assert all(product.quantity >= 0 for product in products), "stock went negative"
+    assert initial_quantity - store.get_total_quantity() == sum(sold_per_thread)
+    assert store.get_total_quantity() == sum(product.quantity for product in products)
+    return thread_count * orders_per_thread / elapsed, sum(placed_per_thread)
+
+
+def main():
+    """Run the concurrent ordering benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=1_000)
+    parser.add_argument("--orders", type=int, default=5_000, help="orders per thread")
+    args = parser.parse_args()
+
+    print(f"{'threads':>8} {'orders/s':>12} {'successful':>12}")
+    for thread_count in THREAD_COUNTS:
+        rate, placed = run(thread_count, args.products, args.orders)
+        print(f"{thread_count:>8} {rate:>12.0f} {placed:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark for the overhead of the metrics instrumentation.
+
+Times the instrumented hot paths (Store.order, Product.buy,
+Store.get_all_products and Store.get_total_quantity) before metrics were
+ever enabled, while enabled, and after disabling them again. The disabled
+timings should match the baseline, since disable() restores the original
+functions.
+
+Usage:
+    python -m benchmarks.bench_metrics [--calls N]
+"""
+
+import argparse
+import time
+
+import metrics
+from benchmarks.common import make_products
+from store import Store
+
+
+def measure(store: Store, calls: int) -> dict[str, float]:
+    """
+    Time each hot path.
+
+    :param store: Store with enough stock for the calls
+    :param calls: Number of calls per operation
+    :return: Nanoseconds per call by operation name
+    """
+    products = store.get_all_products()
+    operations = {
+        "Store.order": lambda idx: store.order([(products[idx % len(products)], 1)]),
+        "Product.buy": lambda idx: products[idx % len(products)].buy(1),
+        "get_all_products": lambda idx: store.get_all_products(),
+        "get_total_quantity": lambda idx: store.get_total_quantity(),
+    }
+    timings = {}
+    for name, operation in operations.items():
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            for idx in range(calls):
+                operation(idx)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best / calls * 1e9
+    return timings
+
+
+def main():
+    """Run the instrumentation overhead benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    store = Store(make_products(1_000, quantity=10**9))
+    baseline = measure(store, args.calls)
+    metrics.enable()
+    enabled = measure(store, args.calls)
+    metrics.disable()
+    disabled = measure(store, args.calls)
+
+    print(
+        f"{'operation':<20} {'baseline ns':>12} {'enabled ns':>11} "
+        f"{'disabled ns':>12} {'off %':>7}"
+    )
+    for name, base in baseline.items():
+        overhead = (disabled[name] - base) / base * 100
+        print(
+            f"{name:<20} {base:>12.0f} {enabled[name]:>11.0f} {disabled[name]:>12.0f} "
+            f"{overhead:>+7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark for integer-cent order totals.
+
+Sums the line totals of a large batch of order lines twice: with float
+prices, as totals were computed before prices were kept in cents, and with
+integer cents, as Store.order does now. Reports the time of each and how far
+the float total drifted from the exact one. Finally times Store.order_many
+on carts built from the same lines.
+
+Usage:
+    python -m benchmarks.bench_money [--lines N]
+"""
+
+import argparse
+import operator
+import random
+
+from benchmarks.common import make_products, time_call
+from products import format_cents
+from store import Store
+
+
+def main():
+    """Run the money arithmetic benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    products = make_products(10_000, quantity=10**9)
+    for product in products:
+        product.price = rng.randrange(1, 100_000) / 100
+    lines = [(rng.choice(products), rng.randint(1, 5)) for _ in range(args.lines)]
+    quantities = [quantity for _, quantity in lines]
+    float_prices = [product.price for product, _ in lines]
+    cent_prices = [product.price_cents for product, _ in lines]
+
+    float_seconds = time_call(lambda: sum(map(operator.mul, float_prices, quantities)))
+    cent_seconds = time_call(lambda: sum(map(operator.mul, cent_prices, quantities)))
+    float_total = sum(map(operator.mul, float_prices, quantities))
+    exact_total = sum(map(operator.mul, cent_prices, quantities))
+
+    print(f"{'summation':<14} {'ms':>9} {'total':>20}")
+    print(f"{'float prices':<14} {float_seconds * 1000:>9.1f} {float_total:>20.6f}")
+    print(f"{'integer cents':<14} {cent_seconds * 1000:>9.1f} {format_cents(exact_total):>20}")
+    print(f"float drift: {float_total - exact_total / 100:+.9f}")
+
+    store = Store(products)
+    carts = [lines[idx:idx + 5] for idx in range(0, len(lines), 5)]
+    seconds = time_call(lambda: store.order_many(carts), repeat=1)
+    print(f"order_many: {len(carts):,} carts of 5 lines in {seconds * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark for the interactive ordering flow.
+
+Drives utils.order.process_order with scripted input for several catalog
+and cart sizes, with the terminal output discarded. The time per order
+should grow with the number of items picked and stay flat as the catalog
+grows.
+
+Usage:
+    python -m benchmarks.bench_order_flow [--max-products N]
+"""
+
+import argparse
+import builtins
+import contextlib
+import io
+import random
+import time
+
+from benchmarks.common import make_products
+from store import Store
+from utils.order import process_order
+
+
+def scripted_order(store: Store, cart_size: int) -> float:
+    """
+    Run one order with random picks answered from a script.
+
+    :param store: Store to order from
+    :param cart_size: Number of items picked before finishing
+    :return: Seconds taken by process_order
+    """
+    count = store.count_active_products()
+    answers = []
+    for _ in range(cart_size):
+        answers += [str(random.randint(1, count)), "1"]
+    answers.append("0")
+    answers = iter(answers)
+
+    original_input = builtins.input
+    builtins.input = lambda prompt="": next(answers)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            process_order(store)
+            return time.perf_counter() - start
+    finally:
+        builtins.input = original_input
+
+
+def main():
+    """Run the order flow benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-products", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    cart_sizes = (1, 20, 100)
+    print(f"{'products':>10}" + "".join(f" {f'{size} items ms':>14}" for size in cart_sizes))
+    count = 1_000
+    while count <= args.max_products:
+        store = Store([])
+        store.add_products(make_products(count, quantity=1_000))
+        store.get_all_products()
+        timings = [min(scripted_order(store, size) for _ in range(3)) for size in cart_sizes]
+        print(f"{count:>10}" + "".join(f" {seconds * 1000:>14.2f}" for seconds in timings))
+        count *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark for batch ordering with Store.order_many.
+
+Places the same set of random carts once through a loop over Store.order and
+once through a single Store.order_many call, and reports carts per second for
+both.
+
+Usage:
+    python -m benchmarks.bench_order_many [--carts N] [--products N]
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.common import make_products
+from store import Store
+
+
+def make_carts(products: list, cart_count: int, seed: int = 0) -> list[list[tuple]]:
+    """
+    Build random carts of one to five lines each.
+
+    :param products: Products to pick from
+    :param cart_count: Number of carts
+    :param seed: Seed for the random generator
+    :return: List of shopping lists
+    """
+    rng = random.Random(seed)
+    return [
+        [(product, rng.randint(1, 3)) for product in rng.sample(products, rng.randint(1, 5))]
+        for _ in range(cart_count)
+    ]
+
+
+def main():
+    """Run the batch ordering benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--carts", type=int, default=200_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    args = parser.parse_args()
+
+    products = make_products(args.products, quantity=10**9)
+    carts = make_carts(products, args.carts)
+
+    store = Store(products)
+    start = time.perf_counter()
+    for cart in carts:
+        store.order(cart)
+    loop_seconds = time.perf_counter() - start
+
+    store = Store(products)
+    start = time.perf_counter()
+    result = store.order_many(carts)
+    batch_seconds = time.perf_counter() - start
+    assert result.succeeded == args.carts
+
+    print(f"{'mode':>12} {'seconds':>10} {'carts/s':>12}")
+    print(f"{'order loop':>12} {loop_seconds:>10.3f} {args.carts / loop_seconds:>12.0f}")
+    print(f"{'order_many':>12} {batch_seconds:>10.3f} {args.carts / batch_seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
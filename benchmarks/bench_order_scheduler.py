@@ -0,0 +1,102 @@
+"""
+Benchmark for the micro-batching order scheduler.
+
+Runs client threads that each place small orders one after another, first
+directly with Store.order and then through an OrderScheduler for a range of
+batch windows. For every setting it reports throughput and p50/p99 latency,
+which traces the latency/throughput curve of the batching window.
+
+Usage:
+    python -m benchmarks.bench_order_scheduler [--clients N] [--orders N] [--wal]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+
+from benchmarks.common import make_products
+from order_scheduler import OrderScheduler
+from store import Store
+from wal import WriteAheadLog
+
+
+def run_clients(
+    place: Callable, products: list, clients: int, orders: int
+) -> tuple[float, list[float]]:
+    """
+    Place orders from several threads and time each one.
+
+    :param place: Callable taking a shopping list
+    :param products: Products to order from
+    :param clients: Number of client threads
+    :param orders: Orders per client
+    :return: Tuple of (elapsed seconds, sorted latencies)
+    """
+    latencies = []
+
+    def client():
+        local = []
+        for _ in range(orders):
+            cart = [(random.choice(products), 1)]
+            start = time.perf_counter()
+            place(cart)
+            local.append(time.perf_counter() - start)
+        latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def make_store(count: int, wal_dir: str | None) -> Store:
+    """
+    Build a store with plenty of stock, optionally logging to a fresh WAL.
+
+    :param count: Number of products
+    :param wal_dir: Directory for the log file, or None for no log
+    :return: The store
+    """
+    store = Store(make_products(count, quantity=10_000_000))
+    if wal_dir is not None:
+        path = os.path.join(wal_dir, f"{time.perf_counter_ns()}.wal")
+        store.attach_wal(WriteAheadLog(path))
+    return store
+
+
+def main():
+    """Run the order scheduler benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--products", type=int, default=1_000)
+    parser.add_argument("--wal", action="store_true", help="log orders to a write-ahead log")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as wal_dir:
+        wal_dir = wal_dir if args.wal else None
+        print(f"{'setting':>24} {'orders/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+
+        def report(label, store, place):
+            elapsed, latencies = run_clients(place, store.product_list, args.clients, args.orders)
+            p50 = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[int(len(latencies) * 0.99)] * 1000
+            print(f"{label:>24} {len(latencies) / elapsed:>10.0f} {p50:>8.2f} {p99:>8.2f}")
+
+        store = make_store(args.products, wal_dir)
+        report("Store.order", store, store.order)
+        for max_batch, max_wait in ((8, 0.0), (32, 0.0005), (64, 0.001), (256, 0.005)):
+            store = make_store(args.products, wal_dir)
+            with OrderScheduler(store, max_batch=max_batch, max_wait=max_wait) as scheduler:
+                report(f"batch {max_batch}, wait {max_wait * 1000:g} ms", store, scheduler.order)
+
+
+if __name__ == "__main__":
+    main()
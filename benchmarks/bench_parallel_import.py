@@ -0,0 +1,44 @@
+"""
+Benchmark for parallel feed validation.
+
+Imports the same synthetic CSV feed into a ColumnarStore with 1, 2, 4 and 8
+worker processes and reports rows per second and the speedup over the
+single-process import. Parsing and validation scale with the number of
+cores; the final insertion into the store stays in the parent process.
+
+Usage:
+    python -m benchmarks.bench_parallel_import [--rows N] [--chunk-size N]
+"""
+
+import argparse
+import os
+
+from benchmarks.bench_import import synthetic_feed
+from columnar_store import ColumnarStore
+from importer import import_feed
+
+
+def main():
+    """Run the parallel import benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.rows} rows")
+    print(f"{'workers':>8} {'seconds':>8} {'rows/s':>10} {'speedup':>8}")
+    baseline = None
+    for workers in (1, 2, 4, 8):
+        stats = import_feed(
+            ColumnarStore(), synthetic_feed(args.rows), "csv",
+            chunk_size=args.chunk_size, workers=workers,
+        )
+        baseline = baseline or stats.seconds
+        print(
+            f"{workers:>8} {stats.seconds:>8.2f} {stats.rows_per_second:>10.0f} "
+            f"{baseline / stats.seconds:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark for order pricing with many promotion rules.
+
+Builds a catalog with a mix of tiered, n-th item, bundle and time-windowed
+rules and prices random carts three ways: at list prices, with the compiled
+tables of a PricingEngine, and by re-evaluating every rule for each order
+(what pricing would cost without precompiled tables). The uncompiled time
+grows with the total number of rules; the compiled time only grows with the
+rules that touch a cart's products, which here rises to about one rule per
+product at 10k rules.
+
+Usage:
+    python -m benchmarks.bench_pricing [--rules N] [--orders N]
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.common import make_products
+from pricing import BundleDiscount, NthItemDiscount, PricingEngine, TieredDiscount
+from products import Product
+
+
+def make_rules(products: list[Product], count: int, rng: random.Random) -> list:
+    """
+    Build a mix of promotion rules over random products.
+
+    :param products: Products to promote
+    :param count: Number of rules
+    :param rng: Random generator
+    :return: List of rules
+    """
+    now = time.time()
+    rules = []
+    for idx in range(count):
+        kind = idx % 4
+        if kind == 0:
+            rules.append(TieredDiscount(rng.choice(products), [(5, 5), (20, 10), (100, 15)]))
+        elif kind == 1:
+            rules.append(NthItemDiscount(rng.choice(products), rng.randint(2, 4), 50))
+        elif kind == 2:
+            bundle = rng.sample(products, rng.randint(2, 3))
+            rules.append(BundleDiscount(bundle, rng.randint(1, 20)))
+        else:
+            rules.append(TieredDiscount(
+                rng.choice(products), [(1, 10)], starts_at=now - 60, ends_at=now + 3600
+            ))
+    return rules
+
+
+def time_orders(price, carts: list[dict[Product, int]]) -> float:
+    """
+    Price every cart and return the mean time per cart.
+
+    :param price: Callable pricing one cart
+    :param carts: Carts as product -> quantity mappings
+    :return: Microseconds per cart
+    """
+    start = time.perf_counter()
+    for cart in carts:
+        price(cart)
+    return (time.perf_counter() - start) / len(carts) * 1e6
+
+
+def main():
+    """Run the pricing benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rules", type=int, default=10_000)
+    parser.add_argument("--orders", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    products = make_products(10_000)
+    carts = [
+        {product: rng.randint(1, 30) for product in rng.sample(products, 10)}
+        for _ in range(args.orders)
+    ]
+
+    def list_price(cart):
+        return sum(product.price_cents * quantity for product, quantity in cart.items())
+
+    print(
+        f"{'rules':>8} {'compile ms':>11} {'list us':>9} {'compiled us':>12} {'uncompiled us':>14}"
+    )
+    rule_count = 100
+    while rule_count <= args.rules:
+        engine = PricingEngine(make_rules(products, rule_count, rng))
+        start = time.perf_counter()
+        engine.compile()
+        compile_ms = (time.perf_counter() - start) * 1000
+        compiled_us = time_orders(engine.total, carts)
+        list_us = time_orders(list_price, carts)
+
+        def evaluate_all_rules(cart, rules=list(engine._rules)):
+            uncompiled = PricingEngine(rules)
+            return uncompiled.total(cart)
+
+        naive_us = time_orders(evaluate_all_rules, carts[:200])
+        print(
+            f"{rule_count:>8} {compile_ms:>11.2f} {list_us:>9.2f} "
+            f"{compiled_us:>12.2f} {naive_us:>14.1f}"
+        )
+        rule_count *= 10
+
+
+if __name__ == "__main__":
+    main()
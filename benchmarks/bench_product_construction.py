@@ -0,0 +1,84 @@
+"""
+Benchmark for bulk Product construction.
+
+Builds the same rows once with the Product constructor and once with
+Product.from_trusted_rows, and reports the construction time and the memory
+held per product (measured with tracemalloc in a separate pass). The first
+row builds DictProduct, a copy of Product that keeps a per-instance __dict__
+as Product did before it declared __slots__, as the baseline.
+
+Usage:
+    python -m benchmarks.bench_product_construction [--rows N]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from products import Product, to_cents
+
+
+class DictProduct:
+    """Product fields and validation without __slots__, the baseline for the slotted Product."""
+
+    def __init__(self, name: str, price: float, quantity: int):
+        """Constructor method"""
+        Product.validate_name(name)
+        Product.validate_price(price)
+        Product.validate_quantity(quantity)
+        self._stores = ()
+        self._lock_object = None
+        self.name = name
+        self._price_cents = to_cents(price)
+        self._quantity = quantity
+        self._active = True
+
+
+def measure(build) -> tuple[float, int]:
+    """
+    Time a builder, then measure the memory its result holds.
+
+    :param build: Zero-argument callable returning a list of products
+    :return: Tuple of (seconds, bytes held by the result)
+    """
+    gc.collect()
+    start = time.perf_counter()
+    products = build()
+    seconds = time.perf_counter() - start
+    del products
+
+    gc.collect()
+    tracemalloc.start()
+    products = build()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del products
+    return seconds, held
+
+
+def main():
+    """Run the construction benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rows = [(f"Product {idx}", float(idx % 1000 + 1), 100) for idx in range(args.rows)]
+    cases = [
+        ("dict (baseline)", lambda: [DictProduct(*row) for row in rows]),
+        ("constructor", lambda: [Product(*row) for row in rows]),
+        ("from_trusted_rows", lambda: Product.from_trusted_rows(rows)),
+        ("unvalidated", lambda: Product.from_trusted_rows(rows, validate=False)),
+    ]
+
+    print(f"{'method':>18} {'seconds':>9} {'ns/product':>11} {'bytes/product':>14}")
+    for label, build in cases:
+        seconds, held = measure(build)
+        print(
+            f"{label:>18} {seconds:>9.3f} {seconds / args.rows * 1e9:>11.0f} "
+            f"{held / args.rows:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
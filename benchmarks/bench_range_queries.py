@@ -0,0 +1,72 @@
+"""
+Benchmark for the price and quantity secondary indexes.
+
+Compares Store.price_range and Store.low_stock with full scans of
+product_list on a large catalog, and measures what keeping the indexes up to
+date adds to the cost of an order.
+
+Usage:
+    python -m benchmarks.bench_range_queries [--products N]
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.common import make_products, time_call
+from store import Store
+
+
+def order_rate(store: Store, orders: int = 20_000) -> float:
+    """
+    Place single-item orders on random well-stocked products.
+
+    :param store: Store to order from
+    :param orders: Number of orders
+    :return: Orders per second
+    """
+    products = [product for product in store.product_list if product.quantity > 100]
+    carts = [[(random.choice(products), 1)] for _ in range(orders)]
+    start = time.perf_counter()
+    for cart in carts:
+        store.order(cart)
+    return orders / (time.perf_counter() - start)
+
+
+def main():
+    """Run the range query benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    products = make_products(args.products)
+    for idx, product in enumerate(products):
+        product.quantity = idx % 1000
+    store = Store([])
+    store.add_products(products)
+    print(f"orders without indexes: {order_rate(store):>10.0f} /s")
+
+    for label, build in (("price index", lambda: store.price_range(0, 0)),
+                         ("quantity index", lambda: store.low_stock(0))):
+        start = time.perf_counter()
+        build()
+        print(f"{label} build: {time.perf_counter() - start:.2f} s")
+    print(f"orders with indexes:    {order_rate(store):>10.0f} /s")
+
+    queries = [
+        ("price 200-202", lambda: store.price_range(200, 202),
+         lambda: [p for p in store.product_list if p.active and 200 <= p.price <= 202]),
+        ("quantity < 3", lambda: store.low_stock(3),
+         lambda: [p for p in store.product_list if p.quantity < 3]),
+    ]
+    print(f"{'query':>16} {'results':>8} {'index ms':>10} {'scan ms':>10}")
+    for label, indexed, scan in queries:
+        assert set(indexed()) == set(scan())
+        print(
+            f"{label:>16} {len(indexed()):>8} {time_call(indexed, 10) * 1000:>10.3f} "
+            f"{time_call(scan, 1) * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
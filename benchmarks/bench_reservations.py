@@ -0,0 +1,57 @@
+"""
+Benchmark for stock reservations.
+
+Places a large number of holds with staggered TTLs and measures the cost of
+reserving, of an expiry check when nothing is due, of confirming holds, and
+of sweeping all remaining holds once their TTLs have passed.
+
+Usage:
+    python -m benchmarks.bench_reservations [--holds N] [--products N]
+"""
+
+import argparse
+import time
+
+from benchmarks.common import make_products
+from store import Store
+
+
+def main():
+    """Run the reservation benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--holds", type=int, default=1_000_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    args = parser.parse_args()
+
+    products = make_products(args.products, quantity=args.holds)
+    store = Store(products)
+
+    start = time.perf_counter()
+    ids = [
+        store.reserve(products[idx % args.products], 1, ttl=3600 + idx % 100)
+        for idx in range(args.holds)
+    ]
+    elapsed = time.perf_counter() - start
+    print(f"reserve:       {args.holds / elapsed:>12.0f} holds/s")
+
+    start = time.perf_counter()
+    for _ in range(100_000):
+        store.expire_reservations()
+    print(f"idle check:    {(time.perf_counter() - start) / 100_000 * 1e9:>12.0f} ns")
+
+    count = args.holds // 10
+    start = time.perf_counter()
+    for reservation_id in ids[:count]:
+        store.confirm(reservation_id)
+    elapsed = time.perf_counter() - start
+    print(f"confirm:       {count / elapsed:>12.0f} holds/s")
+
+    start = time.perf_counter()
+    expired = store.expire_reservations(now=time.monotonic() + 7200)
+    elapsed = time.perf_counter() - start
+    print(f"sweep:         {expired / elapsed:>12.0f} holds/s ({expired} expired)")
+    print(f"available:     {store.get_available_quantity()} of {store.get_total_quantity()}")
+
+
+if __name__ == "__main__":
+    main()
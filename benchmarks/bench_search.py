@@ -0,0 +1,77 @@
+"""
+Benchmark for the product search index.
+
+Builds a catalog of products with realistic multi-word names and compares
+Store.search_prefix and Store.search_tokens with linear scans over
+get_all_products. It also reports the one-off cost of building the index and
+of keeping it up to date on single inserts.
+
+Usage:
+    python -m benchmarks.bench_search [--products N]
+"""
+
+import argparse
+import time
+
+from benchmarks.common import time_call
+from products import Product
+from store import Store
+
+BRANDS = ["Google", "Apple", "Samsung", "Sony", "Bose", "Lenovo", "Dell", "Asus"]
+LINES = ["Pixel", "Galaxy", "Watch", "Buds", "Book", "Tab", "Phone", "Speaker"]
+
+
+def make_catalog(count: int) -> list[Product]:
+    """
+    Build products named like "Sony Galaxy 1234 Model 5".
+
+    :param count: Number of products
+    :return: List of products
+    """
+    return Product.from_trusted_rows(
+        (
+            f"{BRANDS[idx % 8]} {LINES[idx // 8 % 8]} {idx // 64} Model {idx % 10}",
+            float(idx % 1000 + 1),
+            10,
+        )
+        for idx in range(count)
+    )
+
+
+def main():
+    """Run the search benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    store = Store([])
+    store.add_products(make_catalog(args.products))
+
+    start = time.perf_counter()
+    store.search_prefix("")
+    print(f"index build: {time.perf_counter() - start:.2f} s for {args.products} products")
+
+    queries = [
+        ("prefix 'sony galaxy 12'", lambda: store.search_prefix("sony galaxy 12", limit=None),
+         lambda: [p for p in store.get_all_products()
+                  if p.name.casefold().startswith("sony galaxy 12")]),
+        ("tokens 'pixel 777'", lambda: store.search_tokens("pixel 777", limit=None),
+         lambda: [p for p in store.get_all_products()
+                  if {"pixel", "777"} <= set(p.name.casefold().split())]),
+    ]
+    print(f"{'query':>24} {'index ms':>10} {'scan ms':>10}")
+    for label, indexed, scan in queries:
+        assert set(indexed()) == set(scan())
+        indexed_ms, scan_ms = time_call(indexed, 20) * 1000, time_call(scan, 1) * 1000
+        print(f"{label:>24} {indexed_ms:>10.3f} {scan_ms:>10.1f}")
+
+    extra = make_catalog(1_000)
+    start = time.perf_counter()
+    for product in extra:
+        product.name = f"Extra {product.name}"
+        store.add_product(product)
+    print(f"add_product with index: {(time.perf_counter() - start) / len(extra) * 1e6:.1f} us each")
+
+
+if __name__ == "__main__":
+    main()
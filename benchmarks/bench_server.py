@@ -0,0 +1,115 @@
+"""
+Load generator for the asyncio order server.
+
+Opens several client connections, each keeping a fixed number of pipelined
+order requests in flight, and reports throughput and p50/p99 latency. By
+default it starts an in-process server on a synthetic catalog; with --port it
+targets a running server instead (python server.py).
+
+Usage:
+    python -m benchmarks.bench_server [--clients N] [--depth N] [--requests N]
+                                      [--host HOST] [--port PORT]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.common import make_products
+from server import OrderServer
+from store import Store
+
+
+async def run_client(
+    host: str, port: int, names: list[str], requests: int, depth: int
+) -> list[float]:
+    """
+    Send pipelined single-item orders on one connection.
+
+    :param host: Server host
+    :param port: Server port
+    :param names: Product names to order from
+    :param requests: Number of requests to send
+    :param depth: Maximum number of requests in flight
+    :return: Latency of every request in seconds
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    sent_at = {}
+    latencies = []
+    window = asyncio.Semaphore(depth)
+
+    async def receive():
+        for _ in range(requests):
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - sent_at.pop(response["id"]))
+            window.release()
+
+    receiver = asyncio.create_task(receive())
+    for request_id in range(requests):
+        await window.acquire()
+        request = {"id": request_id, "op": "order", "items": [[random.choice(names), 1]]}
+        sent_at[request_id] = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+    await receiver
+    writer.close()
+    return latencies
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """
+    Return the value at a fraction of a sorted list.
+
+    :param values: Sorted values
+    :param fraction: Fraction between 0 and 1
+    :return: The percentile value
+    """
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run(args: argparse.Namespace) -> None:
+    """
+    Drive the load and print the results.
+
+    :param args: Parsed command-line arguments
+    """
+    server = None
+    port = args.port
+    if port is None:
+        products = make_products(args.products, quantity=1_000_000)
+        server = OrderServer(Store(products))
+        port = await server.start(args.host)
+    names = [f"Product {idx}" for idx in range(args.products)]
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        run_client(args.host, port, names, args.requests, args.depth)
+        for _ in range(args.clients)
+    ))
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        await server.close()
+
+    latencies = sorted(latency for result in results for latency in result)
+    print(f"{args.clients} clients x {args.requests} requests, pipeline depth {args.depth}")
+    print(f"throughput: {len(latencies) / elapsed:.0f} requests/s")
+    print(f"latency p50: {percentile(latencies, 0.50) * 1000:.2f} ms")
+    print(f"latency p99: {percentile(latencies, 0.99) * 1000:.2f} ms")
+
+
+def main():
+    """Run the server load generator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=1_000)
+    parser.add_argument("--products", type=int, default=1_000)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark for order throughput of a ShardedStore by shard count.
+
+Places batches of single-product carts with ShardedStore.order_many on shards
+running in worker processes, for 1, 2, 4 and 8 shards, and compares them with
+a single in-process Store. Every shard works on its part of a batch at the
+same time, so throughput grows with the shard count up to the number of CPU
+cores. Three-line carts that span shards, committed in two phases with
+ShardedStore.order, are timed as well.
+
+Usage:
+    python -m benchmarks.bench_sharded_store [--carts N] [--products N] [--batch N]
+                                             [--shards 1,2,4,8] [--cross N]
+"""
+
+import argparse
+import os
+import random
+import time
+
+from benchmarks.common import make_products
+from sharded_store import ShardedStore
+from store import Store
+
+
+def main():
+    """Run the sharded store benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--carts", type=int, default=200_000)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=5_000)
+    parser.add_argument("--shards", default="1,2,4,8")
+    parser.add_argument("--cross", type=int, default=2_000, help="cross-shard orders to time")
+    args = parser.parse_args()
+
+    products = make_products(args.products, quantity=10**9)
+    rng = random.Random(0)
+    names = [product.name for product in products]
+    carts = [[(rng.choice(names), rng.randint(1, 3))] for _ in range(args.carts)]
+    batches = [carts[idx : idx + args.batch] for idx in range(0, len(carts), args.batch)]
+    cross = [
+        [(name, 1) for name in rng.sample(names, 3)] for _ in range(args.cross)
+    ]
+    print(f"{args.carts} carts over {args.products} products, {os.cpu_count()} CPU(s)")
+
+    store = Store(products)
+    by_product = {product.name: product for product in products}
+    start = time.perf_counter()
+    for batch in batches:
+        store.order_many([[(by_product[name], qty) for name, qty in cart] for cart in batch])
+    seconds = time.perf_counter() - start
+    print(f"Store, in process:    {args.carts / seconds:>12,.0f} carts/s")
+
+    for shards in [int(count) for count in args.shards.split(",")]:
+        with ShardedStore(products, shards=shards, processes=True) as sharded:
+            start = time.perf_counter()
+            for batch in batches:
+                result = sharded.order_many(batch)
+                assert result.succeeded == len(batch)
+            seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            for shopping_list in cross:
+                sharded.order(shopping_list)
+            cross_seconds = time.perf_counter() - start
+        print(
+            f"{shards} shard(s), processes: {args.carts / seconds:>12,.0f} carts/s, "
+            f"cross-shard orders {args.cross / cross_seconds:>9,.0f}/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
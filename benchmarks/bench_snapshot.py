@@ -0,0 +1,44 @@
+"""
+Benchmark for saving and loading binary inventory snapshots.
+
+Saves a synthetic catalog to a snapshot file and measures how long it takes to
+load it back as a ColumnarStore and as an object-based Store.
+
+Usage:
+    python -m benchmarks.bench_snapshot [--products N]
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks.common import time_call
+from columnar_store import ColumnarStore
+from store import Store
+
+
+def main():
+    """Run the snapshot benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=3_000_000)
+    args = parser.parse_args()
+
+    store = ColumnarStore.from_rows(
+        (f"Product {idx}", float(idx % 1000 + 1), 100) for idx in range(args.products)
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.snapshot")
+        save_seconds = time_call(lambda: store.save_snapshot(path), repeat=1)
+        size = os.path.getsize(path)
+        columnar_seconds = time_call(lambda: ColumnarStore.load_snapshot(path))
+        store_seconds = time_call(lambda: Store.load_snapshot(path), repeat=1)
+
+    print(f"products: {args.products}, file size: {size / 2**20:.1f} MiB")
+    print(f"{'operation':>22} {'seconds':>9}")
+    print(f"{'save':>22} {save_seconds:>9.3f}")
+    print(f"{'load ColumnarStore':>22} {columnar_seconds:>9.3f}")
+    print(f"{'load Store':>22} {store_seconds:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
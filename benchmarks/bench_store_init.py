@@ -0,0 +1,35 @@
+"""
+Benchmark for building a Store from a catalog.
+
+Measures Store construction time for catalogs from 1k to 1M products and
+prints the time per product, which stays flat when construction is linear.
+
+Usage:
+    python -m benchmarks.bench_store_init [--max-size N]
+"""
+
+import argparse
+
+from benchmarks.common import make_products, time_call
+from store import Store
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def main():
+    """Run the Store construction benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-size", type=int, default=SIZES[-1])
+    args = parser.parse_args()
+
+    print(f"{'products':>10} {'seconds':>10} {'us/product':>12}")
+    for size in SIZES:
+        if size > args.max_size:
+            break
+        products = make_products(size)
+        seconds = time_call(lambda: Store(products))
+        print(f"{size:>10} {seconds:>10.4f} {seconds / size * 1e6:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark for ordering with a write-ahead log attached.
+
+Places single-line orders from several threads against a store that logs to a
+temporary write-ahead log, and reports orders per second for each durability
+mode: fsync per order ("always"), group commit ("group") and no fsync
+("none"), plus a store without a log for reference.
+
+Usage:
+    python -m benchmarks.bench_wal [--orders N] [--threads N]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.common import make_products
+from store import Store
+from wal import SYNC_ALWAYS, SYNC_GROUP, SYNC_NONE, WriteAheadLog
+
+
+def run(sync: str | None, thread_count: int, orders_per_thread: int) -> float:
+    """
+    Place orders from several threads and measure the throughput.
+
+    :param sync: Durability mode, or None to run without a log
+    :param thread_count: Number of worker threads
+    :param orders_per_thread: Number of orders each thread places
+    :return: Orders per second
+    """
+    products = make_products(thread_count * 10, quantity=10**9)
+    store = Store(products)
+    with tempfile.TemporaryDirectory() as directory:
+        wal = None
+        if sync is not None:
+            wal = WriteAheadLog(os.path.join(directory, "bench.wal"), sync=sync)
+            store.attach_wal(wal)
+
+        def worker(slot: int) -> None:
+            own = products[slot * 10:(slot + 1) * 10]
+            for idx in range(orders_per_thread):
+                store.order([(own[idx % 10], 1)])
+
+        threads = [threading.Thread(target=worker, args=(slot,)) for slot in range(thread_count)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        if wal is not None:
+            wal.close()
+    return thread_count * orders_per_thread / elapsed
+
+
+def main():
+    """Run the write-ahead log benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=500, help="orders per thread")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    modes = [("no log", None), ("always", SYNC_ALWAYS), ("group", SYNC_GROUP), ("none", SYNC_NONE)]
+    print(f"{'mode':>8} " + " ".join(f"{f'{count} threads':>12}" for count in args.threads))
+    for label, sync in modes:
+        rates = [run(sync, count, args.orders) for count in args.threads]
+        print(f"{label:>8} " + " ".join(f"{rate:>12.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Shared helpers for the benchmark scripts.
+
+This module provides synthetic catalog and order generators and a small
+timing helper so that every benchmark builds its inputs the same way.
+
+Functions:
+- make_products: Builds a list of synthetic Product instances.
+- make_orders: Builds random shopping lists over a catalog.
+- time_call: Measures the best wall-clock time of a callable.
+"""
+
+import random
+import time
+from collections.abc import Callable
+
+from products import Product
+
+
+def make_products(count: int, quantity: int = 100) -> list[Product]:
+    """
+    Build a synthetic catalog of uniquely named products.
+
+    :param count: Number of products to create
+    :param quantity: Initial stock for every product
+    :return: List of Product instances
+    """
+    return [
+        Product(f"Product {idx}", price=float(idx % 1000 + 1), quantity=quantity)
+        for idx in range(count)
+    ]
+
+
+def make_orders(
+    products: list[Product], count: int, lines: int = 3, seed: int = 0
+) -> list[list[tuple[Product, int]]]:
+    """
+    Build random shopping lists of distinct products with small quantities.
+
+    :param products: Catalog to pick from
+    :param count: Number of shopping lists
+    :param lines: Products per shopping list, capped at the catalog size
+    :param seed: Seed for the random generator, for reproducible runs
+    :return: List of shopping lists of (product, quantity) tuples
+    """
+    rng = random.Random(seed)
+    lines = min(lines, len(products))
+    return [
+        [(product, rng.randint(1, 3)) for product in rng.sample(products, lines)]
+        for _ in range(count)
+    ]
+
+
+def time_call(func: Callable[[], object], repeat: int = 3) -> float:
+    """
+    Run a callable several times and return the fastest wall-clock time.
+
+    :param func: Zero-argument callable to measure
+    :param repeat: Number of runs
+    :return: Best time in seconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,248 @@
+"""
+Benchmark suite for the Store and Product hot paths.
+
+Runs every case for synthetic catalogs from 10 to 1M products and reports
+the best time per operation, as a table on stderr and as JSON:
+
+    store_init               Store(products)
+    add_remove_product       add_product followed by remove_product
+    get_all_products         cached active list
+    get_all_products_rebuild active list after a product status change
+    get_total_quantity       running stock total
+    order                    three-line orders
+    process_order            interactive order of five picks, scripted
+
+With --baseline the results are compared with an earlier JSON output, and
+the exit status is 1 if any case got slower by more than --threshold (and by
+more than --min-delta seconds, which keeps timer noise on the nanosecond
+cases from failing the run), so a dependency or Python upgrade can be gated
+on performance:
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --baseline baseline.json --threshold 0.2
+
+Usage:
+    python -m benchmarks.suite [--max-size N] [--cases A,B] [--output FILE]
+                               [--baseline FILE] [--threshold F] [--min-delta S]
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from collections.abc import Callable
+
+from benchmarks.bench_order_flow import scripted_order
+from benchmarks.common import make_orders, make_products, time_call
+from products import Product
+from store import Store
+
+SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+# Stock given to every product, large enough that no order in the suite fails
+STOCK = 10**9
+
+# Runs of each timing loop; the fastest run is reported
+REPEAT = 5
+
+
+def bench_store_init(size: int) -> float:
+    """Time building a store from a catalog."""
+    products = make_products(size, quantity=STOCK)
+    return time_call(lambda: Store(products))
+
+
+def bench_add_remove_product(size: int) -> float:
+    """Time adding a product to a catalog and removing it again."""
+    store = Store(make_products(size, quantity=STOCK))
+    extra = [Product(f"Extra {idx}", price=1, quantity=1) for idx in range(1_000)]
+
+    def add_and_remove():
+        for product in extra:
+            store.add_product(product)
+        for product in extra:
+            store.remove_product(product)
+
+    return time_call(add_and_remove, REPEAT) / (2 * len(extra))
+
+
+def bench_get_all_products(size: int) -> float:
+    """Time listing the active products once the list is cached."""
+    store = Store(make_products(size, quantity=STOCK))
+    store.get_all_products()
+    calls = 10_000
+
+    def list_products():
+        for _ in range(calls):
+            store.get_all_products()
+
+    return time_call(list_products, REPEAT) / calls
+
+
+def bench_get_all_products_rebuild(size: int) -> float:
+    """Time listing the active products right after a product's status changed."""
+    products = make_products(size, quantity=STOCK)
+    store = Store(products)
+    product = products[len(products) // 2]
+    calls = max(2, min(1_000, 100_000 // size))
+
+    def toggle_and_list():
+        for _ in range(calls // 2):
+            product.deactivate()
+            store.get_all_products()
+            product.activate()
+            store.get_all_products()
+
+    return time_call(toggle_and_list, REPEAT) / (calls // 2 * 2)
+
+
+def bench_get_total_quantity(size: int) -> float:
+    """Time reading the total stock."""
+    store = Store(make_products(size, quantity=STOCK))
+    calls = 100_000
+
+    def total():
+        for _ in range(calls):
+            store.get_total_quantity()
+
+    return time_call(total, REPEAT) / calls
+
+
+def bench_order(size: int) -> float:
+    """Time placing three-line orders."""
+    products = make_products(size, quantity=STOCK)
+    store = Store(products)
+    orders = make_orders(products, 2_000)
+
+    def place_orders():
+        for shopping_list in orders:
+            store.order(shopping_list)
+
+    return time_call(place_orders, REPEAT) / len(orders)
+
+
+def bench_process_order(size: int) -> float:
+    """Time the interactive order flow with five scripted picks."""
+    store = Store(make_products(size, quantity=STOCK))
+    store.get_all_products()
+    random.seed(0)
+    return min(scripted_order(store, 5) for _ in range(20))
+
+
+CASES: dict[str, Callable[[int], float]] = {
+    "store_init": bench_store_init,
+    "add_remove_product": bench_add_remove_product,
+    "get_all_products": bench_get_all_products,
+    "get_all_products_rebuild": bench_get_all_products_rebuild,
+    "get_total_quantity": bench_get_total_quantity,
+    "order": bench_order,
+    "process_order": bench_process_order,
+}
+
+
+def run_suite(cases: list[str], sizes: list[int]) -> dict:
+    """
+    Run benchmark cases for several catalog sizes.
+
+    :param cases: Names of the cases to run
+    :param sizes: Catalog sizes
+    :return: JSON-ready report with environment details and, per case, the
+             seconds per operation by catalog size
+    """
+    results = {}
+    for case in cases:
+        results[case] = {}
+        for size in sizes:
+            seconds = CASES[case](size)
+            results[case][str(size)] = seconds
+            print(f"{case:<26} {size:>9} {seconds * 1e6:>12.3f} us", file=sys.stderr)
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(
+    report: dict, baseline: dict, threshold: float, min_delta: float = 0.0
+) -> list[tuple[str, str, float, float]]:
+    """
+    Compare a report with a baseline and print the changes.
+
+    Cases or sizes missing from either report are skipped.
+
+    :param report: Report from run_suite
+    :param baseline: Earlier report from run_suite
+    :param threshold: Allowed slowdown as a fraction, e.g. 0.2 for 20%
+    :param min_delta: Slowdowns of at most this many seconds per operation are allowed
+    :return: (case, size, baseline seconds, current seconds) of every regression
+    """
+    regressions = []
+    print(f"{'case':<26} {'size':>9} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for case, by_size in report["results"].items():
+        baseline_by_size = baseline.get("results", {}).get(case, {})
+        for size, seconds in by_size.items():
+            if size not in baseline_by_size:
+                continue
+            old = baseline_by_size[size]
+            change = seconds / old - 1 if old else 0.0
+            flag = ""
+            if change > threshold and seconds - old > min_delta:
+                regressions.append((case, size, old, seconds))
+                flag = "  REGRESSION"
+            print(
+                f"{case:<26} {size:>9} {old * 1e6:>12.3f} {seconds * 1e6:>12.3f} "
+                f"{change:>+8.1%}{flag}"
+            )
+    return regressions
+
+
+def main():
+    """Run the benchmark suite and optionally compare it with a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-size", type=int, default=SIZES[-1])
+    parser.add_argument("--cases", default=",".join(CASES), help="comma-separated case names")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed slowdown, e.g. 0.2 for 20%%"
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=1e-7,
+        help="allowed slowdown in seconds per operation, whatever the percentage",
+    )
+    args = parser.parse_args()
+
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+    sizes = [size for size in SIZES if size <= args.max_size]
+
+    report = run_suite(cases, sizes)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+    elif not args.baseline:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(report, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1194 @@
+"""
+Columnar inventory storage for large catalogs.
+
+This module provides a Store backend that keeps names, prices, quantities and
+active flags in contiguous buffers and typed arrays indexed by SKU slot instead
+of one Product object per SKU. Products are exposed as lightweight ProductView
+objects that read and write the arrays, so the regular Product API (buy,
+set_quantity, is_active, show, ...) and the Store API (order, order_many,
+print_products, ...) keep working unchanged.
+
+Bulk aggregates and stock updates (inventory value, low-stock detection,
+restocks, markdowns) run as vectorized passes over the arrays, using NumPy
+when it is installed and plain Python over the arrays otherwise.
+
+Classes:
+- ProductView: A Product backed by one slot of a ColumnarStore.
+- ColumnarStore: A Store that keeps its catalog in typed arrays.
+"""
+
+import operator
+import threading
+from array import array
+from collections.abc import Iterable, Iterator
+from itertools import accumulate, compress, islice
+
+from products import CENTS_PER_UNIT, Product, ProductBase, to_cents
+from search_index import DEFAULT_SEARCH_LIMIT, SlotSearchIndex
+from snapshot import read_snapshot, write_snapshot
+from store import DEFAULT_PAGE_SIZE, Store
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Number of locks shared by the slots of a store; slot i uses lock i % LOCK_STRIPES
+LOCK_STRIPES = 1024
+
+# Largest value an int64 column can hold
+INT64_MAX = 2 ** 63 - 1
+
+
+class _NameColumn:
+    """
+    Product names of a ColumnarStore, packed into one buffer.
+
+    Behaves like a list of names indexed by slot, with None for removed
+    slots. Names are stored UTF-8 encoded back to back, with the start and
+    length of each slot in typed arrays, which takes a fraction of the
+    memory of one str object per name. Renaming a slot appends the new name
+    and leaves the old bytes unused.
+
+    Lookups by name use an open-addressing hash table of slot numbers, built
+    on the first find and kept up to date by append and extend. It holds
+    integers only; candidate slots are confirmed by comparing their names.
+    """
+
+    __slots__ = ("_data", "_starts", "_lengths", "_table", "_table_used")
+
+    def __init__(self):
+        """Constructor method"""
+        self._data = bytearray()
+        self._starts = array("q")
+        # Length in bytes of each name; -1 marks a removed slot
+        self._lengths = array("i")
+        # Hash table of slots, -1 for free entries, filled to at most half;
+        # None until the first find
+        self._table: array | None = None
+        self._table_used = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __getitem__(self, slot: int) -> str | None:
+        length = self._lengths[slot]
+        if length < 0:
+            return None
+        start = self._starts[slot]
+        return self._data[start:start + length].decode("utf-8", "surrogatepass")
+
+    def __setitem__(self, slot: int, name: str | None) -> None:
+        if name is None:
+            # The table entry stays behind and no longer matches any name
+            self._lengths[slot] = -1
+            return
+        encoded = name.encode("utf-8", "surrogatepass")
+        self._starts[slot] = len(self._data)
+        self._lengths[slot] = len(encoded)
+        self._data += encoded
+        # A renamed slot may now come before namesakes in lower slots; rebuild on demand
+        self._table = None
+
+    def __iter__(self) -> Iterator[str | None]:
+        data = self._data
+        if data.isascii():
+            # Byte offsets are character offsets: decode the buffer once and slice it
+            data = data.decode("ascii")
+            for start, length in zip(self._starts, self._lengths):
+                yield None if length < 0 else data[start:start + length]
+            return
+        for start, length in zip(self._starts, self._lengths):
+            if length < 0:
+                yield None
+            else:
+                yield data[start:start + length].decode("utf-8", "surrogatepass")
+
+    def is_live(self) -> list[bool]:
+        """
+        Tell for every slot whether it holds a name.
+
+        :return: One flag per slot, False for removed slots
+        """
+        return [length >= 0 for length in self._lengths]
+
+    def find(self, name: str) -> int:
+        """
+        Find the lowest live slot holding a name.
+
+        :param name: Exact name
+        :return: Slot index, or -1 if no live slot has the name
+        """
+        table = self._table
+        if table is None:
+            table = self._build_table()
+        mask = len(table) - 1
+        position = hash(name) & mask
+        while True:
+            slot = table[position]
+            if slot < 0:
+                return -1
+            if self[slot] == name:
+                return slot
+            position = (position + 1) & mask
+
+    def _build_table(self) -> array:
+        """
+        Build the hash table over every live slot.
+
+        :return: The new table, with at most a third of its entries used
+        """
+        size = 8
+        while size < 3 * len(self):
+            size *= 2
+        table = array("i", [-1]) * size
+        self._table = table
+        self._table_used = 0
+        for slot, name in enumerate(self):
+            if name is not None:
+                self._index(slot, name)
+        return table
+
+    def _index(self, slot: int, name: str) -> None:
+        """
+        Add a slot to the hash table, after any namesakes in lower slots.
+
+        :param slot: Slot index
+        :param name: Name of the slot
+        """
+        table = self._table
+        if (self._table_used + 1) * 2 > len(table):
+            self._build_table()
+            return
+        mask = len(table) - 1
+        position = hash(name) & mask
+        while table[position] >= 0:
+            position = (position + 1) & mask
+        table[position] = slot
+        self._table_used += 1
+
+    def append(self, name: str) -> None:
+        """
+        Add a name in a new slot.
+
+        :param name: Product name
+        """
+        encoded = name.encode("utf-8", "surrogatepass")
+        self._starts.append(len(self._data))
+        self._lengths.append(len(encoded))
+        self._data += encoded
+        if self._table is not None:
+            self._index(len(self._lengths) - 1, name)
+
+    def extend(self, names: Iterable[str]) -> None:
+        """
+        Add names in new slots, in order.
+
+        :param names: Product names
+        """
+        names = names if isinstance(names, list) else list(names)
+        joined = "".join(names)
+        if joined.isascii():
+            # One character per byte: lengths and offsets carry over from the str
+            lengths = array("i", map(len, names))
+            data = joined.encode("ascii")
+        else:
+            encoded = [name.encode("utf-8", "surrogatepass") for name in names]
+            lengths = array("i", map(len, encoded))
+            data = b"".join(encoded)
+        starts = array("q", accumulate(lengths, initial=len(self._data)))
+        starts.pop()
+        first_slot = len(self._lengths)
+        self._starts.extend(starts)
+        self._lengths.extend(lengths)
+        self._data += data
+        if self._table is not None:
+            for slot, name in enumerate(names, start=first_slot):
+                self._index(slot, name)
+
+
+class ProductView(ProductBase):
+    """
+    A product whose state lives in one slot of a ColumnarStore.
+
+    Views are cheap to create and compare equal when they refer to the same
+    slot of the same store, so they can be used as shopping list entries and
+    dictionary keys like regular products. They derive from ProductBase
+    rather than Product, so a view only holds its store and slot.
+
+    :param store: The columnar store holding the product
+    :type store: ColumnarStore
+    :param slot: Slot index of the product in the store's arrays
+    :type slot: int
+    """
+
+    __slots__ = ("_store", "_slot")
+
+    def __init__(self, store: "ColumnarStore", slot: int):
+        """Constructor method"""
+        self._store = store
+        self._slot = slot
+
+    @property
+    def name(self) -> str:
+        """Name of the product."""
+        return self._store._names[self._slot]
+
+    @name.setter
+    def name(self, name: str) -> None:
+        self._store._set_name(self._slot, name)
+
+    @property
+    def price_cents(self) -> int:
+        """Price of the product in cents."""
+        return self._store._prices[self._slot]
+
+    @price_cents.setter
+    def price_cents(self, price_cents: int) -> None:
+        self._store._prices[self._slot] = price_cents
+
+    @property
+    def price(self) -> float:
+        """Price of the product in major currency units."""
+        return self._store._prices[self._slot] / CENTS_PER_UNIT
+
+    @price.setter
+    def price(self, price: float) -> None:
+        self._store._prices[self._slot] = to_cents(price)
+
+    @property
+    def quantity(self) -> int:
+        """Current stock of the product."""
+        return self._store._quantities[self._slot]
+
+    @quantity.setter
+    def quantity(self, quantity: int) -> None:
+        self._store._set_quantity(self._slot, quantity)
+
+    @property
+    def active(self) -> bool:
+        """Whether the product is available for sale."""
+        return self._store._flags[self._slot] == 1
+
+    @active.setter
+    def active(self, active: bool) -> None:
+        self._store._set_active(self._slot, active)
+
+    @property
+    def _lock(self) -> threading.Lock:
+        """The lock stripe guarding this slot."""
+        return self._store._locks[self._slot % LOCK_STRIPES]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ProductView):
+            return NotImplemented
+        return self._store is other._store and self._slot == other._slot
+
+    def __hash__(self) -> int:
+        return hash(self._slot)
+
+    def __repr__(self) -> str:
+        return f"ProductView(slot={self._slot}, name={self.name!r})"
+
+
+class ColumnarStore(Store):
+    """
+    A store that keeps its catalog in typed arrays indexed by SKU slot.
+
+    Names are packed into one UTF-8 buffer, prices are stored in cents in an
+    ``array('q')``, quantities in an ``array('q')`` and active flags in a
+    ``bytearray``. Slots are never reused, so a slot number
+    identifies a SKU for the lifetime of the store. Products added from Product
+    instances are copied into the arrays; use the views returned by the store
+    to modify them afterward.
+
+    :param product_list: List of Product instances to copy into the store.
+    :type product_list: list[Product]
+    """
+
+    def __init__(self, product_list: Iterable[Product] = ()):
+        """
+        Initialize the store with a list of products.
+
+        :param product_list: Products whose state is copied into the store
+        :type product_list: list[Product]
+        """
+        self._names = _NameColumn()
+        self._prices = array("q")
+        self._quantities = array("q")
+        # 1 = active, 0 = inactive or removed
+        self._flags = bytearray()
+        self._live = 0
+        self._total_quantity = 0
+        self._active_cache: list[ProductView] | None = None
+        # Built on the first search, then maintained
+        self._search_index: SlotSearchIndex | None = None
+        # When each slot reached its current stock, as a clock value; built on
+        # the first low_stock call, then maintained (see low_stock)
+        self._quantity_order: array | None = None
+        self._quantity_clock = 0
+        self._sold_out_listeners = []
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._state_lock = threading.Lock()
+        self._wal = None
+        self._lsn = 0
+        self._logging = threading.local()
+        self._init_reservations()
+        self.pricing = None
+        for product in product_list:
+            self.validate_product(product)
+            self.add_product(product)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[str, float, int]]) -> "ColumnarStore":
+        """
+        Build a store from (name, price, quantity) rows without creating Product objects.
+
+        Every row is validated with the Product validators.
+
+        :param rows: Iterable of (name, price, quantity) tuples
+        :return: A new ColumnarStore holding one active slot per row
+        """
+        store = cls()
+        for name, price, quantity in rows:
+            store.add_row(name, price, quantity)
+        return store
+
+    def add_row(self, name: str, price: float, quantity: int, active: bool = True) -> ProductView:
+        """
+        Append a product to the store from its field values.
+
+        :param name: Name of the product
+        :param price: Price of the product
+        :param quantity: Available stock
+        :param active: Whether the product is available for sale
+        :return: A view of the new slot
+        """
+        Product.validate_name(name)
+        Product.validate_price(price)
+        Product.validate_quantity(quantity)
+        return self._add_row_cents(name, to_cents(price), quantity, active)
+
+    def _add_row_cents(
+        self, name: str, price_cents: int, quantity: int, active: bool = True
+    ) -> ProductView:
+        """
+        Append a product whose fields were already validated, with its price in cents.
+
+        :param name: Name of the product
+        :param price_cents: Price of the product in cents
+        :param quantity: Available stock
+        :param active: Whether the product is available for sale
+        :return: A view of the new slot
+        """
+        with self._state_lock:
+            self._check_log()
+            if self._wal is not None:
+                self._check_new_names([name])
+            slot = len(self._names)
+            self._names.append(name)
+            self._prices.append(price_cents)
+            self._quantities.append(quantity)
+            self._flags.append(1 if active else 0)
+            self._stamp_new_slots(1)
+            self._live += 1
+            self._total_quantity += quantity
+            if self._search_index is not None:
+                self._search_index.add(slot)
+            if active:
+                self._active_cache = None
+            lsn = self._log({
+                "op": "add",
+                "name": name,
+                "price_cents": price_cents,
+                "quantity": quantity,
+                "active": active,
+            })
+        self._wait_durable(lsn)
+        return ProductView(self, slot)
+
+    def add_rows(
+        self, rows: list[tuple[str, float, int]], validate: bool = True, in_cents: bool = False
+    ) -> None:
+        """
+        Append products from (name, price, quantity) rows in one step.
+
+        :param rows: Field values of the new products, in order
+        :param validate: Whether to check the rows with the Product validation rules
+        :param in_cents: Whether the prices are already integer cents
+        :raises TypeError: If a field has the wrong type
+        :raises ValueError: If a field has an invalid value
+        """
+        if validate:
+            Product._validate_rows(rows)
+        prices = [row[1] for row in rows] if in_cents else [to_cents(row[1]) for row in rows]
+        self._extend(
+            [row[0] for row in rows],
+            array("q", prices),
+            array("q", [row[2] for row in rows]),
+            bytearray(b"\x01" * len(rows)),
+        )
+
+    def add_products(self, products: list[Product]) -> None:
+        """
+        Copy several products into new slots at once.
+
+        Either all products are added or, if one of them is already a view of
+        this store or is listed twice, none is.
+
+        :param products: Product instances to copy, in order
+        :raises ValueError: If a product already exists in the store or is listed twice
+        """
+        if any(product in self for product in products) or len(set(products)) != len(products):
+            raise ValueError("Product already exists in the store")
+        self._extend(
+            [product.name for product in products],
+            array("q", [product.price_cents for product in products]),
+            array("q", [product.quantity for product in products]),
+            bytearray(product.active for product in products),
+        )
+
+    def _extend(
+        self, names: list[str], prices: array, quantities: array, flags: bytearray
+    ) -> None:
+        """
+        Append validated columns as new slots and log them.
+
+        :param names: Product names
+        :param prices: Prices in cents as array('q')
+        :param quantities: Quantities as array('q')
+        :param flags: Active flags, one byte per product
+        """
+        with self._state_lock:
+            self._check_log()
+            if self._wal is not None:
+                self._check_new_names(names)
+            first_slot = len(self._names)
+            self._names.extend(names)
+            self._prices.extend(prices)
+            self._quantities.extend(quantities)
+            self._flags.extend(flags)
+            self._stamp_new_slots(len(names))
+            self._live += len(names)
+            self._total_quantity += sum(quantities)
+            if self._search_index is not None:
+                self._search_index.add_many(range(first_slot, len(self._names)))
+            if any(flags):
+                self._active_cache = None
+            lsn = 0
+            if self._wal is not None:
+                for name, price_cents, quantity, flag in zip(names, prices, quantities, flags):
+                    lsn = self._log({
+                        "op": "add",
+                        "name": name,
+                        "price_cents": price_cents,
+                        "quantity": quantity,
+                        "active": bool(flag),
+                    })
+        self._wait_durable(lsn)
+
+    @property
+    def product_list(self) -> list[Product]:
+        """
+        All products in the store (active and inactive) in slot order.
+
+        :return: A new list of ProductView instances
+        """
+        slots = compress(range(len(self._names)), self._names.is_live())
+        return [ProductView(self, slot) for slot in slots]
+
+    def __len__(self) -> int:
+        """Return the number of products in the store (active and inactive)."""
+        return self._live
+
+    def __contains__(self, product: object) -> bool:
+        """Return True if the given product is a live view of this store."""
+        return (
+            isinstance(product, ProductView)
+            and product._store is self
+            and self._names[product._slot] is not None
+        )
+
+    def add_product(self, product: Product) -> None:
+        """
+        Copy a product into a new slot of the store.
+
+        :param product: Product instance to add
+        :raises ValueError: If the product is already a view of this store
+        """
+        if product in self:
+            raise ValueError("Product already exists in the store")
+        self._add_row_cents(product.name, product.price_cents, product.quantity, product.active)
+
+    def remove_product(self, product: Product) -> None:
+        """
+        Remove a product from the store, leaving its slot empty.
+
+        Reservations holding the product are released, as in Store.remove_product.
+
+        :param product: View of the product to remove
+        :raises ValueError: If the product is not in the store
+        """
+        if product not in self:
+            raise ValueError("Product not found in the store")
+        with product._lock:
+            lsn = self._remove_locked(product)
+            self._drop_reservations_of(product)
+        self._wait_durable(lsn)
+
+    def _remove_locked(self, product: ProductView) -> int:
+        """
+        Empty the slot of a product.
+
+        Callers must hold the product's lock stripe.
+
+        :param product: View of the product to remove
+        :return: LSN of the remove record, or 0 without a log
+        :raises ValueError: If the product is not in the store
+        """
+        slot = product._slot
+        with self._state_lock:
+            self._check_log()
+            name = self._names[slot]
+            if name is None:
+                raise ValueError("Product not found in the store")
+            if self._search_index is not None:
+                self._search_index.remove(slot)
+            self._names[slot] = None
+            self._total_quantity -= self._quantities[slot]
+            self._quantities[slot] = 0
+            self._prices[slot] = 0
+            if self._flags[slot]:
+                self._active_cache = None
+            self._flags[slot] = 0
+            self._live -= 1
+            return self._log({"op": "remove", "name": name})
+
+    def _has_duplicate_names(self) -> bool:
+        """
+        Tell whether several live slots share a name.
+
+        Callers must hold the state lock.
+
+        :return: True if a name is used more than once
+        """
+        return len(set(name for name in self._names if name is not None)) != self._live
+
+    def _check_new_names(self, names: list[str]) -> None:
+        """
+        Check that names are unique among themselves and not taken by a live slot.
+
+        Callers must hold the state lock.
+
+        :param names: Names of the products about to be added
+        :raises ValueError: If a name is taken or listed twice
+        """
+        find = self._names.find
+        if len(set(names)) != len(names) or any(find(name) >= 0 for name in names):
+            raise ValueError("Product names must be unique while a write-ahead log is attached")
+
+    def get_product_by_name(self, name: str) -> Product | None:
+        """
+        Look up a product by its exact name.
+
+        If several products share the name, the one in the lowest slot is returned.
+        The first lookup builds a hash table of slot numbers over the packed
+        names, which takes 8 to 16 bytes per product.
+
+        :param name: Exact product name
+        :return: A view of the matching product, or None if there is none
+        """
+        with self._state_lock:
+            slot = self._names.find(name)
+        return None if slot < 0 else ProductView(self, slot)
+
+    def search_prefix(self, prefix: str, limit: int | None = DEFAULT_SEARCH_LIMIT) -> list[Product]:
+        """
+        Find active products whose name starts with a prefix, ignoring case.
+
+        :param prefix: Start of the name
+        :param limit: Largest number of results, or None for all
+        :return: Matching ProductView instances in name order
+        """
+        search_index = self._get_search_index()
+        with self._state_lock:
+            slots = search_index.prefix(prefix, limit)
+        return [ProductView(self, slot) for slot in slots]
+
+    def search_tokens(self, query: str, limit: int | None = DEFAULT_SEARCH_LIMIT) -> list[Product]:
+        """
+        Find active products whose name contains every word of a query, ignoring case.
+
+        :param query: One or more words
+        :param limit: Largest number of results, or None for all
+        :return: Matching ProductView instances in slot order
+        """
+        search_index = self._get_search_index()
+        with self._state_lock:
+            slots = search_index.tokens(query, limit)
+        return [ProductView(self, slot) for slot in slots]
+
+    def _get_search_index(self) -> SlotSearchIndex:
+        """
+        Return the search index, building it on first use.
+
+        :return: The store's search index over slots
+        """
+        search_index = self._search_index
+        if search_index is None:
+            with self._state_lock:
+                if self._search_index is None:
+                    names = self._names
+                    self._search_index = SlotSearchIndex(
+                        names,
+                        self._flags.__getitem__,
+                        compress(range(len(names)), names.is_live()),
+                    )
+                search_index = self._search_index
+        return search_index
+
+    def get_all_products(self) -> list[Product]:
+        """
+        Retrieve all active products currently in the store.
+
+        The list is cached and only rebuilt after the set of active products
+        changes. It is shared between callers and must be treated as read-only.
+
+        :return: List of active ProductView instances in slot order
+        """
+        active_cache = self._active_cache
+        if active_cache is None:
+            with self._state_lock:
+                active_cache = self._active_cache = [
+                    ProductView(self, slot)
+                    for slot in compress(range(len(self._flags)), self._flags)
+                ]
+        return active_cache
+
+    def get_products_page(self, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE) -> list[Product]:
+        """
+        Retrieve one page of the active products, in the order of get_all_products.
+
+        Unless the list of get_all_products is already cached, only the views
+        of the requested page are created, so browsing a large catalog does
+        not hold a view of every active product in memory.
+
+        :param offset: Number of active products to skip
+        :param limit: Maximum number of products to return
+        :return: Active ProductView instances at positions offset to offset + limit
+        :raises ValueError: If offset or limit is negative
+        """
+        if offset < 0 or limit < 0:
+            raise ValueError("Offset and limit cannot be negative")
+        active_cache = self._active_cache
+        if active_cache is not None:
+            return active_cache[offset:offset + limit]
+        with self._state_lock:
+            slots = compress(range(len(self._flags)), self._flags)
+            return [ProductView(self, slot) for slot in islice(slots, offset, offset + limit)]
+
+    def count_active_products(self) -> int:
+        """
+        Count the active products by scanning the flags, without building any views.
+
+        :return: Number of active products
+        """
+        return self._flags.count(1)
+
+    def save_snapshot(self, path: str) -> int:
+        """
+        Save the state of every product to a binary snapshot file.
+
+        Removed slots are left out, so the loaded store is compacted. All lock
+        stripes and the state lock are held while the arrays are copied.
+
+        :param path: Destination file path
+        :return: LSN of the last change contained in the snapshot
+        """
+        locks = sorted(self._locks, key=id)
+        for lock in locks:
+            lock.acquire()
+        try:
+            with self._state_lock:
+                lsn = self.lsn
+                live = self._names.is_live()
+                if all(live):
+                    names = list(self._names)
+                    prices = array("q", self._prices)
+                    quantities = array("q", self._quantities)
+                    flags = bytearray(self._flags)
+                else:
+                    names = list(compress(self._names, live))
+                    prices = array("q", compress(self._prices, live))
+                    quantities = array("q", compress(self._quantities, live))
+                    flags = bytearray(compress(self._flags, live))
+        finally:
+            self._release_locks(locks)
+        write_snapshot(path, names, prices, quantities, flags, lsn)
+        return lsn
+
+    @classmethod
+    def load_snapshot(cls, path: str) -> "ColumnarStore":
+        """
+        Create a store from a binary snapshot file.
+
+        The columns are copied straight into the store's arrays once the
+        snapshot's checksum is verified, without per-product validation.
+
+        :param path: Snapshot file path
+        :return: A new store holding the saved products in their saved order
+        :raises ValueError: If the file is not a valid snapshot
+        """
+        names, prices, quantities, flags, lsn = read_snapshot(path)
+        store = cls()
+        store._names.extend(names)
+        store._prices = prices
+        store._quantities = quantities
+        store._flags = flags
+        store._live = len(names)
+        store._total_quantity = sum(quantities)
+        store._lsn = lsn
+        return store
+
+    def _replay_add(self, name: str, price_cents: int, quantity: int, active: bool) -> None:
+        """
+        Re-create a logged product in a new slot.
+
+        :param name: Name of the product
+        :param price_cents: Price of the product in cents
+        :param quantity: Stock when it was added
+        :param active: Status when it was added
+        """
+        self._add_row_cents(name, price_cents, quantity, active)
+
+    def _set_name(self, slot: int, name: str) -> None:
+        """
+        Rename the product in a slot.
+
+        :param slot: Slot index
+        :param name: New name
+        :raises ValueError: If another slot has the name while a write-ahead log is attached
+        """
+        with self._state_lock:
+            if self._wal is not None and self._names.find(name) not in (-1, slot):
+                raise ValueError("Product names must be unique while a write-ahead log is attached")
+            self._names[slot] = name
+            self._search_index = None
+
+    def _set_quantity(self, slot: int, quantity: int) -> None:
+        """
+        Store a new quantity for a slot and update the running total.
+
+        :param slot: Slot index
+        :param quantity: New quantity
+        """
+        with self._state_lock:
+            old_quantity = self._quantities[slot]
+            self._total_quantity += quantity - old_quantity
+            self._quantities[slot] = quantity
+            if quantity != old_quantity:
+                self._stamp_slots([slot])
+        if quantity == 0 and old_quantity > 0:
+            self._notify_sold_out([ProductView(self, slot)])
+        if self._wal is not None and not getattr(self._logging, "in_order", False):
+            self._wait_durable(
+                self._log({"op": "set_quantity", "name": self._names[slot], "quantity": quantity})
+            )
+
+    def _set_active(self, slot: int, active: bool) -> None:
+        """
+        Store a new active flag for a slot.
+
+        :param slot: Slot index
+        :param active: New status
+        """
+        flag = 1 if active else 0
+        with self._state_lock:
+            if active and self._names[slot] is None:
+                raise ValueError("Product not found in the store")
+            if self._flags[slot] == flag:
+                return
+            self._flags[slot] = flag
+            self._active_cache = None
+        if self._wal is not None and not getattr(self._logging, "in_order", False):
+            self._wait_durable(
+                self._log({"op": "set_active", "name": self._names[slot], "active": active})
+            )
+
+    def inventory_value(self) -> int:
+        """
+        Total value of the stock held, summed over price times quantity of every product.
+
+        NumPy computes the sum in int64 when no product's price times the total
+        stock can overflow it; larger inventories are summed exactly in Python.
+
+        :return: Inventory value in cents
+        """
+        with self._state_lock:
+            if np is not None and self._prices:
+                # The views must be gone before the columns can grow again
+                prices = np.frombuffer(self._prices, dtype=np.int64)
+                quantities = np.frombuffer(self._quantities, dtype=np.int64)
+                value = None
+                if int(prices.max()) * self._total_quantity < 2**63:
+                    value = int(prices @ quantities)
+                del prices, quantities
+                if value is not None:
+                    return value
+            return sum(map(operator.mul, self._prices, self._quantities))
+
+    def low_stock(self, threshold: int) -> list[Product]:
+        """
+        Find every product (active or not) whose quantity is below a threshold.
+
+        The order matches Store.low_stock: lowest stock first, and products
+        with equal stock in the order they reached it. Like the quantity index
+        of Store, that order is tracked from the first call on, in a column
+        of clock values; before it, products with equal stock are in slot order.
+
+        :param threshold: Quantity limit; products with fewer items are returned
+        :return: List of ProductView instances, lowest stock first
+        """
+        with self._state_lock:
+            if self._quantity_order is None:
+                self._quantity_order = array("q", bytes(8 * len(self._quantities)))
+            if np is not None:
+                quantities = np.frombuffer(self._quantities, dtype=np.int64)
+                order = np.frombuffer(self._quantity_order, dtype=np.int64)
+                slots = np.flatnonzero(quantities < threshold)
+                slots = slots[np.lexsort((order[slots], quantities[slots]))].tolist()
+                del quantities, order
+            else:
+                quantities, order = self._quantities, self._quantity_order
+                slots = sorted(
+                    (slot for slot, quantity in enumerate(quantities) if quantity < threshold),
+                    key=lambda slot: (quantities[slot], order[slot]),
+                )
+        names = self._names
+        return [ProductView(self, slot) for slot in slots if names[slot] is not None]
+
+    def _stamp_slots(self, slots: Iterable[int]) -> None:
+        """
+        Record that slots reached their current stock, in the given order.
+
+        Callers hold the state lock. Does nothing until low_stock was called.
+
+        :param slots: Slots whose quantity changed, in the order of the changes
+        """
+        order = self._quantity_order
+        if order is None:
+            return
+        clock = self._quantity_clock
+        for slot in slots:
+            clock += 1
+            order[slot] = clock
+        self._quantity_clock = clock
+
+    def _stamp_new_slots(self, count: int) -> None:
+        """
+        Record the stock of slots just appended as reached now.
+
+        Callers hold the state lock.
+
+        :param count: Number of slots appended
+        """
+        if self._quantity_order is None:
+            return
+        clock = self._quantity_clock
+        self._quantity_order.extend(range(clock + 1, clock + count + 1))
+        self._quantity_clock = clock + count
+
+    def price_range(self, low: float, high: float) -> list[Product]:
+        """
+        Find the active products priced between two bounds (inclusive).
+
+        The price column is scanned in one vectorized pass instead of keeping
+        a sorted index up to date through bulk price changes. The bounds are
+        rounded to whole cents like product prices.
+
+        :param low: Lowest price
+        :param high: Highest price
+        :return: List of ProductView instances, cheapest first
+        """
+        low, high = to_cents(low), to_cents(high)
+        with self._state_lock:
+            if np is not None:
+                prices = np.frombuffer(self._prices, dtype=np.int64)
+                flags = np.frombuffer(self._flags, dtype=np.uint8)
+                slots = np.flatnonzero((prices >= low) & (prices <= high) & (flags == 1))
+                slots = slots[np.argsort(prices[slots], kind="stable")].tolist()
+                del prices, flags
+            else:
+                prices = self._prices
+                slots = sorted(
+                    (
+                        slot
+                        for slot in compress(range(len(self._flags)), self._flags)
+                        if low <= prices[slot] <= high
+                    ),
+                    key=prices.__getitem__,
+                )
+        return [ProductView(self, slot) for slot in slots]
+
+    def bulk_set_quantities(self, products: Iterable[Product], quantities: Iterable[int]) -> None:
+        """
+        Set the quantities of many products at once.
+
+        Gives the same result as calling set_quantity on each product in turn,
+        including deactivating products whose quantity is set to 0. All
+        quantities are validated before any of them is applied.
+
+        :param products: Views of this store
+        :param quantities: New quantity for each product
+        :raises ValueError: If a product is not in the store or a quantity is negative
+        :raises TypeError: If a quantity is not an integer
+        :raises OverflowError: If a resulting quantity does not fit in 64 bits
+        """
+        slots, values = self._bulk_arguments(products, quantities)
+        self._apply_quantities(slots, values, add=False)
+
+    def bulk_restock(self, products: Iterable[Product], amounts: Iterable[int]) -> None:
+        """
+        Add stock to many products at once.
+
+        Gives the same result as calling
+        ``product.set_quantity(product.get_quantity() + amount)`` for each pair in
+        turn. Amounts for a product listed several times are added up.
+
+        :param products: Views of this store
+        :param amounts: Non-negative amount to add for each product
+        :raises ValueError: If a product is not in the store or an amount is negative
+        :raises TypeError: If an amount is not an integer
+        :raises OverflowError: If a resulting quantity does not fit in 64 bits
+        """
+        slots, values = self._bulk_arguments(products, amounts)
+        self._apply_quantities(slots, values, add=True)
+
+    def bulk_markdown(self, products: Iterable[Product], percent: float) -> None:
+        """
+        Reduce the price of a set of products by a percentage.
+
+        Each product is marked down once, even if it is listed several times.
+        New prices are rounded to the nearest cent, halves to even. The slot
+        locks are held while the prices change, and the new prices are logged
+        as one record when a write-ahead log is attached.
+
+        :param products: Views of this store
+        :param percent: Discount between 0 and 100
+        :raises ValueError: If a product is not in the store or percent is out of range
+        :raises TypeError: If percent is not a number
+        :raises OSError: If the write-ahead log has failed
+        """
+        factor = self._markdown_factor(percent)
+        slots = sorted(set(self._slots_of(products)))
+        if not slots:
+            return
+        stripes = {slot % LOCK_STRIPES for slot in slots}
+        locks = sorted((self._locks[stripe] for stripe in stripes), key=id)
+        for lock in locks:
+            lock.acquire()
+        try:
+            with self._state_lock:
+                self._check_log()
+                if np is not None:
+                    prices = np.frombuffer(self._prices, dtype=np.int64)
+                    index = np.array(slots, dtype=np.int64)
+                    prices[index] = np.rint(prices[index] * factor)
+                    del prices
+                else:
+                    prices = self._prices
+                    for slot in slots:
+                        prices[slot] = round(prices[slot] * factor)
+            lsn = 0
+            if self._wal is not None:
+                lsn = self._log_prices([ProductView(self, slot) for slot in slots])
+        finally:
+            self._release_locks(locks)
+        self._wait_durable(lsn)
+
+    def _slots_of(self, products: Iterable[Product]) -> list[int]:
+        """
+        Resolve products to their slots, checking that they belong to this store.
+
+        :param products: Views of this store
+        :return: Slot index of each product, in the same order
+        :raises ValueError: If a product is not in the store
+        """
+        names = self._names
+        slots = []
+        for product in products:
+            if (
+                not isinstance(product, ProductView)
+                or product._store is not self
+                or names[product._slot] is None
+            ):
+                raise ValueError("Product not found in the store")
+            slots.append(product._slot)
+        return slots
+
+    def _bulk_arguments(
+        self, products: Iterable[Product], values: Iterable[int]
+    ) -> tuple[list[int], list[int]]:
+        """
+        Resolve and validate the arguments of a bulk quantity update.
+
+        :param products: Views of this store
+        :param values: One non-negative integer per product
+        :return: Tuple of (slots, values)
+        :raises ValueError: If the lengths differ, a product is not in the store or a
+                            value is negative
+        :raises TypeError: If a value is not an integer
+        """
+        slots = self._slots_of(products)
+        values = list(values)
+        if len(values) != len(slots):
+            raise ValueError("Products and quantities must have the same length")
+        checked = np.asarray(values) if np is not None and values else None
+        if checked is not None and checked.dtype.kind in "iub":
+            # Same rules as Product.validate_quantity, in one pass
+            if (checked < 0).any():
+                raise ValueError("Quantity cannot be negative")
+        else:
+            for value in values:
+                Product.validate_quantity(value)
+        return slots, values
+
+    def _apply_quantities(self, slots: list[int], values: list[int], add: bool) -> None:
+        """
+        Write validated quantities to their slots under the slot locks.
+
+        With add=False each slot is set to its value (the last one wins for
+        repeated slots); with add=True the values are added to the stock.
+        Slots that end up at 0 are deactivated, as Product.set_quantity does,
+        and reported to the sold-out listeners.
+
+        :param slots: Slot indexes
+        :param values: Validated value per slot
+        :param add: Whether to add the values instead of assigning them
+        """
+        if not slots:
+            return
+        stripes = {slot % LOCK_STRIPES for slot in slots}
+        locks = sorted((self._locks[stripe] for stripe in stripes), key=id)
+        for lock in locks:
+            lock.acquire()
+        try:
+            with self._state_lock:
+                self._check_log()
+                self._check_quantities_fit(slots, values, add)
+                changed = None
+                if self._quantity_order is not None:
+                    changed = self._changed_slots(slots, values, add)
+                if np is not None:
+                    sold_out = self._apply_quantities_numpy(slots, values, add)
+                else:
+                    sold_out = self._apply_quantities_python(slots, values, add)
+                if changed is not None:
+                    self._stamp_slots(changed)
+            if sold_out:
+                self._notify_sold_out([ProductView(self, slot) for slot in sold_out])
+            lsn = 0
+            if self._wal is not None:
+                names, quantities = self._names, self._quantities
+                lsn = self._log({
+                    "op": "set_quantities",
+                    "items": [[names[slot], quantities[slot]] for slot in dict.fromkeys(slots)],
+                })
+        finally:
+            self._release_locks(locks)
+        self._wait_durable(lsn)
+
+    def _check_quantities_fit(self, slots: list[int], values: list[int], add: bool) -> None:
+        """
+        Check that every quantity a bulk update would write fits the int64 column.
+
+        Runs before anything is written, so a batch is applied either whole or
+        not at all. Callers hold the state lock.
+
+        :param slots: Slot indexes
+        :param values: Validated value per slot
+        :param add: Whether the values are added to the stock
+        :raises OverflowError: If a resulting quantity does not fit in 64 bits
+        """
+        if not add:
+            if max(values) > INT64_MAX:
+                raise OverflowError("Quantity does not fit in 64 bits")
+            return
+        quantities = self._quantities
+        # Cheap upper bound first; only add up per slot if it is exceeded
+        if max(map(quantities.__getitem__, slots)) + sum(values) <= INT64_MAX:
+            return
+        totals = {}
+        for slot, value in zip(slots, values):
+            totals[slot] = totals.get(slot, quantities[slot]) + value
+        if max(totals.values()) > INT64_MAX:
+            raise OverflowError("Quantity does not fit in 64 bits")
+
+    def _changed_slots(self, slots: list[int], values: list[int], add: bool) -> list[int]:
+        """
+        List the slots a bulk update will change, in the order Store would move them.
+
+        Store.bulk_restock adds up the amounts per product and applies them in
+        first-seen order; Store.bulk_set_quantities assigns the pairs in turn,
+        so a slot counts as moved at the last assignment that changes it.
+        Called before the update is written.
+
+        :param slots: Slot indexes
+        :param values: Validated value per slot
+        :param add: Whether the values are added to the stock
+        :return: Slots whose quantity changes, in order
+        """
+        if add:
+            grown = {slot for slot, value in zip(slots, values) if value}
+            return [slot for slot in dict.fromkeys(slots) if slot in grown]
+        quantities = self._quantities
+        current = {}
+        moved = {}
+        for slot, value in zip(slots, values):
+            if current.get(slot, quantities[slot]) != value:
+                moved.pop(slot, None)
+                moved[slot] = None
+            current[slot] = value
+        return list(moved)
+
+    def _apply_quantities_numpy(self, slots: list[int], values: list[int], add: bool) -> list[int]:
+        """Vectorized implementation of _apply_quantities; returns the slots deactivated."""
+        index = np.array(slots, dtype=np.int64)
+        amounts = np.array(values, dtype=np.int64)
+        quantities = np.frombuffer(self._quantities, dtype=np.int64)
+        if add:
+            np.add.at(quantities, index, amounts)
+            self._total_quantity += int(amounts.sum())
+        else:
+            # Keep the last value given for each slot
+            index, last = np.unique(index[::-1], return_index=True)
+            amounts = amounts[::-1][last]
+            self._total_quantity += int(amounts.sum()) - int(quantities[index].sum())
+            quantities[index] = amounts
+        flags = np.frombuffer(self._flags, dtype=np.uint8)
+        sold_out = index[quantities[index] == 0]
+        sold_out = np.unique(sold_out[flags[sold_out] == 1])
+        if len(sold_out):
+            flags[sold_out] = 0
+            self._active_cache = None
+        # Drop the buffer exports so the arrays can grow again
+        del quantities, flags
+        return sold_out.tolist()
+
+    def _apply_quantities_python(self, slots: list[int], values: list[int], add: bool) -> list[int]:
+        """Pure-Python implementation of _apply_quantities; returns the slots deactivated."""
+        quantities = self._quantities
+        flags = self._flags
+        sold_out = []
+        delta = 0
+        for slot, value in zip(slots, values):
+            if add:
+                value += quantities[slot]
+            delta += value - quantities[slot]
+            quantities[slot] = value
+            if value == 0 and flags[slot]:
+                flags[slot] = 0
+                self._active_cache = None
+                sold_out.append(slot)
+        self._total_quantity += delta
+        return sold_out
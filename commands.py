@@ -6,32 +6,39 @@ displaying total product quantities, initiating product orders, and exiting
 the application. These handlers are used to map user menu selections to
 store-related operations.
 
+For non-interactive use (the batch mode in main and the order server) the
+same operations are available as structured requests, which return their
+results as dicts instead of printing them.
+
 Functions:
 - handle_list_products: Lists all products in the store.
 - handle_show_total_quantity: Shows the total count of products in the store.
 - handle_make_order: Initiates the product ordering process.
 - handle_quit_program: Exits the program.
+- execute_request: Runs a structured list/total/order request.
 
 Author: Martin Haferanke
 Date: 2025-07-01
 """
 
+from products import CENTS_PER_UNIT, Product
 from store import Store
+from utils.listing import browse_products
 from utils.order import process_order
 
 
 def handle_list_products(store: Store) -> None:
     """
-    Display all available products in the store.
+    Display the available products in the store, one page at a time.
 
     :param store: The store instance containing products.
     """
 
-    if not store.get_all_products():
+    if not store.count_active_products():
         print("No products in store.")
         return
 
-    store.print_products()
+    browse_products(store)
 
 
 def handle_show_total_quantity(store: Store) -> None:
@@ -49,7 +56,7 @@ def handle_make_order(store: Store) -> None:
 
     :param store: The store instance containing products.
     """
-    if not store.get_all_products():
+    if not store.count_active_products():
         print("No products in store.")
         return
     process_order(store)
@@ -59,3 +66,74 @@ def handle_quit_program() -> None:
     """Terminate the program with a goodbye message."""
     print("Goodbye!")
     exit()
+
+
+def execute_request(store: Store, request: dict, max_list_limit: int | None = None) -> dict:
+    """
+    Run one structured request against the store.
+
+    Supported requests are {"op": "list"}, {"op": "total"} and
+    {"op": "order", "items": [[name, quantity], ...]}. A list request may
+    carry "offset" and "limit" to fetch one page of the active products, as
+    get_products_page does; "count" in its response is the number of active
+    products.
+
+    :param store: The store instance containing products.
+    :param request: Decoded request
+    :param max_list_limit: Largest page a list request may fetch, also used
+                           when it gives no limit; None allows the whole catalog
+    :return: Response with "ok": True and the operation's result
+    :raises KeyError: If a required field is missing
+    :raises TypeError: If a field has the wrong type
+    :raises ValueError: If the operation is unknown or the order fails
+    """
+    op = request.get("op")
+    if op == "list":
+        offset, limit = request.get("offset", 0), request.get("limit", max_list_limit)
+        for value in (offset, limit):
+            if value is not None and (isinstance(value, bool) or not isinstance(value, int)):
+                raise TypeError("Offset and limit must be integers")
+        if limit is None:
+            if offset < 0:
+                raise ValueError("Offset and limit cannot be negative")
+            page = store.get_all_products()[offset:]
+        else:
+            if max_list_limit is not None:
+                limit = min(limit, max_list_limit)
+            page = store.get_products_page(offset, limit)
+        products = [
+            {"name": product.name, "price": product.price, "quantity": product.quantity}
+            for product in page
+        ]
+        return {"ok": True, "products": products, "count": store.count_active_products()}
+    if op == "total":
+        return {"ok": True, "total": store.get_total_quantity()}
+    if op == "order":
+        total = store.order(resolve_items(store, request["items"]))
+        return {"ok": True, "price": total / CENTS_PER_UNIT}
+    raise ValueError(f"Unknown operation: {op!r}")
+
+
+def resolve_items(store: Store, items: list) -> list[tuple[Product, int]]:
+    """
+    Resolve the [name, quantity] pairs of an order request to products.
+
+    :param store: The store instance containing products.
+    :param items: Requested items
+    :return: Shopping list for Store.order
+    :raises ValueError: If an item is malformed or names an unknown product
+    :raises TypeError: If a quantity is a boolean
+    """
+    shopping_list = []
+    for item in items:
+        if not isinstance(item, list) or len(item) != 2:
+            raise ValueError("Order items must be [name, quantity] pairs")
+        name, quantity = item
+        # JSON true/false decode to bools, which would otherwise pass as 1 and 0
+        if isinstance(quantity, bool):
+            raise TypeError("Quantity must be an integer")
+        product = store.get_product_by_name(name)
+        if product is None:
+            raise ValueError(f"Unknown product: {name!r}")
+        shopping_list.append((product, quantity))
+    return shopping_list
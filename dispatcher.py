@@ -11,19 +11,16 @@ Author: Martin Haferanke
 Date: 2025-07-01
 """
 
-from commands import (
-    handle_list_products,
-    handle_show_total_quantity,
-    handle_make_order,
-    handle_quit_program,
-)
+import commands
 from store import Store
 
 
 def get_command_dispatcher(store: Store) -> dict:
+    # Handlers are looked up on the commands module at call time, so the
+    # dispatcher picks up the timing wrappers installed by metrics.enable()
     return {
-        "1": lambda: handle_list_products(store),
-        "2": lambda: handle_show_total_quantity(store),
-        "3": lambda: handle_make_order(store),
-        "4": handle_quit_program,
+        "1": lambda: commands.handle_list_products(store),
+        "2": lambda: commands.handle_show_total_quantity(store),
+        "3": lambda: commands.handle_make_order(store),
+        "4": lambda: commands.handle_quit_program(),
     }
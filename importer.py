@@ -0,0 +1,314 @@
+"""
+Streaming catalog import from supplier feeds.
+
+This module fills a Store from CSV or JSONL feeds without materializing the
+feed in memory. Rows flow through a generator pipeline: they are read one at
+a time, converted and checked with the Product validation rules, and added to
+the store in fixed-size chunks. Rejected rows are handed to a callback with
+their line number instead of stopping the import, so memory use stays flat
+regardless of the feed size.
+
+Large feeds can also be parsed and validated in worker processes: the feed is
+split into chunks of lines, each worker returns its valid rows as packed
+columns plus its rejects, and the parent inserts the chunks in feed order, so
+the result is the same as a single-process import.
+
+CSV feeds need a header row with ``name``, ``price`` and ``quantity``
+columns. JSONL feeds hold one object with those keys per line.
+
+Classes:
+- ImportStats: Counts of imported and rejected rows of one import.
+
+Functions:
+- read_feed: Reads raw records from a feed with their line numbers.
+- validate_rows: Converts and validates raw records, reporting rejects.
+- import_feed: Streams a feed into a store in chunks, optionally in parallel.
+"""
+
+import csv
+import json
+import time
+from array import array
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from products import Product, to_cents
+from store import Store
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+
+CSV_COLUMNS = ("name", "price", "quantity")
+
+# Largest quantity or price in cents a row may have; stores and snapshots keep them as int64
+MAX_INT64 = 2**63 - 1
+
+# Called as on_reject(line_number, raw_record, error) for every rejected row
+RejectHandler = Callable[[int, object, Exception], None]
+
+# Exceptions a worker may report for a rejected row, by name
+_REJECT_ERRORS = {error.__name__: error for error in (KeyError, TypeError, ValueError)}
+
+
+class ImportStats:
+    """
+    Counts of one feed import.
+
+    :param imported: Number of rows added to the store
+    :type imported: int
+    :param rejected: Number of rows sent to the reject handler
+    :type rejected: int
+    :param seconds: Wall-clock duration of the import
+    :type seconds: float
+    """
+
+    def __init__(self, imported: int = 0, rejected: int = 0, seconds: float = 0.0):
+        """Constructor method"""
+        self.imported = imported
+        self.rejected = rejected
+        self.seconds = seconds
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rows processed (imported or rejected) per second."""
+        if not self.seconds:
+            return 0.0
+        return (self.imported + self.rejected) / self.seconds
+
+
+def read_feed(lines: Iterable[str], fmt: str) -> Iterator[tuple[int, object]]:
+    """
+    Read raw records from a feed.
+
+    :param lines: Text lines of the feed, e.g. an open file
+    :param fmt: "csv" or "jsonl"
+    :return: Iterator of (line number, raw record); CSV records are dicts of
+             strings, JSONL records are the decoded lines (or the raw text
+             when a line is not valid JSON)
+    :raises ValueError: If the format is unknown or the CSV header lacks a column
+    """
+    if fmt == FORMAT_CSV:
+        lines = iter(lines)
+        fieldnames = _read_csv_header(lines)
+        return _read_records(lines, fmt, fieldnames, first_line=2)
+    return _read_records(lines, fmt, None, first_line=1)
+
+
+def _read_csv_header(lines: Iterator[str]) -> list[str]:
+    """
+    Read and check the header row of a CSV feed.
+
+    :param lines: Iterator over the feed's lines, advanced past the header
+    :return: The column names
+    :raises ValueError: If the header lacks a required column
+    """
+    fieldnames = next(csv.reader([next(lines, "")]), [])
+    missing = set(CSV_COLUMNS) - set(fieldnames)
+    if missing:
+        raise ValueError(f"CSV header is missing columns: {', '.join(sorted(missing))}")
+    return fieldnames
+
+
+def _read_records(
+    lines: Iterable[str], fmt: str, fieldnames: list[str] | None, first_line: int
+) -> Iterator[tuple[int, object]]:
+    """
+    Read raw records from feed lines that follow any header.
+
+    :param lines: Text lines
+    :param fmt: "csv" or "jsonl"
+    :param fieldnames: CSV column names; unused for JSONL
+    :param first_line: Line number of the first line in the feed
+    :return: Iterator of (line number, raw record)
+    :raises ValueError: If the format is unknown
+    """
+    if fmt == FORMAT_CSV:
+        reader = csv.DictReader(lines, fieldnames=fieldnames)
+        for record in reader:
+            yield first_line + reader.line_num - 1, record
+    elif fmt == FORMAT_JSONL:
+        for line_number, line in enumerate(lines, start=first_line):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except (ValueError, RecursionError):
+                # Unparseable or too deeply nested; rejected as not an object
+                yield line_number, line
+    else:
+        raise ValueError(f"Unknown feed format: {fmt!r}")
+
+
+def validate_rows(
+    records: Iterable[tuple[int, object]], fmt: str, on_reject: RejectHandler | None = None
+) -> Iterator[tuple[str, float, int]]:
+    """
+    Convert raw feed records to (name, price, quantity) rows and validate them.
+
+    CSV fields are converted from text first. Every row is then checked with
+    Product.validate_name, validate_price and validate_quantity, and its
+    quantity and price in cents must fit in a signed 64-bit integer, so the
+    serial and parallel imports accept the same rows and every imported row
+    can be saved to a snapshot.
+
+    :param records: (line number, raw record) pairs from read_feed
+    :param fmt: "csv" or "jsonl"
+    :param on_reject: Called for each row that fails conversion or validation
+    :return: Iterator of valid rows
+    """
+    for line_number, record in records:
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("Record is not an object")
+            name, price, quantity = record["name"], record["price"], record["quantity"]
+            if fmt == FORMAT_CSV:
+                price = float(price)
+                quantity = int(quantity)
+            Product.validate_name(name)
+            Product.validate_price(price)
+            Product.validate_quantity(quantity)
+            if quantity > MAX_INT64:
+                raise ValueError("Quantity exceeds the 64-bit integer range")
+            if to_cents(price) > MAX_INT64:
+                raise ValueError("Price exceeds the 64-bit integer range")
+        except (KeyError, TypeError, ValueError) as error:
+            if on_reject is not None:
+                on_reject(line_number, record, error)
+            continue
+        yield name, price, quantity
+
+
+def import_feed(
+    store: Store,
+    lines: Iterable[str],
+    fmt: str,
+    chunk_size: int = 10_000,
+    on_reject: RejectHandler | None = None,
+    workers: int = 1,
+) -> ImportStats:
+    """
+    Stream a feed into a store.
+
+    Valid rows are added in chunks of chunk_size with Store.add_rows, so at
+    most a few chunks of rows are held in memory at a time. With workers > 1
+    the chunks are parsed and validated in a process pool; chunks are still
+    inserted and rejects still reported in feed order. Parallel CSV imports
+    expect one record per line (no line breaks inside quoted fields).
+
+    :param store: The store to fill
+    :param lines: Text lines of the feed, e.g. an open file
+    :param fmt: "csv" or "jsonl"
+    :param chunk_size: Number of lines parsed and rows added at once
+    :param on_reject: Called as on_reject(line_number, raw_record, error) for each rejected row
+    :param workers: Number of worker processes; 1 parses in this process
+    :return: Counts of imported and rejected rows
+    :raises ValueError: If the format is unknown or the CSV header lacks a column
+    """
+    stats = ImportStats()
+
+    def count_reject(line_number: int, record: object, error: Exception) -> None:
+        stats.rejected += 1
+        if on_reject is not None:
+            on_reject(line_number, record, error)
+
+    start = time.perf_counter()
+    if workers > 1:
+        _import_parallel(store, lines, fmt, chunk_size, count_reject, workers, stats)
+    else:
+        rows = validate_rows(read_feed(lines, fmt), fmt, count_reject)
+        while chunk := list(islice(rows, chunk_size)):
+            store.add_rows(chunk, validate=False)
+            stats.imported += len(chunk)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def _import_parallel(
+    store: Store,
+    lines: Iterable[str],
+    fmt: str,
+    chunk_size: int,
+    on_reject: RejectHandler,
+    workers: int,
+    stats: ImportStats,
+) -> None:
+    """
+    Parse and validate feed chunks in a process pool and insert them in order.
+
+    At most two chunks per worker are in flight, which bounds memory use.
+
+    :param store: The store to fill
+    :param lines: Text lines of the feed
+    :param fmt: "csv" or "jsonl"
+    :param chunk_size: Number of lines per chunk
+    :param on_reject: Reject handler, called in feed order
+    :param workers: Number of worker processes
+    :param stats: Counts to update
+    """
+    lines = iter(lines)
+    fieldnames = None
+    first_line = 1
+    if fmt == FORMAT_CSV:
+        fieldnames = _read_csv_header(lines)
+        first_line = 2
+    elif fmt != FORMAT_JSONL:
+        raise ValueError(f"Unknown feed format: {fmt!r}")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        while True:
+            while len(in_flight) < 2 * workers and (chunk := list(islice(lines, chunk_size))):
+                in_flight.append(pool.submit(_parse_chunk, chunk, fmt, fieldnames, first_line))
+                first_line += len(chunk)
+            if not in_flight:
+                break
+            names, prices, quantities, rejects = in_flight.popleft().result()
+            for line_number, record, error_name, message in rejects:
+                on_reject(line_number, record, _REJECT_ERRORS[error_name](message))
+            if names:
+                price_column = array("q")
+                price_column.frombytes(prices)
+                quantity_column = array("q")
+                quantity_column.frombytes(quantities)
+                store.add_rows(
+                    list(zip(names, price_column, quantity_column)),
+                    validate=False,
+                    in_cents=True,
+                )
+                stats.imported += len(quantity_column)
+
+
+def _parse_chunk(
+    lines: list[str], fmt: str, fieldnames: list[str] | None, first_line: int
+) -> tuple[list[str], bytes, bytes, list[tuple[int, object, str, str]]]:
+    """
+    Parse and validate one chunk of feed lines in a worker process.
+
+    The valid rows are returned as columns, with prices and quantities packed
+    into bytes, rather than as row tuples, so sending them back is cheap.
+    Prices are sent as int64 cents, converted with to_cents exactly as the
+    serial import does, so no precision is lost on the way.
+
+    :param lines: Lines of the chunk
+    :param fmt: "csv" or "jsonl"
+    :param fieldnames: CSV column names; unused for JSONL
+    :param first_line: Line number of the chunk's first line
+    :return: Tuple of (names, int64 prices in cents, int64 quantities,
+             rejects as (line number, raw record, error type name, message))
+    """
+    rejects = []
+
+    def collect_reject(line_number: int, record: object, error: Exception) -> None:
+        rejects.append((line_number, record, type(error).__name__, str(error)))
+
+    names = []
+    prices = array("q")
+    quantities = array("q")
+    records = _read_records(lines, fmt, fieldnames, first_line)
+    for name, price, quantity in validate_rows(records, fmt, collect_reject):
+        names.append(name)
+        prices.append(to_cents(price))
+        quantities.append(quantity)
+    return names, prices.tobytes(), quantities.tobytes(), rejects
@@ -13,9 +13,26 @@ Users can:
   stock validation and update.
 - Exit the application gracefully.
 
+With --batch FILE (or --batch - for stdin) the program runs a script instead
+of the menu: one command per line, either a menu number (1 = list products,
+2 = total quantity, 4 = quit) or a JSON request such as
+{"op": "order", "items": [["Google Pixel 7", 2]]}. Each command is answered
+with one JSON line on stdout, so sessions can be replayed and the store can
+run as a pipeline stage.
+
+With --metrics the store operations and command handlers are timed (see the
+metrics module), and the collected metrics are written to stderr on exit.
+
+Every change is recorded in a write-ahead log, and stock levels are saved to
+a binary snapshot on exit. On the next start the snapshot is loaded and the
+log replayed on top of it, so no sale is lost even after a crash; the
+hard-coded inventory is only used when no snapshot exists.
+
 Functions:
 - print_menu(): Prints the main menu options.
 - start(store): Starts the user interaction loop and handles input dispatching.
+- parse_args(): Parses the command-line arguments.
+- open_store(): Recovers the application store from its snapshot and log.
 
 Execution:
     Run this module directly to launch the application.
@@ -24,9 +41,18 @@ Author: Martin Haferanke
 Date: 2025-07-01
 """
 
+import argparse
+import sys
+
+import metrics
+from columnar_store import ColumnarStore
 from dispatcher import get_command_dispatcher
 from products import Product
 from store import Store
+from utils.batch import run_batch
+
+SNAPSHOT_PATH = "bestbuy.snapshot"
+WAL_PATH = "bestbuy.wal"
 
 # Set up the initial stock of inventory
 product_list = [
@@ -38,8 +64,6 @@ product_list = [
     Product("Apple Watch Series 7", price=1000, quantity=10),
 ]
 
-best_buy = Store(product_list)
-
 
 def print_menu():
     """Prints the main menu options."""
@@ -57,11 +81,11 @@ def start(store: Store):
     :param store: The store instance containing products.
     """
     print("Welcome to the Store Manager!")
+    dispatcher = get_command_dispatcher(store)
     while True:
         print_menu()
         choice = input("Enter your choice (1-4): ")
 
-        dispatcher = get_command_dispatcher(store)
         action = dispatcher.get(choice)
         if action:
             action()
@@ -69,5 +93,51 @@ def start(store: Store):
             print("Invalid choice. Please enter a number between 1 and 4.")
 
 
+def parse_args() -> argparse.Namespace:
+    """Parses the command-line arguments."""
+    parser = argparse.ArgumentParser(description="Bestbuy store manager.")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="run commands from FILE ('-' for stdin) and print JSON results",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="time store operations and print the metrics to stderr on exit",
+    )
+    return parser.parse_args()
+
+
+def open_store(snapshot_path: str = SNAPSHOT_PATH, wal_path: str = WAL_PATH) -> Store:
+    """
+    Recovers the application store and attaches its write-ahead log.
+
+    The store is a ColumnarStore, whose snapshot is loaded by copying the
+    columns into its arrays, so a catalog of millions of products starts in
+    a fraction of a second. Nothing is opened at import time, so importing
+    this module has no side effects on the files in the working directory.
+    :param snapshot_path: Snapshot file path
+    :param wal_path: Write-ahead log file path
+    :return: The recovered store
+    """
+    return ColumnarStore.recover(snapshot_path, wal_path, product_list)
+
+
 if __name__ == "__main__":
-    start(best_buy)
+    args = parse_args()
+    best_buy = open_store()
+    if args.metrics:
+        metrics.enable()
+    try:
+        if args.batch == "-":
+            run_batch(best_buy, sys.stdin, sys.stdout)
+        elif args.batch:
+            with open(args.batch, encoding="utf-8") as script:
+                run_batch(best_buy, script, sys.stdout)
+        else:
+            start(best_buy)
+    finally:
+        best_buy.checkpoint(SNAPSHOT_PATH)
+        if args.metrics:
+            sys.stderr.write(metrics.render_text())
@@ -0,0 +1,293 @@
+"""
+Opt-in instrumentation of the store's hot paths.
+
+This module records how often the main operations run, how long they take
+and when products sell out:
+- Store.order, Store.reserve, Store.confirm, Store.get_all_products and
+  Store.get_total_quantity, including the overrides of Store subclasses imported before enable()
+  is called, such as ColumnarStore.
+- Product.buy.
+- The command handlers in commands.
+- Stock-out events of every store.
+
+Latencies go into histograms with fixed bucket bounds, so recording a call
+is a bisect and a counter increment, and memory use does not grow with the
+number of calls.
+
+Instrumentation is off by default. enable() replaces the instrumented
+functions with timing wrappers and disable() puts the originals back, so
+while it is off the hot paths run exactly the code they would run without
+this module and cost nothing extra. Callers must therefore look the
+functions up at call time (commands.handle_list_products rather than a
+name imported before enable() was called).
+
+The recorded data is available as a dict from snapshot() and as text in
+the Prometheus exposition format from render_text().
+
+Classes:
+- LatencyHistogram: Call count, errors and latency buckets of one operation.
+
+Functions:
+- enable: Start recording.
+- disable: Stop recording and restore the original functions.
+- is_enabled: Whether recording is on.
+- reset: Clear everything recorded so far.
+- snapshot: The recorded data as a dict.
+- render_text: The recorded data in the Prometheus text format.
+"""
+
+import functools
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+import commands
+from products import ProductBase
+from store import Store
+
+# Upper bounds of the latency buckets in seconds; a final bucket catches the rest
+BUCKET_BOUNDS = (
+    1e-06, 2.5e-06, 5e-06, 1e-05, 2.5e-05, 5e-05, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+# Number of sold-out product names kept for snapshot()
+RECENT_STOCK_OUTS = 100
+
+# Prefix of every metric name in render_text()
+METRIC_PREFIX = "bestbuy"
+
+
+class LatencyHistogram:
+    """
+    Call count, error count and latency distribution of one operation.
+
+    :param bounds: Increasing upper bucket bounds in seconds
+    :type bounds: tuple[float, ...]
+    """
+
+    def __init__(self, bounds: tuple[float, ...] = BUCKET_BOUNDS):
+        """Constructor method"""
+        self.bounds = bounds
+        # counts[i] holds calls up to bounds[i]; the last entry holds the rest
+        self.counts = array("Q", bytes(8 * (len(bounds) + 1)))
+        self.total_seconds = 0.0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        """Number of recorded calls."""
+        return sum(self.counts)
+
+    def observe(self, seconds: float, failed: bool = False) -> None:
+        """
+        Record one call.
+
+        :param seconds: Duration of the call
+        :param failed: Whether the call raised an exception
+        """
+        bucket = bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[bucket] += 1
+            self.total_seconds += seconds
+            if failed:
+                self.errors += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """
+        Return the number of calls at or below each bound.
+
+        :return: (bound, count) pairs, ending with (inf, total count)
+        """
+        pairs = []
+        running = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+
+_lock = threading.Lock()
+_histograms: dict[str, LatencyHistogram] = {}
+_stock_outs = 0
+_recent_stock_outs: deque[str] = deque(maxlen=RECENT_STOCK_OUTS)
+# (owner, attribute, original) of every function replaced by enable()
+_originals: list[tuple[object, str, object]] = []
+
+
+def _store_classes() -> list[type]:
+    """Return Store and all of its subclasses."""
+    classes = [Store]
+    for cls in classes:
+        classes.extend(cls.__subclasses__())
+    return list(dict.fromkeys(classes))
+
+
+def _instrumented_functions() -> list[tuple[object, str, str]]:
+    """
+    List the functions to time.
+
+    :return: (owner, attribute, operation name) triples
+    """
+    targets = []
+    for cls in _store_classes():
+        for name in ("order", "reserve", "confirm", "get_all_products", "get_total_quantity"):
+            if name in vars(cls):
+                targets.append((cls, name, f"{cls.__name__}.{name}"))
+    targets.append((ProductBase, "buy", "Product.buy"))
+    for name in (
+        "handle_list_products",
+        "handle_show_total_quantity",
+        "handle_make_order",
+        "handle_quit_program",
+        "execute_request",
+    ):
+        targets.append((commands, name, f"commands.{name}"))
+    return targets
+
+
+def _timed(function, histogram: LatencyHistogram):
+    """
+    Wrap a function so that every call is recorded in a histogram.
+
+    :param function: Function to wrap
+    :param histogram: Histogram receiving the calls
+    :return: The wrapper
+    """
+    perf_counter = time.perf_counter
+    observe = histogram.observe
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        failed = False
+        try:
+            return function(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            observe(perf_counter() - start, failed)
+
+    return wrapper
+
+
+def _counting_sold_out(notify_sold_out):
+    """
+    Wrap Store._notify_sold_out so that stock-out events are counted.
+
+    :param notify_sold_out: The original method
+    :return: The wrapper
+    """
+
+    @functools.wraps(notify_sold_out)
+    def wrapper(self, products):
+        global _stock_outs
+        with _lock:
+            _stock_outs += len(products)
+            _recent_stock_outs.extend(product.name for product in products)
+        return notify_sold_out(self, products)
+
+    return wrapper
+
+
+def enable() -> None:
+    """Start recording by installing the timing wrappers; does nothing if already on."""
+    with _lock:
+        if _originals:
+            return
+        for owner, name, operation in _instrumented_functions():
+            original = getattr(owner, name) if owner is commands else vars(owner)[name]
+            histogram = _histograms.setdefault(operation, LatencyHistogram())
+            _originals.append((owner, name, original))
+            setattr(owner, name, _timed(original, histogram))
+        for cls in _store_classes():
+            if "_notify_sold_out" in vars(cls):
+                original = vars(cls)["_notify_sold_out"]
+                _originals.append((cls, "_notify_sold_out", original))
+                setattr(cls, "_notify_sold_out", _counting_sold_out(original))
+
+
+def disable() -> None:
+    """Stop recording by restoring the original functions; the data is kept."""
+    with _lock:
+        while _originals:
+            owner, name, original = _originals.pop()
+            setattr(owner, name, original)
+
+
+def is_enabled() -> bool:
+    """Return True while the timing wrappers are installed."""
+    return bool(_originals)
+
+
+def reset() -> None:
+    """Clear all recorded calls and stock-out events."""
+    global _stock_outs
+    with _lock:
+        for histogram in _histograms.values():
+            with histogram._lock:
+                histogram.counts = array("Q", bytes(8 * (len(histogram.bounds) + 1)))
+                histogram.total_seconds = 0.0
+                histogram.errors = 0
+        _stock_outs = 0
+        _recent_stock_outs.clear()
+
+
+def snapshot() -> dict:
+    """
+    Return the recorded data.
+
+    :return: Dict with "enabled", "operations" (per operation: count,
+        errors, total_seconds and cumulative buckets as [bound, count]
+        pairs), "stock_outs" and "recent_stock_outs" (names, oldest first)
+    """
+    with _lock:
+        operations = {}
+        for operation, histogram in _histograms.items():
+            with histogram._lock:
+                operations[operation] = {
+                    "count": histogram.count,
+                    "errors": histogram.errors,
+                    "total_seconds": histogram.total_seconds,
+                    "buckets": [[bound, count] for bound, count in histogram.cumulative()],
+                }
+        return {
+            "enabled": bool(_originals),
+            "operations": operations,
+            "stock_outs": _stock_outs,
+            "recent_stock_outs": list(_recent_stock_outs),
+        }
+
+
+def render_text() -> str:
+    """
+    Return the recorded data in the Prometheus text exposition format.
+
+    :return: Metric families separated by lines, ending with a newline
+    """
+    data = snapshot()
+    seconds = f"{METRIC_PREFIX}_operation_seconds"
+    errors = f"{METRIC_PREFIX}_operation_errors_total"
+    lines = [
+        f"# HELP {seconds} Latency of instrumented store operations.",
+        f"# TYPE {seconds} histogram",
+    ]
+    for operation, stats in data["operations"].items():
+        for bound, count in stats["buckets"]:
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{seconds}_bucket{{op="{operation}",le="{le}"}} {count}')
+        lines.append(f'{seconds}_sum{{op="{operation}"}} {stats["total_seconds"]!r}')
+        lines.append(f'{seconds}_count{{op="{operation}"}} {stats["count"]}')
+    lines.append(f"# HELP {errors} Instrumented calls that raised an exception.")
+    lines.append(f"# TYPE {errors} counter")
+    for operation, stats in data["operations"].items():
+        lines.append(f'{errors}{{op="{operation}"}} {stats["errors"]}')
+    stock_outs = f"{METRIC_PREFIX}_stock_outs_total"
+    lines.append(f"# HELP {stock_outs} Products whose stock dropped to zero.")
+    lines.append(f"# TYPE {stock_outs} counter")
+    lines.append(f"{stock_outs} {data['stock_outs']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,165 @@
+"""
+Micro-batching order scheduler.
+
+This module collects carts submitted by many threads and settles them
+together with Store.order_many, so validation, lock handling and log writes
+are paid once per batch instead of once per cart. A batch is settled as soon
+as it holds max_batch carts or its first cart has waited max_wait seconds,
+whichever comes first: a larger window raises throughput under load at the
+cost of latency, and max_wait=0 settles whatever has queued up so far.
+
+Each caller gets a Future that resolves to its cart's total price in cents or
+raises the error that rejected the cart. Carts are settled in submission
+order, with the same outcome as placing them one by one.
+
+Classes:
+- OrderScheduler: Batches submitted carts and settles them on a worker thread.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from products import Product
+from store import ON_ERROR_SKIP, Store
+
+
+class OrderScheduler:
+    """
+    Settle carts submitted from many threads in batches.
+
+    :param store: The store to order from
+    :type store: Store
+    :param max_batch: Largest number of carts settled together
+    :type max_batch: int
+    :param max_wait: Seconds the first cart of a batch waits for more carts
+    :type max_wait: float
+
+    :raises ValueError: If max_batch is not positive or max_wait is negative
+    """
+
+    def __init__(self, store: Store, max_batch: int = 64, max_wait: float = 0.001):
+        """Constructor method"""
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        if max_wait < 0:
+            raise ValueError("max_wait cannot be negative")
+        self.store = store
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending: deque[tuple[list[tuple[Product, int]], Future]] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="order-scheduler", daemon=True)
+        self._worker.start()
+
+    def __enter__(self) -> "OrderScheduler":
+        """Return the scheduler for use in a with block."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the scheduler when the with block ends."""
+        self.close()
+
+    def submit(self, shopping_list: list[tuple[Product, int]]) -> Future:
+        """
+        Queue a cart for the next batch.
+
+        :param shopping_list: A list of (Product, quantity) tuples
+        :return: Future resolving to the cart's total price in cents
+        :raises RuntimeError: If the scheduler is closed
+        """
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Order scheduler is closed")
+            self._pending.append((shopping_list, future))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        return future
+
+    def order(self, shopping_list: list[tuple[Product, int]]) -> int:
+        """
+        Submit a cart and wait for its result.
+
+        :param shopping_list: A list of (Product, quantity) tuples
+        :return: Total price of the order in cents
+        :raises ValueError: If the cart was rejected
+        """
+        return self.submit(shopping_list).result()
+
+    def close(self) -> None:
+        """Settle the carts already submitted and stop the worker thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._worker.join()
+
+    def _run(self) -> None:
+        """
+        Collect batches and settle them until closed.
+
+        If an exception that is not an Exception (e.g. SystemExit) stops the
+        worker, the carts of its batch fail with it, the scheduler is closed
+        and every cart still queued fails with RuntimeError, so no caller
+        waits forever on its future.
+        """
+        try:
+            while batch := self._next_batch():
+                self._settle(batch)
+        except BaseException as error:
+            with self._cond:
+                self._closed = True
+                pending = list(self._pending)
+                self._pending.clear()
+            for _, future in pending:
+                if future.set_running_or_notify_cancel():
+                    stopped = RuntimeError("Order scheduler stopped")
+                    stopped.__cause__ = error
+                    future.set_exception(stopped)
+
+    def _next_batch(self) -> list[tuple[list[tuple[Product, int]], Future]]:
+        """
+        Wait for the next batch to fill up or time out.
+
+        :return: Up to max_batch queued carts; empty once closed and drained
+        """
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch and not self._closed:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                self._cond.wait(timeout)
+            count = min(len(self._pending), self.max_batch)
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _settle(self, batch: list[tuple[list[tuple[Product, int]], Future]]) -> None:
+        """
+        Place a batch of carts and resolve their futures.
+
+        :param batch: Queued carts with their futures
+        """
+        carts = []
+        futures = []
+        for cart, future in batch:
+            if future.set_running_or_notify_cancel():
+                carts.append(cart)
+                futures.append(future)
+        try:
+            result = self.store.order_many(carts, on_error=ON_ERROR_SKIP)
+        except BaseException as error:
+            for future in futures:
+                future.set_exception(error)
+            # Anything beyond an ordinary error also stops the worker, see _run
+            if not isinstance(error, Exception):
+                raise
+            return
+        for idx, future in enumerate(futures):
+            if idx in result.failures:
+                future.set_exception(result.failures[idx])
+            else:
+                future.set_result(result.totals[idx])
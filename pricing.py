@@ -0,0 +1,456 @@
+"""
+Promotion rules and the pricing engine used by Store orders.
+
+This module prices the lines of an order with promotions applied:
+- Tiered discounts: a percentage off a line once its quantity reaches a tier.
+- N-th item discounts, e.g. every second item at half price.
+- Bundle discounts: a fixed amount off for every complete set of products.
+- Time windows: any rule can be limited to a start and end time.
+
+Rules are not evaluated one by one for each order. Whenever the rule set
+changes, or a time window opens or closes, the engine compiles the active
+rules into lookup tables keyed by product: one merged tier table and the
+n-th item discounts per product, and the bundles each product belongs to.
+Pricing an order then costs a few lookups per line, however many rules are
+active. The tables hold percentages and amounts rather than prices, so
+repricing a product needs no recompilation.
+
+On each line the single line discount that saves the most applies; bundle
+discounts are added on top. Each unit counts toward at most one bundle, and
+bundles with the larger discount are filled first. Percentage discounts are
+rounded down to whole cents.
+
+Classes:
+- PricingRule: Base class of all rules, with the optional time window.
+- TieredDiscount: Percentage off a line by quantity tier.
+- NthItemDiscount: Percentage off every n-th unit of a product.
+- BundleDiscount: Fixed amount off each complete set of products.
+- CompiledPricing: Lookup tables built from the active rules.
+- PricingEngine: Holds the rules and prices orders with the compiled tables.
+"""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from collections.abc import Iterable
+
+from products import Product, to_cents
+
+
+class PricingRule(ABC):
+    """
+    A promotion, optionally limited to a time window.
+
+    This is an abstract base class. Subclasses describe their effect by
+    adding entries to a CompiledPricing in add_to, so new kinds of promotion
+    can be plugged in without changing the engine.
+
+    :param starts_at: Time (as from time.time) the rule takes effect, or None for always
+    :type starts_at: float | None
+    :param ends_at: Time the rule stops applying, or None for never
+    :type ends_at: float | None
+
+    :raises ValueError: If the window ends before it starts
+    """
+
+    def __init__(self, starts_at: float | None = None, ends_at: float | None = None):
+        """Constructor method"""
+        if starts_at is not None and ends_at is not None and ends_at <= starts_at:
+            raise ValueError("A rule must end after it starts")
+        self.starts_at = starts_at
+        self.ends_at = ends_at
+
+    def is_active(self, now: float) -> bool:
+        """
+        Check whether the rule applies at a given time.
+
+        :param now: Time as from time.time
+        :return: True if now lies within the rule's window
+        """
+        return (self.starts_at is None or self.starts_at <= now) and (
+            self.ends_at is None or now < self.ends_at
+        )
+
+    @abstractmethod
+    def add_to(self, compiled: "CompiledPricing") -> None:
+        """
+        Add the rule's effect to compiled lookup tables.
+
+        :param compiled: Tables being built from the active rules
+        """
+
+    @staticmethod
+    def validate_percent(percent) -> None:
+        """
+        Validate a discount percentage.
+
+        :param percent: Discount between 0 and 100
+        :raises TypeError: If percent is not a number
+        :raises ValueError: If percent is outside 0 to 100
+        """
+        if not isinstance(percent, (int, float)):
+            raise TypeError("Percent must be a number")
+        if not 0 <= percent <= 100:
+            raise ValueError("Percent must be between 0 and 100")
+
+
+class TieredDiscount(PricingRule):
+    """
+    Take a percentage off a whole line once its quantity reaches a tier.
+
+    For example, tiers [(10, 5), (50, 12)] give 5% off 10 to 49 units and 12%
+    off 50 units or more.
+
+    :param product: The discounted product
+    :type product: Product
+    :param tiers: (minimum quantity, percent) pairs
+    :type tiers: Iterable[tuple[int, float]]
+
+    :raises ValueError: If there are no tiers or a tier is invalid
+    """
+
+    def __init__(
+        self,
+        product: Product,
+        tiers: Iterable[tuple[int, float]],
+        starts_at: float | None = None,
+        ends_at: float | None = None,
+    ):
+        """Constructor method"""
+        super().__init__(starts_at, ends_at)
+        self.product = product
+        self.tiers = sorted(tiers)
+        if not self.tiers:
+            raise ValueError("A tiered discount needs at least one tier")
+        for min_quantity, percent in self.tiers:
+            Product.validate_quantity(min_quantity)
+            self.validate_percent(percent)
+
+    def add_to(self, compiled: "CompiledPricing") -> None:
+        """Add the tiers to the product's tier table."""
+        for min_quantity, percent in self.tiers:
+            compiled.add_tier(self.product, min_quantity, percent)
+
+
+class NthItemDiscount(PricingRule):
+    """
+    Take a percentage off every n-th unit of a product.
+
+    NthItemDiscount(product, 2, 50) makes every second item half price.
+
+    :param product: The discounted product
+    :type product: Product
+    :param every: Which unit is discounted, e.g. 2 for every second one
+    :type every: int
+    :param percent: Discount on that unit
+    :type percent: float
+
+    :raises ValueError: If every is below 1 or percent is out of range
+    """
+
+    def __init__(
+        self,
+        product: Product,
+        every: int,
+        percent: float,
+        starts_at: float | None = None,
+        ends_at: float | None = None,
+    ):
+        """Constructor method"""
+        super().__init__(starts_at, ends_at)
+        Product.validate_quantity(every)
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        self.validate_percent(percent)
+        self.product = product
+        self.every = every
+        self.percent = percent
+
+    def add_to(self, compiled: "CompiledPricing") -> None:
+        """Add the discount to the product's n-th item list."""
+        compiled.add_nth_item(self.product, self.every, self.percent)
+
+
+class BundleDiscount(PricingRule):
+    """
+    Take a fixed amount off for every complete set of some products.
+
+    :param products: Products making up one set; list a product twice to need two
+    :type products: Iterable[Product]
+    :param discount: Amount off per set, in major currency units
+    :type discount: float
+
+    :raises ValueError: If the bundle is empty or the discount is negative
+    """
+
+    def __init__(
+        self,
+        products: Iterable[Product],
+        discount: float,
+        starts_at: float | None = None,
+        ends_at: float | None = None,
+    ):
+        """Constructor method"""
+        super().__init__(starts_at, ends_at)
+        Product.validate_price(discount)
+        self.items: dict[Product, int] = {}
+        for product in products:
+            self.items[product] = self.items.get(product, 0) + 1
+        if not self.items:
+            raise ValueError("A bundle needs at least one product")
+        self.discount_cents = to_cents(discount)
+
+    def add_to(self, compiled: "CompiledPricing") -> None:
+        """Register the bundle with each of its products."""
+        compiled.add_bundle(self.items, self.discount_cents)
+
+
+class CompiledPricing:
+    """
+    Lookup tables built from a set of active rules.
+
+    Per product, tier thresholds are merged into one sorted step table whose
+    percentage is the best of all tiers reached, and n-th item discounts are
+    kept only if no other one on the product saves at least as much for every
+    quantity. Both end up in a single entry per product, so a line costs one
+    dict lookup. Bundles are ranked by discount once, so an order only sorts
+    the ranks of the bundles its products belong to.
+    """
+
+    def __init__(self):
+        """Constructor method"""
+        self._tier_steps: dict[Product, dict[int, float]] = {}
+        self._nth_items: dict[Product, list[tuple[int, float]]] = {}
+        self._bundles: list[tuple[dict[Product, int], int]] = []
+        # Product -> (sorted thresholds, best percent from each threshold on,
+        # n-th item discounts as (every, percent))
+        self.lines: dict[Product, tuple[list[int], list[float], list[tuple[int, float]]]] = {}
+        # Product -> ranks of the bundles containing it; rank -> (items, discount in cents)
+        self.bundles: dict[Product, list[int]] = {}
+        self.ranked_bundles: list[tuple[dict[Product, int], int]] = []
+
+    def add_tier(self, product: Product, min_quantity: int, percent: float) -> None:
+        """
+        Add a quantity tier to a product.
+
+        :param product: Discounted product
+        :param min_quantity: Quantity from which the tier applies
+        :param percent: Discount on the whole line
+        """
+        steps = self._tier_steps.setdefault(product, {})
+        steps[min_quantity] = max(percent, steps.get(min_quantity, 0))
+
+    def add_nth_item(self, product: Product, every: int, percent: float) -> None:
+        """
+        Add an n-th item discount to a product.
+
+        :param product: Discounted product
+        :param every: Which unit is discounted
+        :param percent: Discount on that unit
+        """
+        discounts = self._nth_items.setdefault(product, [])
+        # A discount is dominated by one that comes at least as often and
+        # takes off at least as much
+        if any(other <= every and other_percent >= percent for other, other_percent in discounts):
+            return
+        discounts[:] = [
+            (other, other_percent)
+            for other, other_percent in discounts
+            if not (every <= other and percent >= other_percent)
+        ]
+        discounts.append((every, percent))
+
+    def add_bundle(self, items: dict[Product, int], discount_cents: int) -> None:
+        """
+        Add a bundle of products.
+
+        :param items: Units of each product in one set
+        :param discount_cents: Amount off per set
+        """
+        self._bundles.append((items, discount_cents))
+
+    def finish(self) -> None:
+        """Merge the collected rules into the per-product lookup tables."""
+        for product in self._tier_steps.keys() | self._nth_items.keys():
+            steps = self._tier_steps.get(product, {})
+            thresholds = sorted(steps)
+            percents = []
+            best = 0
+            for threshold in thresholds:
+                best = max(best, steps[threshold])
+                percents.append(best)
+            self.lines[product] = (thresholds, percents, self._nth_items.get(product, []))
+        # sorted is stable, so equal discounts keep the order the rules were added in
+        self.ranked_bundles = sorted(self._bundles, key=lambda bundle: -bundle[1])
+        for rank, (items, _) in enumerate(self.ranked_bundles):
+            for product in items:
+                self.bundles.setdefault(product, []).append(rank)
+        self._tier_steps, self._nth_items, self._bundles = {}, {}, []
+
+    def total(self, lines: dict[Product, int]) -> int:
+        """
+        Price an order.
+
+        :param lines: Ordered quantity per product
+        :return: Total price in cents after discounts
+        """
+        tables = self.lines
+        total = 0
+        for product, quantity in lines.items():
+            price_cents = product.price_cents
+            amount = price_cents * quantity
+            table = tables.get(product)
+            if table is not None:
+                thresholds, percents, nth_items = table
+                best = 0
+                if thresholds:
+                    step = bisect_right(thresholds, quantity) - 1
+                    if step >= 0:
+                        best = int(amount * percents[step] // 100)
+                for every, percent in nth_items:
+                    discount = int(price_cents * (quantity // every) * percent // 100)
+                    if discount > best:
+                        best = discount
+                amount -= best
+            total += amount
+        if self.bundles:
+            total -= self.bundle_discount(lines)
+        return max(total, 0)
+
+    def bundle_discount(self, lines: dict[Product, int]) -> int:
+        """
+        Find the bundle discounts earned by an order.
+
+        :param lines: Ordered quantity per product
+        :return: Discount in cents
+        """
+        bundles = self.bundles
+        ranks = set()
+        for product in lines:
+            product_ranks = bundles.get(product)
+            if product_ranks is not None:
+                ranks.update(product_ranks)
+        if not ranks:
+            return 0
+        ranked_bundles = self.ranked_bundles
+        # Copied before the first bundle consumes any units
+        remaining = lines
+        total = 0
+        for rank in sorted(ranks):
+            items, discount_cents = ranked_bundles[rank]
+            sets = 0
+            for product, count in items.items():
+                available = remaining.get(product, 0) // count
+                if not available:
+                    sets = 0
+                    break
+                if not sets or available < sets:
+                    sets = available
+            if sets:
+                if remaining is lines:
+                    remaining = dict(lines)
+                total += sets * discount_cents
+                for product, count in items.items():
+                    remaining[product] -= sets * count
+        return total
+
+
+class PricingEngine:
+    """
+    Price orders with the active promotion rules.
+
+    The rules are compiled into a CompiledPricing on the first order after
+    they change, and again whenever a rule's time window opens or closes.
+
+    :param rules: Initial rules
+    :type rules: Iterable[PricingRule]
+    """
+
+    def __init__(self, rules: Iterable[PricingRule] = ()):
+        """Constructor method"""
+        self._rules: dict[PricingRule, None] = dict.fromkeys(rules)
+        self._lock = threading.Lock()
+        # (tables, valid_from, valid_until): the tables are valid for times in
+        # [valid_from, valid_until). Published as one tuple so that lock-free
+        # readers never pair new tables with old bounds; None after a change.
+        self._compiled: tuple[CompiledPricing, float, float] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of rules, active or not."""
+        return len(self._rules)
+
+    def add_rule(self, rule: PricingRule) -> None:
+        """
+        Add a promotion rule.
+
+        :param rule: Rule to add
+        """
+        with self._lock:
+            self._rules[rule] = None
+            self._compiled = None
+
+    def remove_rule(self, rule: PricingRule) -> None:
+        """
+        Remove a promotion rule.
+
+        :param rule: Rule to remove
+        :raises ValueError: If the rule was not added
+        """
+        with self._lock:
+            if rule not in self._rules:
+                raise ValueError("Rule not found in the pricing engine")
+            del self._rules[rule]
+            self._compiled = None
+
+    def compile(self, now: float | None = None) -> CompiledPricing:
+        """
+        Get the lookup tables for a point in time, compiling them if needed.
+
+        :param now: Time as from time.time; defaults to the current time
+        :return: Tables built from the rules active at that time
+        """
+        now = time.time() if now is None else now
+        compiled = self._compiled
+        if compiled is not None and compiled[1] <= now < compiled[2]:
+            return compiled[0]
+        with self._lock:
+            compiled = self._compiled
+            if compiled is None or not compiled[1] <= now < compiled[2]:
+                compiled = self._compiled = self._compile(now)
+            return compiled[0]
+
+    def _compile(self, now: float) -> tuple[CompiledPricing, float, float]:
+        """
+        Build the tables for the rules active at a point in time.
+
+        Callers must hold the engine's lock.
+
+        :param now: Time as from time.time
+        :return: Tuple of (tables, valid_from, valid_until)
+        """
+        compiled = CompiledPricing()
+        valid_from, valid_until = -math.inf, math.inf
+        for rule in self._rules:
+            for boundary in (rule.starts_at, rule.ends_at):
+                if boundary is None:
+                    continue
+                if boundary <= now:
+                    valid_from = max(valid_from, boundary)
+                else:
+                    valid_until = min(valid_until, boundary)
+            if rule.is_active(now):
+                rule.add_to(compiled)
+        compiled.finish()
+        return compiled, valid_from, valid_until
+
+    def total(self, lines: dict[Product, int], now: float | None = None) -> int:
+        """
+        Price an order with the promotions active at a point in time.
+
+        :param lines: Ordered quantity per product
+        :param now: Time as from time.time; defaults to the current time
+        :return: Total price in cents after discounts
+        """
+        return self.compile(now).total(lines)
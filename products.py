@@ -1,32 +1,50 @@
-class Product:
+import gc
+import math
+import threading
+
+# Serializes the lazy creation of per-product locks
+_LOCK_CREATION = threading.Lock()
+
+# Minor currency units per major unit, e.g. cents per dollar
+CENTS_PER_UNIT = 100
+
+
+def to_cents(price: float) -> int:
     """
-    A class to represent a product with pricing, quantity, and availability logic.
+    Convert a price in major currency units to whole cents, rounding to the nearest cent.
 
-    This class handles product validation, stock control, activation status,
-    and purchasing logic. It ensures that all inputs are valid upon initialization
-    and provides methods for safe modification and querying of the product state.
+    :param price: Price such as 19.99
+    :return: Price in cents, e.g. 1999
+    """
+    if price.__class__ is int:
+        return price * CENTS_PER_UNIT
+    return round(price * CENTS_PER_UNIT)
 
-    :param name: Name of the product.
-    :type name: str
-    :param price: Price of the product. Must be a non-negative number.
-    :type price: float
-    :param quantity: Available stock. Must be a non-negative integer.
-    :type quantity: int
 
-    :raises TypeError: If the name is not a string, or if price/quantity have incorrect types.
-    :raises ValueError: If the name is empty/whitespace, or if price/quantity are negative.
+def format_cents(cents: int) -> str:
     """
+    Format an amount of cents as a decimal price with two places.
 
-    def __init__(self, name: str, price: float, quantity: int):
-        """Constructor method"""
-        self.validate_name(name)
-        self.validate_price(price)
-        self.validate_quantity(quantity)
+    :param cents: Amount in cents, e.g. 145000
+    :return: Formatted price, e.g. "1450.00"
+    """
+    sign = "-" if cents < 0 else ""
+    units, cents = divmod(abs(cents), CENTS_PER_UNIT)
+    return f"{sign}{units}.{cents:02d}"
 
-        self.name = name
-        self.price = float(price)
-        self.quantity = quantity
-        self.active = True
+
+class ProductBase:
+    """
+    The stock control, activation and purchasing logic shared by all products.
+
+    Subclasses keep the state: they provide the name, price_cents, price,
+    quantity and active attributes and a _lock guarding check-then-modify
+    sequences on the stock. ProductBase declares no instance attributes, so
+    each subclass chooses its own memory layout; use isinstance(obj,
+    ProductBase) to accept any kind of product.
+    """
+
+    __slots__ = ()
 
     def get_quantity(self) -> int:
         """
@@ -43,10 +61,11 @@ class Product:
         :param quantity: New quantity (int)
         """
         self.validate_quantity(quantity)
-        self.quantity = quantity
+        with self._lock:
+            self.quantity = quantity
 
-        if self.quantity <= 0:
-            self.active = False
+            if self.quantity <= 0:
+                self.active = False
 
     def is_active(self) -> bool:
         """
@@ -58,37 +77,47 @@ class Product:
 
     def activate(self) -> None:
         """Activates the product"""
-        self.active = True
+        with self._lock:
+            self.active = True
 
     def deactivate(self) -> None:
         """Deactivates the product"""
-        self.active = False
+        with self._lock:
+            self.active = False
 
     def show(self) -> None:
         """
         Prints a string that represents the product.
-        For example, "MacBook Air M2, Price: 1450, Quantity: 100"
+        For example, "MacBook Air M2, Price: 1450.00, Quantity: 100"
         """
-        print(f"{self.name}, Price: {self.price}, Quantity: {self.quantity}")
+        print(f"{self.name}, Price: {format_cents(self.price_cents)}, Quantity: {self.quantity}")
 
-    def buy(self, quantity: int) -> float:
+    def buy(self, quantity: int) -> int:
         """
         Purchases a specified quantity of the product and updates the stock accordingly.
         Edge cases: negative quantity, quantity greater than the quantity of the product.
         :param quantity: Quantity to buy (int)
-        :return: Total price of the purchase (float)
+        :return: Total price of the purchase in cents (int)
         :raises ValueError: If the requested quantity is greater than the available stock.
         """
         self.validate_quantity(quantity)
-        self.validate_stock(quantity)
+        with self._lock:
+            self.validate_stock(quantity)
+            self._remove_stock(quantity)
+        return self.price_cents * quantity
+
+    def _remove_stock(self, quantity: int) -> None:
+        """
+        Decrements the stock without validation. Callers must hold the product's
+        lock and have checked the quantity and the available stock beforehand.
+        :param quantity: Quantity to remove (int)
+        """
         self.quantity -= quantity
 
         # Deactivate the product if it reaches 0
         if self.quantity == 0:
             self.active = False
 
-        return self.price * quantity
-
     def validate_stock(self, requested_quantity: int) -> None:
         """
         Validates that enough stocks are available for the requested quantity.
@@ -119,13 +148,15 @@ class Product:
     def validate_price(price) -> None:
         """
         Validates the price of the product.
-        Edge cases: negative number, type error
+        Edge cases: negative number, infinity or NaN, type error
         :param price: Price of the product (float)
         """
         if not isinstance(price, (int, float)):
             raise TypeError("Price must be a number")
         if price < 0:
             raise ValueError("Price cannot be negative")
+        if not math.isfinite(price):
+            raise ValueError("Price must be finite")
 
     @staticmethod
     def validate_quantity(quantity) -> None:
@@ -140,13 +171,191 @@ class Product:
             raise ValueError("Quantity cannot be negative")
 
 
+
+class Product(ProductBase):
+    """
+    A class to represent a product with pricing, quantity, and availability logic.
+
+    This class handles product validation, stock control, activation status,
+    and purchasing logic. It ensures that all inputs are valid upon initialization
+    and provides methods for safe modification and querying of the product state.
+
+    The price is stored as an integer number of cents, so order totals are
+    exact however many items are added up. The price attribute converts to
+    and from major currency units for convenience.
+
+    :param name: Name of the product.
+    :type name: str
+    :param price: Price of the product. Must be a non-negative number.
+    :type price: float
+    :param quantity: Available stock. Must be a non-negative integer.
+    :type quantity: int
+
+    :raises TypeError: If the name is not a string, or if price/quantity have incorrect types.
+    :raises ValueError: If the name is empty/whitespace, or if price/quantity are negative.
+    """
+
+    # No per-instance __dict__: large catalogs hold millions of products
+    __slots__ = ("name", "_price_cents", "_quantity", "_active", "_stores", "_lock_object")
+
+    def __init__(self, name: str, price: float, quantity: int):
+        """Constructor method"""
+        self.validate_name(name)
+        self.validate_price(price)
+        self.validate_quantity(quantity)
+
+        # Weak references to the stores holding this product; they are notified of
+        # stock and status changes. Weak, so a store that is dropped without
+        # removing its products is freed and no longer notified. A tuple is
+        # replaced as a whole, so notifying never sees a half-updated list.
+        self._stores = ()
+        # Created on first use, see _lock
+        self._lock_object = None
+        self.name = name
+        self._price_cents = to_cents(price)
+        self._quantity = quantity
+        self._active = True
+
+    @classmethod
+    def from_trusted_rows(
+        cls, rows, validate: bool = True, in_cents: bool = False
+    ) -> list["Product"]:
+        """
+        Builds products in bulk from (name, price, quantity) rows.
+
+        The whole batch is checked in a single pass with the same rules as
+        validate_name, validate_price and validate_quantity, and the products
+        are then created without running the validators again for each object.
+        Pass validate=False only for rows from a source that is already known
+        to be valid, such as a checksummed snapshot.
+        :param rows: Iterable of (name, price, quantity) tuples
+        :param validate: Whether to check the rows before building the products
+        :param in_cents: Whether the prices are already integer cents
+        :return: List of new, active products in row order
+        :raises TypeError: If a field has the wrong type
+        :raises ValueError: If a field has an invalid value
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        if validate:
+            cls._validate_rows(rows)
+        convert = None if in_cents else to_cents
+
+        new = cls.__new__
+        products = []
+        append = products.append
+        # The new objects form no reference cycles, so pausing the cyclic garbage
+        # collector avoids repeated full-heap scans while millions are allocated
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for name, price, quantity in rows:
+                product = new(cls)
+                product._stores = ()
+                product._lock_object = None
+                product.name = name
+                product._price_cents = price if convert is None else convert(price)
+                product._quantity = quantity
+                product._active = True
+                append(product)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return products
+
+    @staticmethod
+    def _validate_rows(rows: list) -> None:
+        """
+        Validates a batch of (name, price, quantity) rows in one pass.
+        :param rows: List of (name, price, quantity) tuples
+        :raises TypeError: If a field has the wrong type
+        :raises ValueError: If a field has an invalid value
+        """
+        number_types = (int, float)
+        for name, price, quantity in rows:
+            if (
+                name.__class__ is not str
+                or not name.strip()
+                or not isinstance(price, number_types)
+                or not 0 <= price < math.inf
+                or quantity.__class__ is not int
+                or quantity < 0
+            ):
+                # Slow path: let the per-field validators raise the precise error
+                Product.validate_name(name)
+                Product.validate_price(price)
+                Product.validate_quantity(quantity)
+
+    @property
+    def _lock(self) -> threading.Lock:
+        """Lock guarding check-then-modify sequences on the stock, created on first use."""
+        lock = self._lock_object
+        if lock is None:
+            with _LOCK_CREATION:
+                lock = self._lock_object
+                if lock is None:
+                    lock = self._lock_object = threading.Lock()
+        return lock
+
+    @property
+    def price_cents(self) -> int:
+        """Unit price of the product in cents."""
+        return self._price_cents
+
+    @price_cents.setter
+    def price_cents(self, price_cents: int) -> None:
+        old_price_cents = self._price_cents
+        self._price_cents = price_cents
+        for store_ref in self._stores:
+            store = store_ref()
+            if store is not None:
+                store._on_price_changed(self, old_price_cents, price_cents)
+
+    @property
+    def price(self) -> float:
+        """Unit price of the product in major currency units."""
+        return self._price_cents / CENTS_PER_UNIT
+
+    @price.setter
+    def price(self, price: float) -> None:
+        self.price_cents = to_cents(price)
+
+    @property
+    def quantity(self) -> int:
+        """Current stock of the product."""
+        return self._quantity
+
+    @quantity.setter
+    def quantity(self, quantity: int) -> None:
+        old_quantity = self._quantity
+        self._quantity = quantity
+        for store_ref in self._stores:
+            store = store_ref()
+            if store is not None:
+                store._on_quantity_changed(self, old_quantity, quantity)
+
+    @property
+    def active(self) -> bool:
+        """Whether the product is available for sale."""
+        return self._active
+
+    @active.setter
+    def active(self, active: bool) -> None:
+        if active == self._active:
+            return
+        self._active = active
+        for store_ref in self._stores:
+            store = store_ref()
+            if store is not None:
+                store._on_active_changed(self)
+
+
 def main():
     """Main function to test the Product class."""
     bose = Product("Bose QuietComfort Earbuds", price=250, quantity=500)
     mac = Product("MacBook Air M2", price=1450, quantity=100)
 
-    print(bose.buy(50))
-    print(mac.buy(100))
+    print(format_cents(bose.buy(50)))
+    print(format_cents(mac.buy(100)))
     print(mac.is_active())
 
     bose.show()
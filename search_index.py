@@ -0,0 +1,438 @@
+"""
+Search index over product names.
+
+This module provides the index behind Store.search_prefix and
+Store.search_tokens. Names are case-folded and kept in a sorted list, so a
+prefix search is a binary search followed by a short walk over the matches,
+and every word of a name is mapped to the products containing it, so a token
+search is a few dict lookups. Both stay fast on catalogs with millions of
+products.
+
+The index holds every product of a store; results only include products that
+are active at query time, so deactivating a product needs no index update.
+
+SlotSearchIndex answers the same queries for a ColumnarStore, whose products
+are numbered slots. It holds integers only (slots in name order, and token
+hashes with their slots) and reads the names from the store when it compares
+or checks them, so it adds a few dozen bytes per product instead of several
+Python objects.
+
+Classes:
+- SearchIndex: Sorted-name and token index over a set of products.
+- SlotSearchIndex: Sorted-slot and token-hash index over numbered slots.
+"""
+
+import gc
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Iterable, Sequence
+from heapq import merge
+from operator import itemgetter
+
+from products import Product
+
+# Default number of results returned by a search
+DEFAULT_SEARCH_LIMIT = 100
+
+_TOKEN = re.compile(r"\w+")
+
+# Bits reserved for the slot when SlotSearchIndex packs a token hash and a slot into one int
+_SLOT_BITS = 40
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into case-folded words.
+
+    :param text: Product name or query
+    :return: Words in order of appearance
+    """
+    return _TOKEN.findall(text.casefold())
+
+
+class SearchIndex:
+    """
+    An index for case-insensitive prefix and word search over product names.
+
+    Sorted names live in a large main run and a small run of recent additions,
+    which is merged into the main run once it grows past a fraction of it.
+    This keeps single inserts cheap on large catalogs. Products with the same
+    case-folded name are returned in the order they were added.
+
+    :param products: Products to index, in catalog order
+    :type products: Iterable[Product]
+    """
+
+    def __init__(self, products: Iterable[Product] = ()):
+        """Constructor method"""
+        # Case-folded names in sorted order, with the product of each key alongside
+        self._keys: list[str] = []
+        self._entries: list[Product] = []
+        self._recent_keys: list[str] = []
+        self._recent_entries: list[Product] = []
+        # Word -> products whose name contains it, in insertion order
+        self._tokens: dict[str, dict[Product, None]] = {}
+        self.add_many(products)
+
+    def __len__(self) -> int:
+        """Return the number of indexed products."""
+        return len(self._keys) + len(self._recent_keys)
+
+    def add(self, product: Product, name: str | None = None) -> None:
+        """
+        Index a product.
+
+        :param product: Product to add
+        :param name: Name to index the product under; defaults to product.name
+        """
+        name = product.name if name is None else name
+        key = name.casefold()
+        position = bisect_right(self._recent_keys, key)
+        self._recent_keys.insert(position, key)
+        self._recent_entries.insert(position, product)
+        for token in tokenize(name):
+            self._tokens.setdefault(token, {})[product] = None
+        if len(self._recent_keys) > max(1024, len(self._keys) // 64):
+            self._merge_recent()
+
+    def add_many(self, products: Iterable[Product]) -> None:
+        """
+        Index several products.
+
+        Large batches are appended and sorted once instead of being inserted
+        one at a time, with the garbage collector paused while the many small
+        token dicts are allocated.
+
+        :param products: Products to add, in catalog order
+        """
+        products = list(products)
+        if len(products) < 1024:
+            for product in products:
+                self.add(product)
+            return
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            names = [product.name for product in products]
+            tokens = self._tokens
+            for product, name in zip(products, names):
+                for token in tokenize(name):
+                    posting = tokens.get(token)
+                    if posting is None:
+                        posting = tokens[token] = {}
+                    posting[product] = None
+            self._recent_keys += [name.casefold() for name in names]
+            self._recent_entries += products
+            self._merge_recent()
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _merge_recent(self) -> None:
+        """Merge the recent additions into the main sorted run."""
+        keys = self._keys + self._recent_keys
+        entries = self._entries + self._recent_entries
+        # sorted is stable, so namesakes stay in insertion order
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._keys = [keys[position] for position in order]
+        self._entries = [entries[position] for position in order]
+        self._recent_keys = []
+        self._recent_entries = []
+
+    def remove(self, product: Product, name: str | None = None) -> None:
+        """
+        Remove a product from the index.
+
+        :param product: Product to remove
+        :param name: Name the product was indexed under; defaults to product.name
+        :raises ValueError: If the product is not indexed under that name
+        """
+        name = product.name if name is None else name
+        key = name.casefold()
+        if not (
+            self._remove_entry(self._recent_keys, self._recent_entries, key, product)
+            or self._remove_entry(self._keys, self._entries, key, product)
+        ):
+            raise ValueError("Product is not in the search index")
+        for token in set(tokenize(name)):
+            products = self._tokens[token]
+            del products[product]
+            if not products:
+                del self._tokens[token]
+
+    @staticmethod
+    def _remove_entry(keys: list[str], entries: list[Product], key: str, product: Product) -> bool:
+        """
+        Remove a product from one sorted run.
+
+        :param keys: Sorted keys of the run
+        :param entries: Products of the run
+        :param key: Case-folded name of the product
+        :param product: Product to remove
+        :return: True if the product was found and removed
+        """
+        start = bisect_left(keys, key)
+        for position in range(start, bisect_right(keys, key, start)):
+            if entries[position] == product:
+                del keys[position]
+                del entries[position]
+                return True
+        return False
+
+    def prefix(self, prefix: str, limit: int | None = DEFAULT_SEARCH_LIMIT) -> list[Product]:
+        """
+        Find active products whose name starts with a prefix, ignoring case.
+
+        :param prefix: Start of the name
+        :param limit: Largest number of results, or None for all
+        :return: Matching products in name order
+        """
+        key = prefix.casefold()
+        matches = self._prefix_matches(self._keys, self._entries, key, limit)
+        if self._recent_keys:
+            recent = self._prefix_matches(self._recent_keys, self._recent_entries, key, limit)
+            matches = list(merge(matches, recent, key=itemgetter(0)))[:limit]
+        return [product for _, product in matches]
+
+    @staticmethod
+    def _prefix_matches(
+        keys: list[str], entries: list[Product], key: str, limit: int | None
+    ) -> list[tuple[str, Product]]:
+        """
+        Collect the active products of one sorted run whose key starts with a prefix.
+
+        :param keys: Sorted keys of the run
+        :param entries: Products of the run
+        :param key: Case-folded prefix
+        :param limit: Largest number of results, or None for all
+        :return: (key, product) pairs in key order
+        """
+        matches = []
+        position = bisect_left(keys, key)
+        while position < len(keys) and keys[position].startswith(key):
+            product = entries[position]
+            if product.active:
+                if len(matches) == limit:
+                    break
+                matches.append((keys[position], product))
+            position += 1
+        return matches
+
+    def tokens(self, query: str, limit: int | None = DEFAULT_SEARCH_LIMIT) -> list[Product]:
+        """
+        Find active products whose name contains every word of a query, ignoring case.
+
+        :param query: One or more words
+        :param limit: Largest number of results, or None for all
+        :return: Matching products in the order they were indexed
+        """
+        words = set(tokenize(query))
+        if not words:
+            return []
+        candidates = []
+        for word in words:
+            products = self._tokens.get(word)
+            if not products:
+                return []
+            candidates.append(products)
+        candidates.sort(key=len)
+        smallest, others = candidates[0], candidates[1:]
+        results = []
+        for product in smallest:
+            if product.active and all(product in products for products in others):
+                if len(results) == limit:
+                    break
+                results.append(product)
+        return results
+
+
+class SlotSearchIndex:
+    """
+    An index for case-insensitive prefix and word search over numbered slots.
+
+    Slots are kept in an array sorted by case-folded name, and every word of
+    a name is recorded as a (hash of the word, slot) pair in two parallel
+    arrays sorted by hash. Names are not copied: binary searches and result
+    checks read them through names. A token match is confirmed against the
+    slot's current name, so hash collisions and removed slots never show up
+    in results. Like SearchIndex, recent additions are kept in a small
+    separate run until they are merged.
+
+    :param names: Name of each slot, None for removed slots
+    :type names: Sequence[str | None]
+    :param is_active: Tells whether the product in a slot is active
+    :type is_active: Callable[[int], bool]
+    :param slots: Slots to index, in increasing order
+    :type slots: Iterable[int]
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str | None],
+        is_active: Callable[[int], bool],
+        slots: Iterable[int] = (),
+    ):
+        """Constructor method"""
+        self._names = names
+        self._is_active = is_active
+        # Slots in order of case-folded name; namesakes in slot order
+        self._sorted = array("q")
+        self._recent_keys: list[str] = []
+        self._recent_slots: list[int] = []
+        # (token hash, slot) pairs sorted by hash, then slot
+        self._token_hashes = array("q")
+        self._token_slots = array("q")
+        self._recent_tokens: dict[str, list[int]] = {}
+        self.add_many(slots)
+
+    def __len__(self) -> int:
+        """Return the number of indexed slots."""
+        return len(self._sorted) + len(self._recent_slots)
+
+    def _key(self, slot: int) -> str:
+        """Return the case-folded name of a slot."""
+        return self._names[slot].casefold()
+
+    def add(self, slot: int) -> None:
+        """
+        Index a slot under its current name.
+
+        :param slot: Slot to add; it must be greater than every indexed slot
+        """
+        name = self._names[slot]
+        key = name.casefold()
+        position = bisect_right(self._recent_keys, key)
+        self._recent_keys.insert(position, key)
+        self._recent_slots.insert(position, slot)
+        for token in set(tokenize(name)):
+            self._recent_tokens.setdefault(token, []).append(slot)
+        if len(self._recent_slots) > max(1024, len(self._sorted) // 64):
+            self._merge_recent()
+
+    def add_many(self, slots: Iterable[int]) -> None:
+        """
+        Index several slots.
+
+        :param slots: Slots to add, in increasing order
+        """
+        slots = list(slots)
+        if len(slots) < 1024:
+            for slot in slots:
+                self.add(slot)
+            return
+        self._recent_slots += slots
+        self._merge_recent()
+
+    def _merge_recent(self) -> None:
+        """Merge the recent additions into the sorted arrays."""
+        # Fold every name once; the list only lives while the runs are merged
+        keys = [name and name.casefold() for name in self._names]
+        slots = self._sorted.tolist() + self._recent_slots
+        # sorted is stable and the slots are in increasing order, so namesakes stay in slot order
+        slots.sort(key=keys.__getitem__)
+        self._sorted = array("q", slots)
+        # Each (hash, slot) pair is packed into one int, which sorts faster than tuples
+        shift = _SLOT_BITS
+        pairs = [
+            (token_hash << shift) | slot
+            for token_hash, slot in zip(self._token_hashes, self._token_slots)
+        ]
+        find_tokens = _TOKEN.findall
+        for slot in self._recent_slots:
+            pairs += [(hash(token) << shift) | slot for token in set(find_tokens(keys[slot]))]
+        pairs.sort()
+        mask = (1 << shift) - 1
+        self._token_hashes = array("q", [pair >> shift for pair in pairs])
+        self._token_slots = array("q", [pair & mask for pair in pairs])
+        self._recent_keys = []
+        self._recent_slots = []
+        self._recent_tokens = {}
+
+    def remove(self, slot: int) -> None:
+        """
+        Remove a slot from the name order; call it before the slot's name is cleared.
+
+        Token entries of the slot are left behind and filtered out by queries.
+
+        :param slot: Slot to remove
+        :raises ValueError: If the slot is not indexed
+        """
+        key = self._key(slot)
+        start = bisect_left(self._recent_keys, key)
+        for position in range(start, bisect_right(self._recent_keys, key, start)):
+            if self._recent_slots[position] == slot:
+                del self._recent_keys[position]
+                del self._recent_slots[position]
+                return
+        position = bisect_left(self._sorted, key, key=self._key)
+        while position < len(self._sorted) and self._key(self._sorted[position]) == key:
+            if self._sorted[position] == slot:
+                del self._sorted[position]
+                return
+            position += 1
+        raise ValueError("Slot is not in the search index")
+
+    def prefix(self, prefix: str, limit: int | None = DEFAULT_SEARCH_LIMIT) -> list[int]:
+        """
+        Find active slots whose name starts with a prefix, ignoring case.
+
+        :param prefix: Start of the name
+        :param limit: Largest number of results, or None for all
+        :return: Matching slots in name order
+        """
+        key = prefix.casefold()
+        matches = []
+        run = self._sorted
+        position = bisect_left(run, key, key=self._key)
+        while position < len(run) and len(matches) != limit:
+            slot = run[position]
+            slot_key = self._key(slot)
+            if not slot_key.startswith(key):
+                break
+            if self._is_active(slot):
+                matches.append((slot_key, slot))
+            position += 1
+        if self._recent_keys:
+            keys, recent = self._recent_keys, []
+            position = bisect_left(keys, key)
+            while position < len(keys) and len(recent) != limit and keys[position].startswith(key):
+                slot = self._recent_slots[position]
+                if self._is_active(slot):
+                    recent.append((keys[position], slot))
+                position += 1
+            matches = list(merge(matches, recent, key=itemgetter(0)))[:limit]
+        return [slot for _, slot in matches]
+
+    def tokens(self, query: str, limit: int | None = DEFAULT_SEARCH_LIMIT) -> list[int]:
+        """
+        Find active slots whose name contains every word of a query, ignoring case.
+
+        :param query: One or more words
+        :param limit: Largest number of results, or None for all
+        :return: Matching slots in increasing order
+        """
+        words = set(tokenize(query))
+        if not words:
+            return []
+        # Only the rarest word's slots are read; the name check covers the other words
+        best = None
+        for word in words:
+            token_hash = hash(word)
+            start = bisect_left(self._token_hashes, token_hash)
+            end = bisect_right(self._token_hashes, token_hash, start)
+            recent = self._recent_tokens.get(word, [])
+            if best is None or end - start + len(recent) < best[0]:
+                best = (end - start + len(recent), start, end, recent)
+        _, start, end, recent = best
+        candidates = self._token_slots[start:end].tolist() + recent
+        names = self._names
+        results = []
+        # Two words of a name may share a hash, which would list the slot twice
+        for slot in dict.fromkeys(candidates):
+            if len(results) == limit:
+                break
+            name = names[slot]
+            if name is not None and self._is_active(slot) and words <= set(tokenize(name)):
+                results.append(slot)
+        return results
@@ -0,0 +1,276 @@
+"""
+Asyncio order-serving front end for a Store.
+
+This module serves the store commands to many concurrent clients over TCP.
+The protocol is line-delimited JSON: every request is one JSON object on its
+own line and is answered by exactly one JSON object on its own line.
+
+Requests:
+    {"op": "list", "offset": 0, "limit": 100}
+    {"op": "total"}
+    {"op": "order", "items": [["MacBook Air M2", 2], ["Google Pixel 7", 1]]}
+
+Responses:
+    {"ok": true, "products": [{"name": ..., "price": ..., "quantity": ...}], "count": 2}
+    {"ok": true, "total": 875}
+    {"ok": true, "price": 3400.0}
+    {"ok": false, "error": "Not enough stock available"}
+
+A request may carry an "id", which is copied into its response. Request
+lines longer than the server's limit (1 MiB by default) are skipped and
+answered with an error, as is any request that cannot be processed, so every
+line gets exactly one response. "offset" and "limit" of a list request are
+optional; a page holds at most the server's page limit (1000 products by
+default), so listing a large catalog never holds up the event loop, and
+clients page through it up to "count". Clients may pipeline requests, i.e.
+send many without waiting for the responses; the responses of one
+connection are always written in request order. Orders run
+in a thread pool on the shared Store, whose per-product locks serialize
+conflicting stock changes, so a slow durable log write never stalls the
+event loop and concurrent orders share group commits.
+
+Classes:
+- OrderServer: Serves store commands over line-delimited JSON.
+
+Functions:
+- main: Serves the application store from the command line.
+"""
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import commands
+from store import Store
+
+# Requests of one connection processed concurrently before reading pauses
+MAX_PIPELINE = 64
+
+# Longest accepted request line in bytes, including the newline
+MAX_REQUEST_BYTES = 1 << 20
+
+# Most products returned by one list request
+MAX_LIST_LIMIT = 1000
+
+
+class OrderServer:
+    """
+    Serve list, total and order requests for a shared store.
+
+    :param store: The store to serve
+    :type store: Store
+    :param order_threads: Number of threads that run orders
+    :type order_threads: int
+    :param max_request_bytes: Longest accepted request line
+    :type max_request_bytes: int
+    :param max_list_limit: Most products returned by one list request
+    :type max_list_limit: int
+    """
+
+    def __init__(
+        self,
+        store: Store,
+        order_threads: int = 8,
+        max_request_bytes: int = MAX_REQUEST_BYTES,
+        max_list_limit: int = MAX_LIST_LIMIT,
+    ):
+        """Constructor method"""
+        self.store = store
+        self.max_request_bytes = max_request_bytes
+        self.max_list_limit = max_list_limit
+        self._executor = ThreadPoolExecutor(max_workers=order_threads)
+        self._server: asyncio.Server | None = None
+        self._connections: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """
+        Start listening for connections.
+
+        :param host: Interface to bind
+        :param port: Port to bind; 0 picks a free port
+        :return: The bound port
+        """
+        self._server = await asyncio.start_server(
+            self._handle_connection, host, port, limit=self.max_request_bytes
+        )
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Serve connections until cancelled."""
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """
+        Stop accepting connections, close open ones and shut down the order threads.
+
+        Requests already received are still processed before their connection
+        closes.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        self._executor.shutdown()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Read pipelined requests of one connection and answer them in order.
+
+        :param reader: Stream of request lines
+        :param writer: Stream for response lines
+        """
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        responses = asyncio.Queue(MAX_PIPELINE)
+        sender = asyncio.create_task(self._send_responses(responses, writer))
+        try:
+            while (line := await self._read_line(reader)) != b"":
+                if line is None:
+                    rejected = asyncio.get_running_loop().create_future()
+                    rejected.set_result(self._encode_error(
+                        f"Request line exceeds {self.max_request_bytes} bytes"
+                    ))
+                    await responses.put(rejected)
+                elif line.strip():
+                    await responses.put(asyncio.ensure_future(self.handle_request(line)))
+        except ConnectionError:
+            pass
+        finally:
+            await responses.put(None)
+            await sender
+            writer.close()
+            del self._connections[task]
+
+    @staticmethod
+    async def _read_line(reader: asyncio.StreamReader) -> bytes | None:
+        """
+        Read one request line, skipping lines over the stream's limit.
+
+        :param reader: Stream of request lines
+        :return: The line; b"" at the end of the stream; None if the line was
+                 too long and has been discarded up to and including its newline
+        """
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as error:
+            # The stream ended, possibly after a last line without a newline
+            return error.partial
+        except asyncio.LimitOverrunError as error:
+            consumed = error.consumed
+        # readuntil leaves the buffer alone on an overrun; drop the line piece by piece
+        while True:
+            try:
+                await reader.readexactly(consumed)
+                await reader.readuntil(b"\n")
+                return None
+            except asyncio.IncompleteReadError:
+                return None
+            except asyncio.LimitOverrunError as error:
+                consumed = error.consumed
+
+    @staticmethod
+    def _encode_error(message: str) -> bytes:
+        """
+        Encode an error response line.
+
+        :param message: Error message
+        :return: JSON response line
+        """
+        return json.dumps({"ok": False, "error": message}).encode() + b"\n"
+
+    @staticmethod
+    async def _send_responses(responses: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        """
+        Write responses in request order as they complete.
+
+        :param responses: Queue of response futures, ending with None
+        :param writer: Stream for response lines
+        """
+        while (response := await responses.get()) is not None:
+            writer.write(await response)
+            if responses.empty():
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    pass
+
+    async def handle_request(self, line: bytes) -> bytes:
+        """
+        Answer one request line.
+
+        Every failure is turned into an error response, so one bad request
+        never affects the other requests of its connection.
+
+        :param line: JSON request
+        :return: JSON response line
+        """
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            request_id = request.get("id")
+            response = await self._dispatch(request)
+        except (KeyError, TypeError, ValueError) as error:
+            response = {"ok": False, "error": str(error)}
+        except RecursionError:
+            response = {"ok": False, "error": "Request is nested too deeply"}
+        except Exception as error:
+            response = {"ok": False, "error": f"Request failed: {type(error).__name__}"}
+        if request_id is not None:
+            response["id"] = request_id
+        return json.dumps(response).encode() + b"\n"
+
+    async def _dispatch(self, request: dict) -> dict:
+        """
+        Run the operation named in a request.
+
+        Orders run in the thread pool; list and total are answered directly,
+        list with at most max_list_limit products.
+
+        :param request: Decoded request
+        :return: Response without the request id
+        :raises ValueError: If the operation is unknown or the order fails
+        """
+        if request.get("op") == "order":
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, commands.execute_request, self.store, request
+            )
+        return commands.execute_request(self.store, request, self.max_list_limit)
+
+
+def main():
+    """Serve the application store until interrupted."""
+    from main import SNAPSHOT_PATH, open_store
+
+    parser = argparse.ArgumentParser(description="Serve store commands over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    best_buy = open_store()
+
+    async def serve():
+        server = OrderServer(best_buy)
+        port = await server.start(args.host, args.port)
+        print(f"Serving on {args.host}:{port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        best_buy.checkpoint(SNAPSHOT_PATH)
+
+
+if __name__ == "__main__":
+    main()
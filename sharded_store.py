@@ -0,0 +1,702 @@
+"""
+Inventory partitioned across several stores.
+
+This module spreads a catalog over N Store shards so that no single object
+graph has to hold every product, and so that orders on different shards can
+run in parallel. A product belongs to the shard given by the CRC-32 of its
+name modulo the shard count, so every process computes the same placement.
+
+Shards either live in the calling process or each run in a worker process
+that owns its own Store and answers requests over a pipe. Products, shopping
+lists and results cross the pipe by name, so in process mode the caller's
+Product objects are only the seed of the catalog: stock changes happen in the
+workers, and listings return detached copies.
+
+An order whose lines all belong to one shard is a plain Store.order on that
+shard. An order that spans shards is committed in two phases: every shard
+involved first holds the stock of its lines with Store.reserve, and only if
+all holds succeed are they confirmed; otherwise the holds that were made are
+released and no stock changes anywhere. The holds do not expire and held
+stock stays sellable even if its product is deactivated, so once every shard
+has prepared, the confirms cannot fail through the facade. Only a change
+made directly on a shard store between the phases (removing a held product
+or setting its stock below the hold) can make a confirm fail;
+PartialCommitError then reports which shards did commit.
+
+Classes:
+- PartialCommitError: Raised when a cross-shard order committed on only some shards.
+- ShardedStore: Store facade that routes products and orders to shards.
+
+Functions:
+- shard_for: Returns the shard of a product name.
+"""
+
+import multiprocessing
+import threading
+import zlib
+from collections.abc import Iterator
+
+from products import Product, ProductBase
+from store import ON_ERROR_ABORT, ON_ERROR_SKIP, BatchOrderError, OrderBatchResult, Store
+
+DEFAULT_SHARDS = 4
+
+# Exceptions a worker process reports with their own type; others become RuntimeError
+_SHARD_ERRORS = {error.__name__: error for error in (KeyError, TypeError, ValueError)}
+
+
+class PartialCommitError(RuntimeError):
+    """
+    Raised when a cross-shard order was confirmed on some shards only.
+
+    This only happens if a shard store was changed directly between the two
+    phases of the order, see the module documentation.
+
+    :param committed: Shard index -> total in cents of the shards that committed
+    :type committed: dict[int, int]
+    :param failed: Shard index -> exception of the shards that did not
+    :type failed: dict[int, Exception]
+    """
+
+    def __init__(self, committed: dict[int, int], failed: dict[int, Exception]):
+        """Constructor method"""
+        super().__init__(
+            f"Order committed on shards {sorted(committed)} but failed on {sorted(failed)}: "
+            f"{next(iter(failed.values()))}"
+        )
+        self.committed = committed
+        self.failed = failed
+
+
+def shard_for(name: str, shards: int) -> int:
+    """
+    Return the shard a product name belongs to.
+
+    :param name: Product name
+    :param shards: Number of shards
+    :return: Shard index from 0 to shards - 1
+    """
+    return zlib.crc32(name.encode("utf-8")) % shards
+
+
+def _resolve(store: Store, item: Product | str) -> Product:
+    """
+    Find the product of a shopping list line in a shard.
+
+    :param store: The shard
+    :param item: Product of the shard, or a product name
+    :return: The product
+    :raises ValueError: If the shard has no such product
+    """
+    if isinstance(item, ProductBase):
+        if item in store:
+            return item
+        item = item.name
+    product = store.get_product_by_name(item)
+    if product is None:
+        raise ValueError(f"Product not found in the store: {item}")
+    return product
+
+
+def _resolve_lines(
+    store: Store, lines: list[tuple[Product | str, int]]
+) -> list[tuple[Product, int]]:
+    """Return shopping list lines with every item resolved to a product of the shard."""
+    return [(_resolve(store, item), quantity) for item, quantity in lines]
+
+
+def _op_order(store: Store, lines: list[tuple[Product | str, int]]) -> int:
+    """Place an order on a shard; return its total in cents."""
+    return store.order(_resolve_lines(store, lines))
+
+
+def _op_order_many(
+    store: Store, carts: list[list[tuple[Product | str, int]]]
+) -> tuple[list[int | None], dict[int, Exception]]:
+    """
+    Place a batch of orders on a shard, each as if by order.
+
+    :return: Totals in cents (None for failed carts) and failures by cart index
+    """
+    failures: dict[int, Exception] = {}
+    resolved: list[list[tuple[Product, int]]] = []
+    positions: list[int] = []
+    for idx, lines in enumerate(carts):
+        try:
+            resolved.append(_resolve_lines(store, lines))
+            positions.append(idx)
+        except ValueError as error:
+            failures[idx] = error
+    result = store.order_many(resolved)
+    totals: list[int | None] = [None] * len(carts)
+    for position, total in zip(positions, result.totals):
+        totals[position] = total
+    for idx, error in result.failures.items():
+        failures[positions[idx]] = error
+    return totals, failures
+
+
+def _op_prepare(store: Store, lines: list[tuple[Product | str, int]]) -> list[int]:
+    """
+    Hold the stock of an order's lines on a shard, all or nothing.
+
+    The holds do not expire, so they last until _op_commit or _op_abort.
+
+    :return: Reservation ids for _op_commit or _op_abort
+    """
+    merged: dict[Product, int] = {}
+    for product, quantity in _resolve_lines(store, lines):
+        merged[product] = merged.get(product, 0) + quantity
+    reservation_ids = []
+    try:
+        for product, quantity in merged.items():
+            reservation_ids.append(store.reserve(product, quantity, ttl=None))
+    except Exception:
+        store.release(*reservation_ids)
+        raise
+    return reservation_ids
+
+
+def _op_prepare_many(
+    store: Store, carts: list[list[tuple[Product | str, int]]]
+) -> tuple[list[list[int]], tuple[int, Exception] | None]:
+    """
+    Hold the stock of several orders on a shard in order, stopping at the first failure.
+
+    :return: Reservation ids per prepared order, and the position and
+             exception of the order that failed, or None
+    """
+    held = []
+    for position, lines in enumerate(carts):
+        try:
+            held.append(_op_prepare(store, lines))
+        except (TypeError, ValueError) as error:
+            return held, (position, error)
+    return held, None
+
+
+def _op_commit(store: Store, reservation_ids: list[int]) -> int:
+    """Buy the stock held by _op_prepare; return the total in cents."""
+    return store.confirm(*reservation_ids)
+
+
+def _op_commit_many(store: Store, held: list[list[int]]) -> list[int]:
+    """Buy the stock held for several orders, one order each; return their totals in cents."""
+    return [store.confirm(*reservation_ids) for reservation_ids in held]
+
+
+def _op_abort(store: Store, reservation_ids: list[int]) -> None:
+    """Give the stock held by _op_prepare back for sale."""
+    store.release(*reservation_ids)
+
+
+def _op_add(store: Store, row: tuple[str, int, int]) -> None:
+    """Add a product given as a (name, price in cents, quantity) row."""
+    store.add_products(Product.from_trusted_rows([row], in_cents=True))
+
+
+def _op_rows(store: Store) -> list[tuple[str, int, int]]:
+    """Return the active products as (name, price in cents, quantity) rows."""
+    return [
+        (product.name, product.price_cents, product.quantity)
+        for product in store.get_all_products()
+    ]
+
+
+def _op_total_quantity(store: Store) -> int:
+    """Return the stock of the shard."""
+    return store.get_total_quantity()
+
+
+def _op_len(store: Store) -> int:
+    """Return the number of products of the shard."""
+    return len(store)
+
+
+_OPERATIONS = {
+    "order": _op_order,
+    "order_many": _op_order_many,
+    "prepare": _op_prepare,
+    "prepare_many": _op_prepare_many,
+    "commit": _op_commit,
+    "commit_many": _op_commit_many,
+    "abort": _op_abort,
+    "add": _op_add,
+    "rows": _op_rows,
+    "total_quantity": _op_total_quantity,
+    "len": _op_len,
+}
+
+
+def _portable(error: Exception) -> Exception:
+    """Return an equivalent exception that can be sent to another process."""
+    error_type = _SHARD_ERRORS.get(type(error).__name__, None)
+    if error_type is None or not isinstance(error, error_type):
+        return RuntimeError(f"{type(error).__name__}: {error}")
+    return error_type(*error.args[:1])
+
+
+def _shard_worker(connection, rows: list[tuple[str, int, int]]) -> None:
+    """
+    Serve one shard in a worker process until the pipe closes or None arrives.
+
+    Every request is an (operation, args) tuple answered with (True, result)
+    or (False, exception).
+
+    :param connection: Worker end of the pipe
+    :param rows: (name, price in cents, quantity) rows of the shard's products
+    """
+    store = Store(Product.from_trusted_rows(rows, validate=False, in_cents=True))
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        operation, args = request
+        try:
+            result = _OPERATIONS[operation](store, *args)
+        except Exception as error:
+            connection.send((False, _portable(error)))
+            continue
+        if operation == "order_many":
+            totals, failures = result
+            result = totals, {idx: _portable(error) for idx, error in failures.items()}
+        elif operation == "prepare_many" and result[1] is not None:
+            held, (position, error) = result
+            result = held, (position, _portable(error))
+        connection.send((True, result))
+    connection.close()
+
+
+class _ShardProcess:
+    """
+    A shard served by a worker process.
+
+    :param rows: (name, price in cents, quantity) rows of the shard's products
+    :type rows: list[tuple[str, int, int]]
+    """
+
+    def __init__(self, rows: list[tuple[str, int, int]]):
+        """Constructor method"""
+        self.connection, worker_end = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_shard_worker, args=(worker_end, rows), daemon=True
+        )
+        self.process.start()
+        worker_end.close()
+        # Held from sending a request until its response is read
+        self.lock = threading.Lock()
+
+    def close(self) -> None:
+        """Stop the worker process."""
+        with self.lock:
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+            self.connection.close()
+        self.process.join()
+
+
+class ShardedStore:
+    """
+    A store whose products are partitioned over several Store shards.
+
+    The facade mirrors the Store operations that make sense across shards:
+    adding products, listing the active products, the total stock and
+    placing orders. Shopping list lines may name their product by a Product
+    instance or by its name; lines are routed by name.
+
+    :param product_list: Products to distribute over the shards
+    :type product_list: list[Product]
+    :param shards: Number of shards
+    :type shards: int
+    :param processes: Whether every shard runs in its own worker process
+    :type processes: bool
+    :raises TypeError: If a product is not a Product instance
+    :raises ValueError: If shards is not positive or a product is inactive
+    """
+
+    def __init__(
+        self,
+        product_list: list[Product],
+        shards: int = DEFAULT_SHARDS,
+        processes: bool = False,
+    ):
+        """Constructor method"""
+        if not isinstance(shards, int) or shards <= 0:
+            raise ValueError("Number of shards must be a positive integer")
+        self.processes = processes
+        partitions: list[list[Product]] = [[] for _ in range(shards)]
+        for product in product_list:
+            Store.validate_product(product)
+            partitions[shard_for(product.name, shards)].append(product)
+        if processes:
+            self._shards = [
+                _ShardProcess([(p.name, p.price_cents, p.quantity) for p in partition])
+                for partition in partitions
+            ]
+        else:
+            self._shards = [Store(partition) for partition in partitions]
+
+    @property
+    def shard_count(self) -> int:
+        """Number of shards."""
+        return len(self._shards)
+
+    @property
+    def shards(self) -> list[Store]:
+        """
+        The shard stores, in shard order, when they live in this process.
+
+        :raises ValueError: If the shards run in worker processes
+        """
+        if self.processes:
+            raise ValueError("Shards run in worker processes")
+        return list(self._shards)
+
+    def shard_of(self, product: Product | str) -> int:
+        """
+        Return the shard a product or product name belongs to.
+
+        :param product: Product or product name
+        :return: Shard index
+        """
+        name = product.name if isinstance(product, ProductBase) else product
+        return shard_for(name, len(self._shards))
+
+    def close(self) -> None:
+        """Stop the worker processes; does nothing for in-process shards."""
+        if self.processes:
+            for shard in self._shards:
+                shard.close()
+
+    def __enter__(self) -> "ShardedStore":
+        """Return the store for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the store at the end of a with statement."""
+        self.close()
+
+    def _call_each(self, requests: dict[int, tuple[str, tuple]]) -> dict[int, tuple[bool, object]]:
+        """
+        Run one operation on each of several shards.
+
+        Worker processes receive all requests before any response is read, so
+        the shards work in parallel. Their locks are taken in shard order, so
+        concurrent callers cannot deadlock.
+
+        :param requests: Shard index -> (operation, args)
+        :return: Shard index -> (True, result) or (False, exception)
+        """
+        responses: dict[int, tuple[bool, object]] = {}
+        if not self.processes:
+            for index, (operation, args) in requests.items():
+                try:
+                    responses[index] = (True, _OPERATIONS[operation](self._shards[index], *args))
+                except Exception as error:
+                    responses[index] = (False, error)
+            return responses
+
+        indexes = sorted(requests)
+        locks = [self._shards[index].lock for index in indexes]
+        for lock in locks:
+            lock.acquire()
+        try:
+            for index in indexes:
+                self._shards[index].connection.send(requests[index])
+            for index in indexes:
+                responses[index] = self._shards[index].connection.recv()
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        return responses
+
+    def _call(self, index: int, operation: str, *args):
+        """
+        Run one operation on one shard and return its result.
+
+        :raises Exception: The exception raised by the operation
+        """
+        ok, result = self._call_each({index: (operation, args)})[index]
+        if not ok:
+            raise result
+        return result
+
+    def __len__(self) -> int:
+        """Return the number of products in all shards (active and inactive)."""
+        responses = self._call_each({index: ("len", ()) for index in range(len(self._shards))})
+        return sum(result for _, result in responses.values())
+
+    def add_product(self, product: Product) -> None:
+        """
+        Add a product to its shard.
+
+        :param product: Product to add
+        :raises TypeError: If the product is not a Product instance
+        :raises ValueError: If the product is inactive or already in its shard
+        """
+        Store.validate_product(product)
+        index = self.shard_of(product)
+        if self.processes:
+            self._call(index, "add", (product.name, product.price_cents, product.quantity))
+        else:
+            self._shards[index].add_product(product)
+
+    def get_all_products(self) -> list[Product]:
+        """
+        Return the active products of all shards, shard by shard.
+
+        In process mode the products are copies of the worker state at the
+        time of the call; changing them does not change the store.
+
+        :return: A new list of Product instances
+        """
+        if not self.processes:
+            products = []
+            for shard in self._shards:
+                products.extend(shard.get_all_products())
+            return products
+        responses = self._call_each({index: ("rows", ()) for index in range(len(self._shards))})
+        rows = [row for index in sorted(responses) for row in responses[index][1]]
+        return Product.from_trusted_rows(rows, validate=False, in_cents=True)
+
+    def get_total_quantity(self) -> int:
+        """
+        Return the stock of all shards.
+
+        :return: Sum of the quantities of all products
+        """
+        responses = self._call_each(
+            {index: ("total_quantity", ()) for index in range(len(self._shards))}
+        )
+        return sum(result for _, result in responses.values())
+
+    def _route(
+        self, shopping_list: list[tuple[Product | str, int]]
+    ) -> dict[int, list[tuple[Product | str, int]]]:
+        """
+        Validate a shopping list and split it by shard.
+
+        In process mode, products are replaced by their names.
+
+        :param shopping_list: List of (Product or name, quantity) tuples
+        :return: Shard index -> lines of that shard, in shard order
+        :raises TypeError: If the list, a product or a quantity has the wrong type
+        :raises ValueError: If the list is empty, a product is inactive or a
+                            quantity is not positive
+        """
+        if not isinstance(shopping_list, list):
+            raise TypeError("Invalid shopping list type")
+        if len(shopping_list) == 0:
+            raise ValueError("Shopping list is empty")
+        routed: dict[int, list[tuple[Product | str, int]]] = {}
+        for item, quantity in shopping_list:
+            if isinstance(item, ProductBase):
+                Store.validate_product(item)
+                if self.processes:
+                    item = item.name
+            elif not isinstance(item, str):
+                raise TypeError("Invalid product type")
+            Store.validate_quantity(quantity)
+            routed.setdefault(self.shard_of(item), []).append((item, quantity))
+        return dict(sorted(routed.items()))
+
+    def order(self, shopping_list: list[tuple[Product | str, int]]) -> int:
+        """
+        Place an order, all or nothing across shards.
+
+        :param shopping_list: List of (Product or name, quantity) tuples
+        :return: Total price of the order in cents
+        :raises TypeError: If the shopping list has the wrong type
+        :raises ValueError: If a product is unknown, inactive or lacks stock;
+                            no stock is changed
+        :raises PartialCommitError: If a cross-shard order committed on some shards only
+        """
+        routed = self._route(shopping_list)
+        if len(routed) == 1:
+            (index, lines), = routed.items()
+            return self._call(index, "order", lines)
+        return self._order_across(routed)
+
+    def _order_across(self, routed: dict[int, list[tuple[Product | str, int]]]) -> int:
+        """
+        Commit an order that spans shards in two phases.
+
+        :param routed: Shard index -> lines of that shard
+        :return: Total price of the order in cents
+        :raises ValueError: If a shard could not hold its lines; no stock is changed
+        :raises PartialCommitError: If a shard failed to confirm its holds
+        """
+        prepared = self._call_each(
+            {index: ("prepare", (lines,)) for index, lines in routed.items()}
+        )
+        held = {index: result for index, (ok, result) in prepared.items() if ok}
+        if len(held) < len(prepared):
+            if held:
+                self._call_each({index: ("abort", (ids,)) for index, ids in held.items()})
+            raise next(result for ok, result in prepared.values() if not ok)
+
+        committed = self._call_each({index: ("commit", (ids,)) for index, ids in held.items()})
+        totals = {index: result for index, (ok, result) in committed.items() if ok}
+        if len(totals) < len(committed):
+            failed = {index: result for index, (ok, result) in committed.items() if not ok}
+            self._call_each({index: ("abort", (held[index],)) for index in failed})
+            if not totals:
+                raise next(iter(failed.values()))
+            raise PartialCommitError(totals, failed)
+        return sum(totals.values())
+
+    def order_many(
+        self, carts: list[list[tuple[Product | str, int]]], on_error: str = ON_ERROR_SKIP
+    ) -> OrderBatchResult:
+        """
+        Place a batch of orders with the same outcome as calling order for each in turn.
+
+        Stock is allocated to the carts strictly in input order. Consecutive
+        carts that stay on one shard are sent to their shard as one batch, so
+        all shards work on the batch at once; a cart that spans shards is
+        committed in two phases once the carts before it on its shards are
+        settled.
+
+        With on_error="abort" every cart is first prepared by holding its
+        stock, and the holds are only confirmed once all carts are prepared,
+        so a failing cart rejects the whole batch without changing any stock.
+
+        :param carts: List of shopping lists
+        :param on_error: "skip" to record a failing cart and continue, or "abort" to
+                         reject the whole batch without changing any stock
+        :return: Per-cart totals in cents and failures
+        :raises ValueError: If on_error is not a known policy
+        :raises BatchOrderError: If a cart fails and on_error is "abort"
+        """
+        if on_error not in (ON_ERROR_SKIP, ON_ERROR_ABORT):
+            raise ValueError(f"Unknown error policy: {on_error!r}")
+        failures: dict[int, Exception] = {}
+        routed_carts: list[dict[int, list[tuple[Product | str, int]]] | None] = []
+        for idx, shopping_list in enumerate(carts):
+            try:
+                routed_carts.append(self._route(shopping_list))
+            except (TypeError, ValueError) as error:
+                if on_error == ON_ERROR_ABORT:
+                    raise BatchOrderError(idx, error) from error
+                failures[idx] = error
+                routed_carts.append(None)
+        if on_error == ON_ERROR_ABORT:
+            return OrderBatchResult(self._order_many_atomic(routed_carts), {})
+
+        totals: list[int | None] = [None] * len(carts)
+        for batches, across in self._in_input_order(routed_carts):
+            responses = self._call_each({
+                index: ("order_many", ([lines for _, lines in batch],))
+                for index, batch in batches.items()
+            })
+            for index, (ok, result) in responses.items():
+                positions = [idx for idx, _ in batches[index]]
+                if not ok:
+                    for position in positions:
+                        failures[position] = result
+                    continue
+                shard_totals, shard_failures = result
+                for position, total in zip(positions, shard_totals):
+                    totals[position] = total
+                for shard_idx, error in shard_failures.items():
+                    failures[positions[shard_idx]] = error
+            if across is not None:
+                idx, routed = across
+                try:
+                    totals[idx] = self._order_across(routed)
+                except (ValueError, PartialCommitError) as error:
+                    failures[idx] = error
+        return OrderBatchResult(totals, dict(sorted(failures.items())))
+
+    def _order_many_atomic(
+        self, routed_carts: list[dict[int, list[tuple[Product | str, int]]]]
+    ) -> list[int]:
+        """
+        Prepare every cart of a batch in input order, then confirm them all.
+
+        :param routed_carts: Routed lines of every cart
+        :return: Total in cents per cart
+        :raises BatchOrderError: If a cart cannot be prepared; all holds are released
+        """
+        # Shard index -> (cart index, reservation ids) of every prepared cart part
+        held: dict[int, list[tuple[int, list[int]]]] = {}
+        failure: tuple[int, Exception] | None = None
+        for batches, across in self._in_input_order(routed_carts):
+            requests = {
+                index: ("prepare_many", ([lines for _, lines in batch],))
+                for index, batch in batches.items()
+            }
+            for index, (ok, result) in self._call_each(requests).items():
+                positions = [idx for idx, _ in batches[index]]
+                shard_held, shard_failure = result if ok else ([], (0, result))
+                held.setdefault(index, []).extend(zip(positions, shard_held))
+                if shard_failure is not None:
+                    position, error = shard_failure
+                    if failure is None or positions[position] < failure[0]:
+                        failure = (positions[position], error)
+            if failure is None and across is not None:
+                idx, routed = across
+                requests = {index: ("prepare", (lines,)) for index, lines in routed.items()}
+                for index, (ok, result) in self._call_each(requests).items():
+                    if ok:
+                        held.setdefault(index, []).append((idx, result))
+                    elif failure is None:
+                        failure = (idx, result)
+            if failure is not None:
+                break
+
+        if failure is not None:
+            self._call_each({
+                index: ("abort", ([rid for _, ids in parts for rid in ids],))
+                for index, parts in held.items()
+            })
+            idx, error = failure
+            raise BatchOrderError(idx, error) from error
+
+        totals = [0] * len(routed_carts)
+        responses = self._call_each(
+            {index: ("commit_many", ([ids for _, ids in parts],)) for index, parts in held.items()}
+        )
+        committed: dict[int, int] = {}
+        failed: dict[int, Exception] = {}
+        for index, (ok, result) in responses.items():
+            if not ok:
+                failed[index] = result
+                continue
+            committed[index] = sum(result)
+            for (idx, _), total in zip(held[index], result):
+                totals[idx] += total
+        if failed:
+            raise PartialCommitError(committed, failed)
+        return totals
+
+    @staticmethod
+    def _in_input_order(
+        routed_carts: list[dict[int, list[tuple[Product | str, int]]] | None],
+    ) -> Iterator[tuple[dict[int, list[tuple[int, list]]], tuple[int, dict] | None]]:
+        """
+        Split a batch into steps that settle the carts in input order.
+
+        Single-shard carts are collected per shard. Before a cart that spans
+        shards, the collected carts of the shards it touches are released as
+        a step together with it, so every shard sees its carts in input order.
+
+        :param routed_carts: Routed lines of every cart; None for invalid carts
+        :return: Iterator of (shard index -> [(cart index, lines)] to settle
+                 first, then (cart index, routed lines) of the spanning cart or None)
+        """
+        pending: dict[int, list[tuple[int, list]]] = {}
+        for idx, routed in enumerate(routed_carts):
+            if routed is None:
+                continue
+            if len(routed) == 1:
+                (index, lines), = routed.items()
+                pending.setdefault(index, []).append((idx, lines))
+                continue
+            yield {index: pending.pop(index) for index in routed if index in pending}, (idx, routed)
+        yield pending, None
@@ -0,0 +1,134 @@
+"""
+Binary inventory snapshots.
+
+This module reads and writes the compact on-disk format used by
+Store.save_snapshot and Store.load_snapshot. A snapshot holds one record per
+product, split into fixed-width columns so that each column can be loaded with
+a single array copy:
+
+    header      magic, format version, product count, names size, LSN, CRC-32
+    prices      count x int64 (cents)
+    quantities  count x int64
+    flags       count x uint8 (1 = active)
+    names       UTF-8 string table, names separated by NUL bytes
+
+All numbers are little-endian. The CRC-32 covers everything after the header.
+The LSN is the sequence number of the last write-ahead log record whose
+effects the snapshot contains (0 without a log).
+Version 2 files, which stored prices as float64 units, can still be read;
+their prices are rounded to cents.
+Files are memory-mapped for reading and replaced atomically when written.
+
+Functions:
+- write_snapshot: Writes product columns to a snapshot file.
+- read_snapshot: Reads and verifies a snapshot file into product columns.
+"""
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from products import to_cents
+
+MAGIC = b"BBSNAP"
+FORMAT_VERSION = 3
+# Last version that stored prices as float64 instead of int64 cents
+FLOAT_PRICES_VERSION = 2
+# magic, version, product count, names size, lsn, crc32
+HEADER = struct.Struct("<6sHQQQI")
+
+
+def write_snapshot(
+    path: str,
+    names: list[str],
+    prices: array,
+    quantities: array,
+    flags: bytearray,
+    lsn: int = 0,
+) -> None:
+    """
+    Write product columns to a snapshot file.
+
+    The file is written next to the target and renamed over it once it is
+    complete and flushed to disk, so a crash never leaves a partial snapshot.
+
+    :param path: Destination file path
+    :param names: Product names
+    :param prices: Product prices in cents as array('q')
+    :param quantities: Product quantities as array('q')
+    :param flags: Active flags, one byte per product
+    :param lsn: LSN of the last log record reflected in the columns
+    :raises ValueError: If the columns differ in length or a name contains a NUL byte
+    """
+    count = len(names)
+    if not len(prices) == len(quantities) == len(flags) == count:
+        raise ValueError("Snapshot columns must have the same length")
+    if any("\0" in name for name in names):
+        raise ValueError("Product names cannot contain NUL characters")
+
+    if sys.byteorder == "big":
+        prices, quantities = array("q", prices), array("q", quantities)
+        prices.byteswap()
+        quantities.byteswap()
+    names_blob = "\0".join(names).encode("utf-8")
+    sections = [prices.tobytes(), quantities.tobytes(), bytes(flags), names_blob]
+
+    checksum = 0
+    for section in sections:
+        checksum = zlib.crc32(section, checksum)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, count, len(names_blob), lsn, checksum)
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(header)
+        for section in sections:
+            file.write(section)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+def read_snapshot(path: str) -> tuple[list[str], array, array, bytearray, int]:
+    """
+    Read a snapshot file into product columns.
+
+    The file is memory-mapped and its checksum verified before any column is
+    decoded, so callers can trust the values without validating each product.
+
+    :param path: Snapshot file path
+    :return: Tuple of (names, prices in cents as array('q'), quantities as array('q'),
+        flags, LSN)
+    :raises ValueError: If the file is not a snapshot, has an unknown version or is corrupt
+    """
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if len(mapped) < HEADER.size:
+            raise ValueError("Snapshot file is truncated")
+        magic, version, count, names_size, lsn, checksum = HEADER.unpack_from(mapped)
+        if magic != MAGIC:
+            raise ValueError("Not a snapshot file")
+        if version not in (FORMAT_VERSION, FLOAT_PRICES_VERSION):
+            raise ValueError(f"Unsupported snapshot version: {version}")
+        with memoryview(mapped)[HEADER.size:] as body:
+            if len(body) != count * 17 + names_size or zlib.crc32(body) != checksum:
+                raise ValueError("Snapshot checksum mismatch")
+
+            prices_end = count * 8
+            quantities_end = prices_end + count * 8
+            flags_end = quantities_end + count
+            prices = array("q" if version == FORMAT_VERSION else "d")
+            prices.frombytes(body[:prices_end])
+            quantities = array("q")
+            quantities.frombytes(body[prices_end:quantities_end])
+            flags = bytearray(body[quantities_end:flags_end])
+            names_blob = bytes(body[flags_end:])
+
+    if sys.byteorder == "big":
+        prices.byteswap()
+        quantities.byteswap()
+    if version == FLOAT_PRICES_VERSION:
+        prices = array("q", map(to_cents, prices))
+    names = names_blob.decode("utf-8").split("\0") if count else []
+    return names, prices, quantities, flags, lsn
@@ -0,0 +1,118 @@
+"""
+Sorted secondary index over a numeric product attribute.
+
+This module provides the index behind Store.price_range and Store.low_stock.
+Products are grouped into one bucket per distinct key, and the distinct keys
+are kept in a sorted list. A range query bisects the key list and collects
+the buckets in between, which takes O(log d + k) for d distinct keys and k
+results. Moving a product to a new key is two dict operations; the sorted
+key list only changes when a key value appears or disappears, which is rare
+for attributes such as prices and stock levels that many products share.
+
+Classes:
+- SortedIndex: Products ordered by a numeric key, with range queries.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Iterable
+
+from products import Product
+
+
+class SortedIndex:
+    """
+    Products ordered by a numeric key.
+
+    Products with equal keys are returned in the order they got that key.
+
+    :param items: (product, key) pairs to index
+    :type items: Iterable[tuple[Product, float]]
+    """
+
+    def __init__(self, items: Iterable[tuple[Product, float]] = ()):
+        """Constructor method"""
+        self._key_of: dict[Product, float] = {}
+        # Key -> products with that key; the keys are also kept in sorted order
+        self._buckets: dict[float, dict[Product, None]] = {}
+        key_of, buckets = self._key_of, self._buckets
+        for product, key in items:
+            key_of[product] = key
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = {}
+            bucket[product] = None
+        self._keys = sorted(buckets)
+
+    def __len__(self) -> int:
+        """Return the number of indexed products."""
+        return len(self._key_of)
+
+    def __contains__(self, product: object) -> bool:
+        """Return True if the product is indexed."""
+        return product in self._key_of
+
+    def add(self, product: Product, key: float) -> None:
+        """
+        Index a product under a key, replacing any previous key.
+
+        :param product: Product to index
+        :param key: Sort key, e.g. the product's price
+        """
+        old_key = self._key_of.get(product)
+        if old_key is not None:
+            if old_key == key:
+                return
+            self._remove_from_bucket(product, old_key)
+        self._key_of[product] = key
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = {}
+            insort(self._keys, key)
+        bucket[product] = None
+
+    def discard(self, product: Product) -> None:
+        """
+        Remove a product from the index if it is indexed.
+
+        :param product: Product to remove
+        """
+        key = self._key_of.pop(product, None)
+        if key is not None:
+            self._remove_from_bucket(product, key)
+
+    def _remove_from_bucket(self, product: Product, key: float) -> None:
+        """
+        Remove a product from the bucket of its key, dropping the key once it is empty.
+
+        :param product: Indexed product
+        :param key: The product's current key
+        """
+        bucket = self._buckets[key]
+        del bucket[product]
+        if not bucket:
+            del self._buckets[key]
+            del self._keys[bisect_left(self._keys, key)]
+
+    def range(
+        self, low: float | None = None, high: float | None = None, inclusive: bool = True
+    ) -> list[Product]:
+        """
+        Find the products whose key lies between two bounds.
+
+        :param low: Smallest key, or None for no lower bound
+        :param high: Largest key, or None for no upper bound
+        :param inclusive: Whether a key equal to high matches
+        :return: Matching products in key order
+        """
+        keys = self._keys
+        start = 0 if low is None else bisect_left(keys, low)
+        if high is None:
+            end = len(keys)
+        elif inclusive:
+            end = bisect_right(keys, high)
+        else:
+            end = bisect_left(keys, high)
+        results = []
+        for key in keys[start:end]:
+            results.extend(self._buckets[key])
+        return results
@@ -1,4 +1,69 @@
-from products import Product
+import gc
+import heapq
+import itertools
+import math
+import os
+import sys
+import threading
+import time
+import weakref
+from array import array
+from collections.abc import Callable, Iterable
+from operator import attrgetter
+
+from pricing import PricingEngine
+from products import Product, ProductBase, format_cents, to_cents
+from search_index import DEFAULT_SEARCH_LIMIT, SearchIndex
+from snapshot import read_snapshot, write_snapshot
+from sorted_index import SortedIndex
+from wal import SYNC_GROUP, WriteAheadLog, read_log
+
+ON_ERROR_SKIP = "skip"
+ON_ERROR_ABORT = "abort"
+
+# Seconds a reservation holds stock unless a different TTL is given
+DEFAULT_RESERVATION_TTL = 900.0
+
+# Number of products per page of get_products_page unless a limit is given
+DEFAULT_PAGE_SIZE = 20
+
+
+class OrderBatchResult:
+    """
+    The outcome of a batch of orders placed with Store.order_many.
+
+    :param totals: Total price per cart in cents, in input order; None for carts that failed
+    :type totals: list[int | None]
+    :param failures: Mapping of cart index to the exception that rejected it
+    :type failures: dict[int, Exception]
+    """
+
+    def __init__(self, totals: list[int | None], failures: dict[int, Exception]):
+        """Constructor method"""
+        self.totals = totals
+        self.failures = failures
+
+    @property
+    def succeeded(self) -> int:
+        """Number of carts that were settled."""
+        return len(self.totals) - len(self.failures)
+
+
+class BatchOrderError(ValueError):
+    """
+    Raised by Store.order_many when a cart fails and the batch is aborted.
+
+    :param index: Position of the failing cart in the batch
+    :type index: int
+    :param error: The exception that rejected the cart
+    :type error: Exception
+    """
+
+    def __init__(self, index: int, error: Exception):
+        """Constructor method"""
+        super().__init__(f"Cart {index} failed: {error}")
+        self.index = index
+        self.error = error
 
 
 class Store:
@@ -8,6 +73,8 @@ class Store:
     This class allows adding, removing, and querying products in the store.
     It also handles order processing by validating shopping lists and updating
     product quantities accordingly.
+    Order totals include the promotions of the PricingEngine assigned to the
+    pricing attribute, if any.
 
     :param product_list: List of Product instances to initialize the store with.
     :type product_list: list[Product]
@@ -20,88 +87,1381 @@ class Store:
         """
         Initialize the store with a list of products.
 
+        The catalog is kept in an insertion-ordered dict keyed by product identity,
+        together with a name index, so adding, removing and looking up a product
+        are all O(1) and building a store is linear in the number of products.
+
+        The set of active products and the total quantity are maintained
+        incrementally from the change notifications each product sends to the
+        stores holding it. That bookkeeping is guarded by a short-lived internal
+        lock; orders themselves only lock the products they touch.
+
         :param product_list: List of Product instances
         :type product_list: list[Product]
         """
-        self.product_list = []
+        # Product -> catalog position, used to keep listings in insertion order
+        self._products: dict[Product, int] = {}
+        # Name -> first product added with that name; later namesakes are kept apart
+        self._name_index: dict[str, Product] = {}
+        self._name_duplicates: dict[str, dict[Product, None]] = {}
+        self._next_position = 0
+        self._active: dict[Product, None] = {}
+        self._active_in_order = True
+        self._active_cache: list[Product] | None = None
+        self._total_quantity = 0
+        self._state_lock = threading.Lock()
+        # Held by the products of this store, see Product._stores
+        self._ref = weakref.ref(self)
+        # Bumped on every add/remove so snapshots can detect a concurrent change
+        self._catalog_version = 0
+        # Write-ahead log, see attach_wal; _lsn is the last record applied without one
+        self._wal: WriteAheadLog | None = None
+        self._lsn = 0
+        # Set while an order applies its stock changes, which it logs as one record
+        self._logging = threading.local()
+        self._init_reservations()
+        # Built on the first search, then maintained
+        self._search_index: SearchIndex | None = None
+        # Built on the first range query, then maintained: prices of the active
+        # products and quantities of all products
+        self._price_index: SortedIndex | None = None
+        self._quantity_index: SortedIndex | None = None
+        self._sold_out_listeners: list[Callable[[Product], None]] = []
+        # Promotions applied to order totals; None charges list prices
+        self.pricing: PricingEngine | None = None
         for product in product_list:
             self.validate_product(product)
             self.add_product(product)
 
+    def _init_reservations(self) -> None:
+        """Set up the empty reservation bookkeeping, see reserve."""
+        # Product -> quantity held by reservations; changed under the product's lock
+        self._reserved: dict[Product, int] = {}
+        self._total_reserved = 0
+        # Reservation id -> (held lines, expiry time); expiry order is kept in a heap
+        self._reservations: dict[int, tuple[dict[Product, int], float]] = {}
+        # Product -> ids of the reservations holding it, for remove_product
+        self._reservations_by_product: dict[Product, dict[int, None]] = {}
+        self._expiry_heap: list[tuple[float, int]] = []
+        self._reservation_ids = itertools.count(1)
+        self._reservation_lock = threading.Lock()
+
+    @property
+    def product_list(self) -> list[Product]:
+        """
+        All products in the store (active and inactive) in insertion order.
+
+        :return: A new list of Product instances
+        """
+        return list(self._products)
+
+    def __len__(self) -> int:
+        """Return the number of products in the store (active and inactive)."""
+        return len(self._products)
+
+    def __contains__(self, product: object) -> bool:
+        """Return True if the given product instance belongs to the store."""
+        return product in self._products
+
     def add_product(self, product: Product) -> None:
         """
         Add a product to the store's product list.
 
         :param product: Product instance to add
-        :raises ValueError: If the product already exists in the store
+        :raises ValueError: If the product already exists in the store, or its name
+                            is taken while a write-ahead log is attached
+        """
+        with self._state_lock:
+            self._check_log()
+            if product in self._products:
+                raise ValueError("Product already exists in the store")
+            if self._wal is not None:
+                self._check_new_names([product.name])
+            self._insert(product)
+            if self._search_index is not None:
+                self._search_index.add(product)
+            lsn = self._log_product_added(product)
+        self._wait_durable(lsn)
+
+    def add_products(self, products: list[Product]) -> None:
+        """
+        Add several products to the store at once.
+
+        Either all products are added or, if one of them is already in the store
+        or listed twice, none is. This is much faster than calling add_product in
+        a loop for large batches.
+
+        :param products: Product instances to add, in order
+        :raises ValueError: If a product already exists in the store or is listed twice,
+                            or a name is taken while a write-ahead log is attached
+        """
+        with self._state_lock:
+            self._check_log()
+            catalog = self._products
+            if catalog and any(product in catalog for product in products):
+                raise ValueError("Product already exists in the store")
+            if self._wal is not None:
+                self._check_new_names([product.name for product in products])
+            # Only dicts and tuples are allocated, none of which form cycles
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                self._insert_many(products)
+                lsn = 0
+                if self._wal is not None:
+                    for product in products:
+                        lsn = self._log_product_added(product)
+                if self._search_index is not None:
+                    self._search_index.add_many(products)
+            finally:
+                if gc_enabled:
+                    gc.enable()
+        self._wait_durable(lsn)
+
+    def add_rows(
+        self, rows: list[tuple[str, float, int]], validate: bool = True, in_cents: bool = False
+    ) -> None:
+        """
+        Create products from (name, price, quantity) rows and add them to the store.
+
+        :param rows: Field values of the new products, in order
+        :param validate: Whether to check the rows with the Product validation rules
+        :param in_cents: Whether the prices are already integer cents
+        :raises TypeError: If a field has the wrong type
+        :raises ValueError: If a field has an invalid value
+        """
+        self.add_products(Product.from_trusted_rows(rows, validate=validate, in_cents=in_cents))
+
+    def _insert(self, product: Product) -> None:
+        """
+        Register a new product in the catalog and its indexes.
+
+        Callers must hold the state lock and have checked that the product is new.
+
+        :param product: Product instance to add
+        """
+        self._products[product] = self._next_position
+        self._next_position += 1
+        name = product.name
+        if self._name_index.setdefault(name, product) is not product:
+            self._name_duplicates.setdefault(name, {})[product] = None
+        self._total_quantity += product.quantity
+        if product.active:
+            self._active[product] = None
+            self._active_cache = None
+            if self._price_index is not None:
+                self._price_index.add(product, product.price_cents)
+        if self._quantity_index is not None:
+            self._quantity_index.add(product, product.quantity)
+        ref = (self._ref,)
+        product._stores = self._live_store_refs(product) + ref if product._stores else ref
+        self._catalog_version += 1
+
+    def _insert_many(self, products: list[Product]) -> None:
+        """
+        Register a batch of new products in the catalog and its indexes.
+
+        Same as calling _insert for each product, but the catalog, the name
+        index and the active set are extended with bulk dict operations.
+        Callers must hold the state lock and have checked that none of the
+        products is in the store yet.
+
+        :param products: Product instances to add, in order
+        :raises ValueError: If a product is listed twice; nothing is changed
         """
-        if product in self.product_list:
+        start = self._next_position
+        positions = dict(zip(products, range(start, start + len(products))))
+        if len(positions) != len(products):
             raise ValueError("Product already exists in the store")
+        if self._products:
+            self._products.update(positions)
+        else:
+            self._products = positions
+        self._next_position = start + len(products)
+        names = list(map(attrgetter("name"), products))
+        batch_index = dict(zip(names, products)) if not self._name_index else None
+        if batch_index is not None and len(batch_index) == len(products):
+            self._name_index = batch_index
+        else:
+            for name, product in zip(names, products):
+                if self._name_index.setdefault(name, product) is not product:
+                    self._name_duplicates.setdefault(name, {})[product] = None
+        self._total_quantity += sum(map(attrgetter("_quantity"), products))
+        active = list(itertools.compress(products, map(attrgetter("_active"), products)))
+        if active:
+            if self._active:
+                self._active.update(dict.fromkeys(active))
+            else:
+                self._active = dict.fromkeys(active)
+            self._active_cache = None
+            if self._price_index is not None:
+                for product in active:
+                    self._price_index.add(product, product.price_cents)
+        if self._quantity_index is not None:
+            for product in products:
+                self._quantity_index.add(product, product.quantity)
+        ref = (self._ref,)
+        for product in products:
+            product._stores = self._live_store_refs(product) + ref if product._stores else ref
+        self._catalog_version += 1
+
+    @staticmethod
+    def _live_store_refs(product: Product) -> tuple:
+        """
+        References of a product to the stores that still exist.
 
-        self.product_list.append(product)
+        :param product: Product instance
+        :return: The product's store references without those of freed stores
+        """
+        return tuple(ref for ref in product._stores if ref() is not None)
 
     def remove_product(self, product: Product) -> None:
         """
         Remove a product from the store's product list.
 
+        Reservations holding the product are released, so their stock no
+        longer counts as held and they can no longer be confirmed.
+
+        :param product: Product instance to remove
+        :raises ValueError: If the product is not in the store
+        """
+        if product not in self:
+            raise ValueError("Product not found in the store")
+        with product._lock:
+            lsn = self._remove_locked(product)
+            self._drop_reservations_of(product)
+        self._wait_durable(lsn)
+
+    def _remove_locked(self, product: Product) -> int:
+        """
+        Remove a product from the catalog and its indexes.
+
+        Callers must hold the product's lock.
+
         :param product: Product instance to remove
+        :return: LSN of the remove record, or 0 without a log
+        :raises ValueError: If the product is not in the store
+        """
+        with self._state_lock:
+            self._check_log()
+            if product not in self._products:
+                raise ValueError("Product not found in the store")
+
+            product._stores = tuple(
+                ref for ref in self._live_store_refs(product) if ref is not self._ref
+            )
+            del self._products[product]
+            name = product.name
+            duplicates = self._name_duplicates.get(name)
+            if self._name_index[name] is product:
+                if duplicates:
+                    # The next namesake in insertion order takes over the name
+                    successor = next(iter(duplicates))
+                    self._name_index[name] = successor
+                    del duplicates[successor]
+                else:
+                    del self._name_index[name]
+            else:
+                del duplicates[product]
+            if duplicates is not None and not duplicates:
+                del self._name_duplicates[name]
+            self._total_quantity -= product.quantity
+            if product in self._active:
+                del self._active[product]
+                self._active_cache = None
+            if self._search_index is not None:
+                self._search_index.remove(product)
+            if self._price_index is not None:
+                self._price_index.discard(product)
+            if self._quantity_index is not None:
+                self._quantity_index.discard(product)
+            self._catalog_version += 1
+            return self._log({"op": "remove", "name": name})
+
+    def _drop_reservations_of(self, product: Product) -> None:
+        """
+        Release every reservation holding a product.
+
+        Callers must hold the product's lock. Each reservation holds a single
+        product, so no other locks are needed.
+
+        :param product: Product whose holds are released
+        """
+        if product not in self._reserved:
+            return
+        with self._reservation_lock:
+            reservation_ids = tuple(self._reservations_by_product.get(product, ()))
+        self._take_reservations(reservation_ids)
+
+    def get_product_by_name(self, name: str) -> Product | None:
+        """
+        Look up a product by its exact name.
+
+        If several products share the name, the one added first is returned.
+
+        :param name: Exact product name
+        :return: The matching Product instance, or None if there is none
+        """
+        return self._name_index.get(name)
+
+    def search_prefix(self, prefix: str, limit: int | None = DEFAULT_SEARCH_LIMIT) -> list[Product]:
+        """
+        Find active products whose name starts with a prefix, ignoring case.
+
+        The search index is built on the first search and kept up to date
+        afterward, so searches take time proportional to the number of results.
+
+        :param prefix: Start of the name
+        :param limit: Largest number of results, or None for all
+        :return: Matching products in name order
+        """
+        return self._get_search_index().prefix(prefix, limit)
+
+    def search_tokens(self, query: str, limit: int | None = DEFAULT_SEARCH_LIMIT) -> list[Product]:
+        """
+        Find active products whose name contains every word of a query, ignoring case.
+
+        For example "pixel" finds "Google Pixel 7".
+
+        :param query: One or more words
+        :param limit: Largest number of results, or None for all
+        :return: Matching products in catalog order
+        """
+        return self._get_search_index().tokens(query, limit)
+
+    def _get_search_index(self) -> SearchIndex:
+        """
+        Return the search index, building it on first use.
+
+        :return: The store's search index
+        """
+        search_index = self._search_index
+        if search_index is None:
+            with self._state_lock:
+                if self._search_index is None:
+                    self._search_index = SearchIndex(self.product_list)
+                search_index = self._search_index
+        return search_index
+
+    def price_range(self, low: float, high: float) -> list[Product]:
+        """
+        Find the active products priced between two bounds (inclusive).
+
+        The price index is built on the first query and kept up to date
+        afterward, so a query takes O(log n + k) for k results. The bounds are
+        rounded to whole cents like product prices.
+
+        :param low: Lowest price
+        :param high: Highest price
+        :return: Matching products, cheapest first
+        """
+        with self._state_lock:
+            if self._price_index is None:
+                self._price_index = SortedIndex(
+                    (product, product.price_cents) for product in self._active
+                )
+            return self._price_index.range(to_cents(low), to_cents(high))
+
+    def low_stock(self, threshold: int) -> list[Product]:
+        """
+        Find every product (active or not) whose quantity is below a threshold.
+
+        The quantity index is built on the first query and kept up to date
+        afterward, so a query takes O(log n + k) for k results. Products are
+        returned lowest stock first; products with equal stock come in the
+        order they reached it. ColumnarStore.low_stock uses the same order.
+
+        :param threshold: Quantity limit; products with fewer items are returned
+        :return: Matching products, lowest stock first
+        """
+        with self._state_lock:
+            if self._quantity_index is None:
+                self._quantity_index = SortedIndex(
+                    (product, product.quantity) for product in self._products
+                )
+            return self._quantity_index.range(None, threshold, inclusive=False)
+
+    def inventory_value(self) -> int:
+        """
+        Total value of the stock held, summed over price times quantity of every product.
+
+        :return: Inventory value in cents
+        """
+        with self._state_lock:
+            return sum(product.price_cents * product.quantity for product in self._products)
+
+    def bulk_set_quantities(self, products: Iterable[Product], quantities: Iterable[int]) -> None:
+        """
+        Set the quantities of many products at once.
+
+        Gives the same result as calling set_quantity on each product in turn,
+        including deactivating products whose quantity is set to 0. All
+        quantities are validated before any of them is applied.
+
+        :param products: Products of this store
+        :param quantities: New quantity for each product
+        :raises ValueError: If a product is not in the store or a quantity is negative
+        :raises TypeError: If a quantity is not an integer
+        """
+        for product, quantity in self._bulk_arguments(products, quantities):
+            product.set_quantity(quantity)
+
+    def bulk_restock(self, products: Iterable[Product], amounts: Iterable[int]) -> None:
+        """
+        Add stock to many products at once.
+
+        Gives the same result as calling
+        ``product.set_quantity(product.get_quantity() + amount)`` for each pair in
+        turn. Amounts for a product listed several times are added up.
+
+        :param products: Products of this store
+        :param amounts: Non-negative amount to add for each product
+        :raises ValueError: If a product is not in the store or an amount is negative
+        :raises TypeError: If an amount is not an integer
+        """
+        totals = {}
+        for product, amount in self._bulk_arguments(products, amounts):
+            totals[product] = totals.get(product, 0) + amount
+        for product, amount in totals.items():
+            with product._lock:
+                product.quantity += amount
+                if product.quantity <= 0:
+                    product.active = False
+
+    def bulk_markdown(self, products: Iterable[Product], percent: float) -> None:
+        """
+        Reduce the price of a set of products by a percentage.
+
+        Each product is marked down once, even if it is listed several times.
+        New prices are rounded to the nearest cent, halves to even. The locks
+        of all products are held while the prices change, and the new prices
+        are logged as one record when a write-ahead log is attached.
+
+        :param products: Products of this store
+        :param percent: Discount between 0 and 100
+        :raises ValueError: If a product is not in the store or percent is out of range
+        :raises TypeError: If percent is not a number
+        :raises OSError: If the write-ahead log has failed
+        """
+        factor = self._markdown_factor(percent)
+        products = list(dict.fromkeys(products))
+        for product in products:
+            if product not in self:
+                raise ValueError("Product not found in the store")
+        if not products:
+            return
+        locks = self._acquire_locks(products)
+        try:
+            self._check_log()
+            for product in products:
+                product.price_cents = round(product.price_cents * factor)
+            lsn = self._log_prices(products)
+        finally:
+            self._release_locks(locks)
+        self._wait_durable(lsn)
+
+    @staticmethod
+    def _markdown_factor(percent: float) -> float:
+        """
+        Validate a markdown percentage and turn it into a price factor.
+
+        :param percent: Discount between 0 and 100
+        :return: Factor to multiply prices with
+        :raises ValueError: If percent is not between 0 and 100
+        :raises TypeError: If percent is not a number
+        """
+        if isinstance(percent, bool) or not isinstance(percent, (int, float)):
+            raise TypeError("Markdown percent must be a number")
+        if not 0 <= percent <= 100:
+            raise ValueError("Markdown percent must be between 0 and 100")
+        return 1 - percent / 100
+
+    def _log_prices(self, products: Iterable[Product]) -> int:
+        """
+        Log the current prices of some products as one record, if a log is attached.
+
+        Callers hold the locks of the products.
+
+        :param products: Products whose prices changed
+        :return: The record's LSN, or 0 without a log
+        """
+        if self._wal is None:
+            return 0
+        return self._log({
+            "op": "set_prices",
+            "items": [[product.name, product.price_cents] for product in products],
+        })
+
+    def _bulk_arguments(
+        self, products: Iterable[Product], values: Iterable[int]
+    ) -> list[tuple[Product, int]]:
+        """
+        Resolve and validate the arguments of a bulk quantity update.
+
+        :param products: Products of this store
+        :param values: One non-negative integer per product
+        :return: List of (product, value) pairs
+        :raises ValueError: If the lengths differ, a product is not in the store or a
+                            value is negative
+        :raises TypeError: If a value is not an integer
         """
-        self.product_list.remove(product)
+        products, values = list(products), list(values)
+        if len(values) != len(products):
+            raise ValueError("Products and quantities must have the same length")
+        for product, value in zip(products, values):
+            if product not in self:
+                raise ValueError("Product not found in the store")
+            Product.validate_quantity(value)
+        return list(zip(products, values))
+
+    def add_sold_out_listener(self, listener: Callable[[Product], None]) -> None:
+        """
+        Call a function whenever a product's stock drops to zero.
+
+        Listeners run in the thread that sold the last item, while the
+        product's lock is held, so they must not change that product's stock.
+
+        :param listener: Called as listener(product)
+        """
+        self._sold_out_listeners.append(listener)
+
+    def remove_sold_out_listener(self, listener: Callable[[Product], None]) -> None:
+        """
+        Stop calling a function added with add_sold_out_listener.
+
+        :param listener: The listener to remove
+        :raises ValueError: If the listener was not added
+        """
+        self._sold_out_listeners.remove(listener)
+
+    def _notify_sold_out(self, products: list[Product]) -> None:
+        """
+        Call the sold-out listeners for products whose stock just dropped to zero.
+
+        :param products: The sold-out products
+        """
+        for listener in self._sold_out_listeners:
+            for product in products:
+                listener(product)
 
     def get_total_quantity(self) -> int:
         """
         Get the total number of products in the store.
 
+        The total is maintained incrementally, so this is O(1).
+
         :return: Number of products
         """
+        return self._total_quantity
+
+    def get_available_quantity(self, product: Product | None = None) -> int:
+        """
+        Get the quantity that can still be sold, i.e. stock not held by reservations.
+
+        Held quantities are maintained incrementally, so this is O(1).
 
-        return sum(product.quantity for product in self.product_list)
+        :param product: A product of the store, or None for the whole store
+        :return: Available-to-sell quantity
+        """
+        if product is None:
+            return self._total_quantity - self._total_reserved
+        return max(0, product.quantity - self._reserved.get(product, 0))
 
     def get_all_products(self) -> list[Product]:
         """
         Retrieve all active products currently in the store.
 
-        :return: List of active Product instances
+        The list is cached and only rebuilt after the set of active products
+        changes. It is shared between callers and must be treated as read-only.
+
+        :return: List of active Product instances in catalog order
         """
-        return [product for product in self.product_list if product.active]
+        active_cache = self._active_cache
+        if active_cache is None:
+            with self._state_lock:
+                if not self._active_in_order:
+                    positions = self._products
+                    ordered = sorted(self._active, key=positions.__getitem__)
+                    self._active = dict.fromkeys(ordered)
+                    self._active_in_order = True
+                active_cache = self._active_cache = list(self._active)
+        return active_cache
+
+    def get_products_page(self, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE) -> list[Product]:
+        """
+        Retrieve one page of the active products.
+
+        Pages are slices of get_all_products, so they follow the same stable
+        catalog order and cost O(limit) once the active list is cached.
+
+        :param offset: Number of active products to skip
+        :param limit: Largest number of products to return
+        :return: Active products at positions offset to offset + limit
+        :raises ValueError: If offset or limit is negative
+        """
+        if offset < 0 or limit < 0:
+            raise ValueError("Offset and limit cannot be negative")
+        return self.get_all_products()[offset:offset + limit]
+
+    def count_active_products(self) -> int:
+        """
+        Count the active products, i.e. the products available for listing.
+
+        :return: Number of active products
+        """
+        return len(self.get_all_products())
+
+    def _on_quantity_changed(self, product: Product, old_quantity: int, new_quantity: int) -> None:
+        """
+        Update the running total after a product's stock changed.
+
+        :param product: The product whose quantity changed
+        :param old_quantity: Quantity before the change
+        :param new_quantity: Quantity after the change
+        """
+        with self._state_lock:
+            self._total_quantity += new_quantity - old_quantity
+            if self._quantity_index is not None:
+                self._quantity_index.add(product, new_quantity)
+        if new_quantity == 0 and old_quantity > 0:
+            self._notify_sold_out([product])
+        if self._wal is not None and not getattr(self._logging, "in_order", False):
+            self._wait_durable(
+                self._log({"op": "set_quantity", "name": product.name, "quantity": new_quantity})
+            )
+
+    def _on_price_changed(
+        self, product: Product, old_price_cents: int, new_price_cents: int
+    ) -> None:
+        """
+        Move a product within the price index after its price changed.
+
+        :param product: The product whose price changed
+        :param old_price_cents: Price in cents before the change
+        :param new_price_cents: Price in cents after the change
+        """
+        with self._state_lock:
+            if self._price_index is not None and product in self._price_index:
+                self._price_index.add(product, new_price_cents)
+
+    def _on_active_changed(self, product: Product) -> None:
+        """
+        Update the active set after a product was activated or deactivated.
+
+        :param product: The product whose status changed
+        """
+        with self._state_lock:
+            if product.active:
+                self._active[product] = None
+                # A re-activated product is appended at the end of the active set
+                self._active_in_order = False
+                if self._price_index is not None:
+                    self._price_index.add(product, product.price_cents)
+            else:
+                self._active.pop(product, None)
+                if self._price_index is not None:
+                    self._price_index.discard(product)
+            self._active_cache = None
+        if self._wal is not None and not getattr(self._logging, "in_order", False):
+            self._wait_durable(
+                self._log({"op": "set_active", "name": product.name, "active": product.active})
+            )
+
+    def attach_wal(self, wal: WriteAheadLog) -> None:
+        """
+        Record every further change of the store in a write-ahead log.
+
+        Orders are logged as one record each; restocks, activations, bulk
+        markdowns and catalog changes as state records. Every change is durable according to
+        the log's sync mode before the call that made it returns.
+
+        If writing the log fails, the call waiting for it raises OSError even
+        though its change was already applied in memory, and the log stays
+        failed (see wal). From then on orders, confirms and catalog changes
+        are rejected before they change anything; changes made directly on a
+        product still apply in memory but raise. Recover the store from disk
+        to get back to a state that matches the log.
+
+        Records refer to products by name, so names must be unique while a
+        log is attached: adding a product whose name is taken raises
+        ValueError. Renaming a product is not logged.
+
+        :param wal: The log to append to
+        :raises ValueError: If several products share a name
+        """
+        with self._state_lock:
+            if self._has_duplicate_names():
+                raise ValueError("Product names must be unique to attach a write-ahead log")
+            self._wal = wal
+
+    def _has_duplicate_names(self) -> bool:
+        """
+        Tell whether several products share a name.
+
+        Callers must hold the state lock.
+
+        :return: True if a name is used more than once
+        """
+        return bool(self._name_duplicates)
+
+    def _check_new_names(self, names: list[str]) -> None:
+        """
+        Check that names are unique among themselves and not taken in the store.
+
+        Callers must hold the state lock.
+
+        :param names: Names of the products about to be added
+        :raises ValueError: If a name is taken or listed twice
+        """
+        if len(set(names)) != len(names) or any(name in self._name_index for name in names):
+            raise ValueError("Product names must be unique while a write-ahead log is attached")
+
+    @classmethod
+    def recover(
+        cls,
+        snapshot_path: str,
+        wal_path: str,
+        product_list: list[Product] = (),
+        sync: str = SYNC_GROUP,
+    ) -> "Store":
+        """
+        Rebuild a store after a restart or crash and keep logging to the same log.
+
+        The most recent snapshot is loaded (or, if there is none, a store is
+        built from product_list) and every log record newer than the snapshot
+        is replayed on top of it. Products are identified by name in the log,
+        so names must be unique (see attach_wal).
+
+        :param snapshot_path: Snapshot file path; it may not exist yet
+        :param wal_path: Write-ahead log file path; it may not exist yet
+        :param product_list: Initial products used when there is no snapshot
+        :param sync: Durability mode for the reopened log
+        :return: The recovered store with the log attached
+        """
+        if os.path.exists(snapshot_path):
+            store = cls.load_snapshot(snapshot_path)
+        else:
+            store = cls(list(product_list))
+        for record in read_log(wal_path, after_lsn=store._lsn):
+            store._apply_record(record)
+        # Continue numbering after the snapshot even if compaction emptied the log
+        store.attach_wal(WriteAheadLog(wal_path, sync=sync, start_lsn=store._lsn))
+        return store
+
+    def checkpoint(self, snapshot_path: str) -> None:
+        """
+        Save a snapshot and drop the log records it makes redundant (log compaction).
+
+        :param snapshot_path: Snapshot file path
+        """
+        lsn = self.save_snapshot(snapshot_path)
+        if self._wal is not None:
+            self._wal.compact(lsn)
+
+    @property
+    def lsn(self) -> int:
+        """Sequence number of the last logged or replayed change."""
+        return self._wal.lsn if self._wal is not None else self._lsn
+
+    def _check_log(self) -> None:
+        """
+        Reject a change up front once the attached log has failed.
+
+        :raises OSError: If the write-ahead log is marked as failed
+        """
+        if self._wal is not None:
+            self._wal.check()
+
+    def _log(self, record: dict) -> int:
+        """
+        Append a record to the write-ahead log, if one is attached.
+
+        Callers hold the locks that order the change against other changes to
+        the same products, so the log order matches the order of application.
+
+        :param record: Record describing the change
+        :return: The record's LSN, or 0 without a log
+        """
+        if self._wal is None:
+            return 0
+        return self._wal.append(record)
+
+    def _log_product_added(self, product: Product) -> int:
+        """
+        Log that a product was added to the catalog.
+
+        :param product: The new product
+        :return: The record's LSN, or 0 without a log
+        """
+        if self._wal is None:
+            return 0
+        return self._wal.append({
+            "op": "add",
+            "name": product.name,
+            "price_cents": product.price_cents,
+            "quantity": product.quantity,
+            "active": product.active,
+        })
+
+    def _wait_durable(self, lsn: int) -> None:
+        """
+        Wait until a logged change is durable.
+
+        :param lsn: LSN returned by _log, or 0 for nothing to wait for
+        """
+        if lsn:
+            self._wal.wait(lsn)
+
+    def _apply_record(self, record: dict) -> None:
+        """
+        Re-apply one write-ahead log record during recovery.
+
+        :param record: A record read from the log
+        """
+        op = record["op"]
+        if op == "add":
+            # Logs written before prices were kept in cents record the price itself
+            if "price_cents" in record:
+                price_cents = record["price_cents"]
+            else:
+                price_cents = to_cents(record["price"])
+            self._replay_add(record["name"], price_cents, record["quantity"], record["active"])
+        elif op == "remove":
+            self.remove_product(self.get_product_by_name(record["name"]))
+        elif op == "order":
+            for name, quantity in record["lines"]:
+                self.get_product_by_name(name)._remove_stock(quantity)
+        elif op == "set_quantity":
+            self._replay_set_quantity(record["name"], record["quantity"])
+        elif op == "set_quantities":
+            for name, quantity in record["items"]:
+                self._replay_set_quantity(name, quantity)
+        elif op == "set_active":
+            self.get_product_by_name(record["name"]).active = record["active"]
+        elif op == "set_prices":
+            for name, price_cents in record["items"]:
+                self.get_product_by_name(name).price_cents = price_cents
+        else:
+            raise ValueError(f"Unknown log record: {op!r}")
+        self._lsn = record["lsn"]
+
+    def _replay_add(self, name: str, price_cents: int, quantity: int, active: bool) -> None:
+        """
+        Re-create a logged product.
+
+        :param name: Name of the product
+        :param price_cents: Price of the product in cents
+        :param quantity: Stock when it was added
+        :param active: Status when it was added
+        """
+        product = Product.from_trusted_rows([(name, price_cents, quantity)], in_cents=True)[0]
+        product.active = active
+        self.add_product(product)
+
+    def _replay_set_quantity(self, name: str, quantity: int) -> None:
+        """
+        Re-apply a logged quantity change with the semantics of Product.set_quantity.
+
+        :param name: Name of the product
+        :param quantity: New quantity
+        """
+        product = self.get_product_by_name(name)
+        product.quantity = quantity
+        if quantity <= 0:
+            product.active = False
+
+    def save_snapshot(self, path: str) -> int:
+        """
+        Save the state of every product to a binary snapshot file.
+
+        All product locks and the state lock are held while the state is copied,
+        so the snapshot never contains half of an order and matches exactly
+        one point of the write-ahead log.
+
+        :param path: Destination file path
+        :return: LSN of the last change contained in the snapshot
+        """
+        while True:
+            with self._state_lock:
+                version = self._catalog_version
+                products = list(self._products)
+            locks = self._acquire_locks(products)
+            try:
+                with self._state_lock:
+                    if self._catalog_version != version:
+                        # The catalog changed while the locks were taken
+                        continue
+                    lsn = self.lsn
+                    names = [product.name for product in products]
+                    prices = array("q", [product.price_cents for product in products])
+                    quantities = array("q", [product.quantity for product in products])
+                    flags = bytearray(product.active for product in products)
+                    break
+            finally:
+                self._release_locks(locks)
+        write_snapshot(path, names, prices, quantities, flags, lsn)
+        return lsn
+
+    @classmethod
+    def load_snapshot(cls, path: str) -> "Store":
+        """
+        Create a store from a binary snapshot file.
+
+        The snapshot's checksum is verified, so products are rebuilt without
+        running the per-product validators, and they are registered with bulk
+        dict operations. One Product object is still built per row, which
+        takes about two seconds per million products; ColumnarStore loads the
+        same file in a fraction of that.
+
+        :param path: Snapshot file path
+        :return: A new store holding the saved products in their saved order
+        :raises ValueError: If the file is not a valid snapshot
+        """
+        names, prices, quantities, flags, lsn = read_snapshot(path)
+        products = Product.from_trusted_rows(
+            zip(names, prices, quantities), validate=False, in_cents=True
+        )
+        for product, flag in zip(products, flags):
+            if not flag:
+                product._active = False
+        store = cls([])
+        store.add_products(products)
+        store._lsn = lsn
+        return store
 
     def print_products(self) -> None:
         """
         Print a numbered list of all active products in the store.
+
+        The whole list is written at once. Use get_products_page to show large
+        catalogs a page at a time.
         """
 
         active_products = self.get_all_products()
         if not active_products:
             print("No products available.")
         else:
-            print()
-            print("Available products:")
-            for idx, product in enumerate(active_products, start=1):
-                print(f"{idx}. ", end="")
-                product.show()
-            print()
+            lines = [
+                f"{idx}. {product.name}, Price: {format_cents(product.price_cents)}, "
+                f"Quantity: {product.quantity}\n"
+                for idx, product in enumerate(active_products, start=1)
+            ]
+            sys.stdout.write("\nAvailable products:\n" + "".join(lines) + "\n")
 
-    def order(self, shopping_list: list[tuple[Product, int]]) -> float:
+    def order(self, shopping_list: list[tuple[Product, int]]) -> int:
         """
         Process a shopping list order by validating and purchasing the listed products.
 
+        The order is all-or-nothing: quantities are aggregated per product, every
+        product's stock is checked against its aggregated quantity, and only then
+        are the stock levels decremented. If anything fails, no stock is changed.
+
+        The order is safe to call from several threads at once. It holds the locks
+        of the products it touches (acquired in a fixed global order, so orders
+        cannot deadlock) while checking and decrementing stock, so orders on
+        disjoint products do not block each other.
+
         :param shopping_list: A list of tuples containing (Product, quantity)
-        :return: Total price of the order
+        :return: Total price of the order in cents, after promotions (see pricing)
+        :raises ValueError: If a product is inactive or does not have enough stock
         """
-        self.validate_shopping_list(shopping_list)
+        lines = self.validate_shopping_list(shopping_list)
+        self.expire_reservations()
+        locks = self._acquire_locks(lines)
+        try:
+            for product, quantity in lines.items():
+                if not product.active:
+                    raise ValueError("Product is not active")
+                self._check_available(product, quantity)
+            # Priced under the locks, so the total matches the prices the stock was sold at
+            total = self._price_lines(lines)
+            lsn = self._commit_logged(lines)
+        finally:
+            self._release_locks(locks)
+        self._wait_durable(lsn)
+        return total
 
-        total_price = 0
-        for product, quantity in shopping_list:
-            self.validate_product(product)
-            total_price += product.buy(quantity)
-        return total_price
+    def order_many(
+        self, carts: list[list[tuple[Product, int]]], on_error: str = ON_ERROR_SKIP
+    ) -> OrderBatchResult:
+        """
+        Process a batch of shopping lists in one call.
+
+        Every cart is validated once, the locks of all products in the batch are
+        taken once, and stock is allocated to the carts strictly in input order,
+        so the outcome is the same as calling order for each cart in turn. Stock
+        is then decremented once per product for the whole batch.
+
+        :param carts: List of shopping lists, each a list of (Product, quantity) tuples
+        :param on_error: "skip" to record a failing cart and continue, or "abort" to
+                         reject the whole batch without changing any stock
+        :return: Per-cart totals and failures
+        :raises ValueError: If on_error is not a known policy
+        :raises BatchOrderError: If a cart fails and on_error is "abort"
+        """
+        if on_error not in (ON_ERROR_SKIP, ON_ERROR_ABORT):
+            raise ValueError(f"Unknown error policy: {on_error!r}")
+
+        totals: list[int | None] = []
+        failures: dict[int, Exception] = {}
+        cart_lines: list[dict[Product, int] | None] = []
+        for idx, shopping_list in enumerate(carts):
+            try:
+                cart_lines.append(self.validate_shopping_list(shopping_list))
+            except (TypeError, ValueError) as error:
+                if on_error == ON_ERROR_ABORT:
+                    raise BatchOrderError(idx, error) from error
+                failures[idx] = error
+                cart_lines.append(None)
+
+        batch_products = {product for lines in cart_lines if lines for product in lines}
+        self.expire_reservations()
+        locks = self._acquire_locks(batch_products)
+        try:
+            remaining = {product: product.quantity for product in batch_products}
+            for idx, lines in enumerate(cart_lines):
+                if lines is None:
+                    totals.append(None)
+                    continue
+                try:
+                    self._allocate(lines, remaining, self._reserved)
+                except ValueError as error:
+                    if on_error == ON_ERROR_ABORT:
+                        raise BatchOrderError(idx, error) from error
+                    failures[idx] = error
+                    totals.append(None)
+                    continue
+                totals.append(self._price_lines(lines))
+
+            sold = {
+                product: product.quantity - left
+                for product, left in remaining.items()
+                if left != product.quantity
+            }
+            lsn = self._commit_logged(sold) if sold else 0
+        finally:
+            self._release_locks(locks)
+        self._wait_durable(lsn)
+        return OrderBatchResult(totals, failures)
 
     @staticmethod
-    def validate_shopping_list(shopping_list: list[tuple[Product, int]]) -> None:
+    def _allocate(
+        lines: dict[Product, int], remaining: dict[Product, int], reserved: dict[Product, int]
+    ) -> None:
+        """
+        Allocate one cart against the working stock of a batch.
+
+        A product sold out by an earlier cart of the batch counts as inactive, just
+        as it would after a real purchase. The working stock is only changed if
+        every line of the cart fits.
+
+        :param lines: Validated cart lines
+        :param remaining: Working stock per product, updated in place
+        :param reserved: Quantity per product held by reservations
+        :raises ValueError: If a product is inactive or lacks stock for the cart
+        """
+        for product, quantity in lines.items():
+            if not product.active or (remaining[product] == 0 and product.quantity > 0):
+                raise ValueError("Product is not active")
+            available = remaining[product] - reserved.get(product, 0)
+            if quantity > available:
+                raise ValueError(
+                    f"Requested quantity ({quantity}) exceeds available stock ({available})."
+                )
+        for product, quantity in lines.items():
+            remaining[product] -= quantity
+
+    def _check_available(self, product: Product, quantity: int) -> None:
+        """
+        Check that enough stock not held by reservations is left for a quantity.
+
+        Callers must hold the product's lock.
+
+        :param product: Product to check
+        :param quantity: Requested quantity
+        :raises ValueError: If the available quantity is smaller than requested
+        """
+        available = product.quantity - self._reserved.get(product, 0)
+        if quantity > available:
+            raise ValueError(
+                f"Requested quantity ({quantity}) exceeds available stock ({available})."
+            )
+
+    def reserve(
+        self, product: Product, quantity: int, ttl: float | None = DEFAULT_RESERVATION_TTL
+    ) -> int:
+        """
+        Hold stock of a product for a later order.
+
+        Held stock is not sold to anyone else until the reservation is confirmed,
+        released or expires after ttl seconds. It stays promised to the holder
+        even if the product is deactivated in the meantime. No lock is kept
+        between calls, so a slow checkout never blocks other buyers.
+        Reservations live in memory only; holds that were never confirmed are
+        gone after a restart.
+
+        :param product: Product of the store to hold
+        :param quantity: Quantity to hold
+        :param ttl: Seconds until the hold expires, or None for a hold that
+                    lasts until it is confirmed or released
+        :return: Reservation id for confirm or release
+        :raises TypeError: If the product or quantity has the wrong type
+        :raises ValueError: If the product is not in the store, is inactive or
+                            lacks available stock
+        """
+        self.validate_product(product)
+        self.validate_quantity(quantity)
+        self.expire_reservations()
+        with product._lock:
+            # Checked under the lock, so a concurrent remove_product cannot leave a hold behind
+            if product not in self:
+                raise ValueError("Product not found in the store")
+            if not product.active:
+                raise ValueError("Product is not active")
+            self._check_available(product, quantity)
+            self._reserved[product] = self._reserved.get(product, 0) + quantity
+            with self._reservation_lock:
+                reservation_id = next(self._reservation_ids)
+                expires_at = math.inf if ttl is None else time.monotonic() + ttl
+                self._reservations[reservation_id] = ({product: quantity}, expires_at)
+                self._reservations_by_product.setdefault(product, {})[reservation_id] = None
+                if ttl is not None:
+                    heapq.heappush(self._expiry_heap, (expires_at, reservation_id))
+                self._total_reserved += quantity
+        return reservation_id
+
+    def confirm(self, *reservation_ids: int) -> int:
+        """
+        Buy the stock held by one or more reservations as a single order.
+
+        Held stock is sold even if its product was deactivated after the hold
+        was made. The order is all-or-nothing: if a reservation is unknown or
+        expired, its product was removed, or its stock was set below the held
+        quantity in the meantime, nothing is bought and the holds are kept
+        until they are released or expire.
+
+        :param reservation_ids: Ids returned by reserve
+        :return: Total price of the order in cents
+        :raises ValueError: If no id is given, a reservation is unknown or expired,
+                            or a product was removed or lacks stock
+        """
+        if not reservation_ids:
+            raise ValueError("No reservations to confirm")
+        reservation_ids = tuple(dict.fromkeys(reservation_ids))
+        lines: dict[Product, int] = {}
+        with self._reservation_lock:
+            for reservation_id in reservation_ids:
+                held = self._reservations.get(reservation_id)
+                if held is None:
+                    raise ValueError(f"Unknown reservation: {reservation_id}")
+                for product, quantity in held[0].items():
+                    lines[product] = lines.get(product, 0) + quantity
+
+        locks = self._acquire_locks(lines)
+        try:
+            now = time.monotonic()
+            with self._reservation_lock:
+                for reservation_id in reservation_ids:
+                    held = self._reservations.get(reservation_id)
+                    if held is None or held[1] <= now:
+                        raise ValueError(f"Reservation {reservation_id} has expired")
+            for product, quantity in lines.items():
+                if product not in self:
+                    raise ValueError("Product not found in the store")
+                product.validate_stock(quantity)
+            total = self._price_lines(lines)
+            self._take_reservations(reservation_ids)
+            lsn = self._commit_logged(lines)
+        finally:
+            self._release_locks(locks)
+        self._wait_durable(lsn)
+        return total
+
+    def release(self, *reservation_ids: int) -> None:
+        """
+        Give the stock held by reservations back for sale.
+
+        Ids of reservations that were already confirmed, released or expired are
+        ignored.
+
+        :param reservation_ids: Ids returned by reserve
+        """
+        with self._reservation_lock:
+            products = {
+                product
+                for reservation_id in reservation_ids
+                if reservation_id in self._reservations
+                for product in self._reservations[reservation_id][0]
+            }
+        if not products:
+            return
+        locks = self._acquire_locks(products)
+        try:
+            self._take_reservations(reservation_ids)
+        finally:
+            self._release_locks(locks)
+
+    def expire_reservations(self, now: float | None = None) -> int:
+        """
+        Release every reservation whose TTL has passed.
+
+        Reservations are kept in a heap ordered by expiry, so a sweep only
+        touches the expired ones. Orders and new reservations sweep first, so
+        calling this explicitly is only needed to free holds of an idle store.
+
+        :param now: Time to expire against, in time.monotonic() seconds; defaults to now
+        :return: Number of reservations that expired
+        """
+        heap = self._expiry_heap
+        if now is None:
+            now = time.monotonic()
+        if not heap or heap[0][0] > now:
+            return 0
+        expired = []
+        with self._reservation_lock:
+            while heap and heap[0][0] <= now:
+                _, reservation_id = heapq.heappop(heap)
+                if reservation_id in self._reservations:
+                    expired.append(reservation_id)
+        self.release(*expired)
+        return len(expired)
+
+    def _take_reservations(self, reservation_ids: tuple[int, ...]) -> None:
+        """
+        Drop reservations and stop holding their stock.
+
+        Callers must hold the locks of all products of the reservations.
+
+        :param reservation_ids: Ids of the reservations; unknown ids are ignored
+        """
+        with self._reservation_lock:
+            for reservation_id in reservation_ids:
+                held = self._reservations.pop(reservation_id, None)
+                if held is None:
+                    continue
+                for product, quantity in held[0].items():
+                    left = self._reserved[product] - quantity
+                    if left:
+                        self._reserved[product] = left
+                    else:
+                        del self._reserved[product]
+                    self._total_reserved -= quantity
+                    holding = self._reservations_by_product[product]
+                    del holding[reservation_id]
+                    if not holding:
+                        del self._reservations_by_product[product]
+            # Confirmed and released reservations leave stale heap entries behind
+            heap = self._expiry_heap
+            if len(heap) > 2 * len(self._reservations) + 1024:
+                heap[:] = [
+                    (expires_at, reservation_id)
+                    for reservation_id, (_, expires_at) in self._reservations.items()
+                    if expires_at != math.inf
+                ]
+                heapq.heapify(heap)
+
+    @staticmethod
+    def _acquire_locks(products) -> list[threading.Lock]:
+        """
+        Acquire the locks of the given products in a deadlock-free order.
+
+        Locks are taken sorted by object id, so two orders that share products
+        always acquire them in the same sequence.
+
+        :param products: Iterable of Product instances
+        :return: The acquired locks, to be passed to _release_locks
+        """
+        locks = sorted({product._lock for product in products}, key=id)
+        acquired = []
+        try:
+            for lock in locks:
+                lock.acquire()
+                acquired.append(lock)
+        except BaseException:
+            Store._release_locks(acquired)
+            raise
+        return acquired
+
+    @staticmethod
+    def _release_locks(locks: list[threading.Lock]) -> None:
+        """
+        Release locks taken by _acquire_locks.
+
+        :param locks: Locks in acquisition order
+        """
+        for lock in reversed(locks):
+            lock.release()
+
+    def _commit_logged(self, lines: dict[Product, int]) -> int:
+        """
+        Apply a validated order and append it to the write-ahead log as one record.
+
+        Callers must hold the locks of all products in the order, and wait for
+        the returned LSN after releasing them.
+
+        :param lines: Mapping of product to aggregated quantity, already validated
+        :return: The order record's LSN, or 0 without a log
+        :raises OSError: If the log failed earlier; no stock is changed
+        """
+        if self._wal is None:
+            self._commit_lines(lines)
+            return 0
+        self._check_log()
+        self._logging.in_order = True
+        try:
+            self._commit_lines(lines)
+        finally:
+            self._logging.in_order = False
+        return self._wal.append({
+            "op": "order",
+            "lines": [[product.name, quantity] for product, quantity in lines.items()],
+        })
+
+    @staticmethod
+    def _commit_lines(lines: dict[Product, int]) -> None:
+        """
+        Decrement the stock of every product in a validated order.
+
+        Callers must hold the locks of all products in the order. The quantity
+        and status of each product are recorded first; if a line fails, every
+        product of the order is put back to exactly that state, including the
+        one whose line failed.
+
+        :param lines: Mapping of product to aggregated quantity, already validated
+        """
+        original = [(product, product.quantity, product.active) for product in lines]
+        try:
+            for product, quantity in lines.items():
+                product._remove_stock(quantity)
+        except Exception:
+            for product, quantity, active in reversed(original):
+                if product.quantity != quantity:
+                    product.quantity = quantity
+                if product.active != active:
+                    product.active = active
+            raise
+
+    def _price_lines(self, lines: dict[Product, int]) -> int:
+        """
+        Price the lines of an order, applying the promotions of the pricing engine.
+
+        :param lines: Mapping of product to aggregated quantity
+        :return: Total price in cents
+        """
+        pricing = self.pricing
+        if pricing is None:
+            return sum(product.price_cents * quantity for product, quantity in lines.items())
+        return pricing.total(lines)
+
+    @staticmethod
+    def validate_shopping_list(shopping_list: list[tuple[Product, int]]) -> dict[Product, int]:
         """
         Validate that the shopping list is a non-empty list of valid product-quantity tuples.
 
+        Each line is validated exactly once. Lines for the same product are merged.
+
         :param shopping_list: List of (Product, int) tuples
+        :return: Mapping of each product to its total requested quantity, in first-seen order
         :raises TypeError: If shopping_list is not a list or items are of incorrect types
         :raises ValueError: If the list is empty
         """
@@ -109,20 +1469,23 @@ class Store:
             raise TypeError("Invalid shopping list type")
         if len(shopping_list) == 0:
             raise ValueError("Shopping list is empty")
+        lines: dict[Product, int] = {}
         for product, quantity in shopping_list:
             Store.validate_product(product)
             Store.validate_quantity(quantity)
+            lines[product] = lines.get(product, 0) + quantity
+        return lines
 
     @staticmethod
     def validate_product(product: Product) -> None:
         """
-        Validate that a given product is an instance of Product and is active.
+        Validate that a given product is a product (see ProductBase) and is active.
 
         :param product: Product to validate
-        :raises TypeError: If the product is not an instance of Product
+        :raises TypeError: If the product is not an instance of ProductBase
         :raises ValueError: If the product is inactive
         """
-        if not isinstance(product, Product):
+        if not isinstance(product, ProductBase):
             raise TypeError("Invalid product type")
         if not product.is_active():
             raise ValueError("Product is not active")
@@ -153,7 +1516,7 @@ def main():
     best_buy = Store(product_list)
     products = best_buy.get_all_products()
     print(best_buy.get_total_quantity())
-    print(best_buy.order([(products[0], 1), (products[1], 2)]))
+    print(format_cents(best_buy.order([(products[0], 1), (products[1], 2)])))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+"""
+Shared fixtures for the unit tests.
+
+The catalog fixtures are factories, so a test can build several independent
+catalogs, e.g. one to fill a store and another to recover it from.
+"""
+
+import pytest
+
+from products import Product
+
+
+@pytest.fixture
+def make_products():
+    """Factory for catalogs of numbered products."""
+
+    def build(count: int, name: str = "Item {}", price=None, quantity=None) -> list[Product]:
+        """
+        Build count products named name.format(idx).
+
+        :param count: Number of products
+        :param name: Format string for the product names
+        :param price: Price of every product; None gives prices from 1 to 7
+        :param quantity: Stock of every product; None gives stock levels from 0 to 12
+        :return: List of new products
+        """
+        return [
+            Product(
+                name.format(idx),
+                float(idx % 7 + 1) if price is None else price,
+                idx % 13 if quantity is None else quantity,
+            )
+            for idx in range(count)
+        ]
+
+    return build
+
+
+@pytest.fixture
+def make_phone_and_tablet():
+    """Factory for the two-product catalog: a Phone (500.0, 10 in stock) and a Tablet (300.0, 5)."""
+
+    def build() -> list[Product]:
+        """Build a new Phone and Tablet."""
+        return [Product("Phone", 500.0, 10), Product("Tablet", 300.0, 5)]
+
+    return build
+
+
+@pytest.fixture
+def state():
+    """Function returning the comparable state of every product in a store."""
+
+    def product_state(store) -> list[tuple]:
+        """Return (name, price, quantity, active) of every product in a store."""
+        return [(p.name, p.price, p.quantity, p.active) for p in store.product_list]
+
+    return product_state
@@ -0,0 +1,68 @@
+"""
+Unit tests for the non-interactive batch mode.
+
+These tests run small scripts through run_batch and check the JSON result
+lines, including error reporting and early termination.
+"""
+
+import io
+import json
+
+from products import Product
+from store import Store
+from utils.batch import run_batch
+
+
+def _run(store: Store, script: str) -> list[dict]:
+    """Run a script and return the decoded result lines."""
+    output = io.StringIO()
+    run_batch(store, io.StringIO(script), output)
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_menu_numbers_and_orders():
+    """Test that menu numbers and order requests produce one result each."""
+    phone = Product("Phone", price=500, quantity=10)
+    store = Store([phone, Product("Tablet", price=300, quantity=5)])
+    results = _run(
+        store,
+        '# restock check\n1\n\n{"op": "order", "items": [["Phone", 2]], "id": 7}\n2\n',
+    )
+    assert len(results) == 3
+    assert [product["name"] for product in results[0]["products"]] == ["Phone", "Tablet"]
+    assert results[1] == {"ok": True, "price": 1000.0, "id": 7}
+    assert results[2] == {"ok": True, "total": 13}
+    assert phone.quantity == 8
+
+
+def test_errors_are_reported_and_quit_stops():
+    """Test that bad lines are reported with their number and quit ends the script."""
+    store = Store([Product("Phone", price=500, quantity=1)])
+    results = _run(
+        store,
+        'not json\n{"op": "order", "items": [["Laptop", 1]]}\n'
+        '{"op": "order", "items": [["Phone", 5]]}\n4\n2\n',
+    )
+    assert len(results) == 3
+    assert all(result["ok"] is False for result in results)
+    assert [result["line"] for result in results] == [1, 2, 3]
+    assert "Laptop" in results[1]["error"]
+    assert store.get_total_quantity() == 1
+
+
+def test_nested_lines_failed_log_and_bool_quantities_are_reported():
+    """Test that any failure of one line, not just bad input, is reported and the script goes on."""
+    store = Store([Product("Phone", price=500, quantity=5)])
+
+    def failing_order(shopping_list):
+        raise OSError("disk full")
+
+    nested = "[" * 100_000 + "]" * 100_000
+    results = _run(store, f'{nested}\n{{"op": "order", "items": [["Phone", true]]}}\n')
+    store.order = failing_order
+    results += _run(store, '{"op": "order", "items": [["Phone", 1]]}\n2\n')
+    assert [result["ok"] for result in results] == [False, False, False, True]
+    assert results[0]["error"] == "Request is nested too deeply"
+    assert results[1]["error"] == "Quantity must be an integer"
+    assert results[2]["error"] == "Request failed: OSError"
+    assert store.get_total_quantity() == 5
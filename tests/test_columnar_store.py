@@ -0,0 +1,260 @@
+"""
+Unit tests for the ColumnarStore class in the columnar_store module.
+
+These tests verify that the array-backed store and its product views behave like
+the regular Store and Product classes for product management and ordering.
+"""
+
+import threading
+
+import columnar_store
+from columnar_store import ColumnarStore, ProductView
+from products import Product
+
+
+def test_initialization_copies_products(make_phone_and_tablet):
+    """Test that products are copied into the arrays and listed as views."""
+    store = ColumnarStore(make_phone_and_tablet())
+    products = store.get_all_products()
+    assert len(store) == 2
+    assert store.get_total_quantity() == 15
+    assert all(isinstance(product, ProductView) for product in products)
+    assert [product.name for product in products] == ["Phone", "Tablet"]
+    assert products[0].price == 500.0
+
+
+def test_from_rows_validates():
+    """Test that rows are validated with the Product rules."""
+    try:
+        ColumnarStore.from_rows([("Phone", 500.0, -1)])
+        assert False
+    except ValueError:
+        pass
+
+
+def test_view_buy_and_set_quantity(make_phone_and_tablet):
+    """Test that the Product API on a view updates the arrays and running total."""
+    store = ColumnarStore(make_phone_and_tablet())
+    phone = store.get_product_by_name("Phone")
+    assert phone.buy(4) == 200000
+    assert phone.get_quantity() == 6
+    phone.set_quantity(0)
+    assert not phone.is_active()
+    assert store.get_total_quantity() == 5
+    assert store.get_all_products() == [store.get_product_by_name("Tablet")]
+
+
+def test_order_is_all_or_nothing(make_phone_and_tablet):
+    """Test that Store.order works on views and leaves stock untouched on failure."""
+    store = ColumnarStore(make_phone_and_tablet())
+    phone, tablet = store.get_all_products()
+    assert store.order([(phone, 1), (tablet, 2)]) == 110000
+    try:
+        store.order([(phone, 1), (tablet, 4)])
+        assert False
+    except ValueError:
+        pass
+    assert phone.quantity == 9
+    assert tablet.quantity == 3
+
+
+def test_remove_product(make_phone_and_tablet):
+    """Test removing a product frees its stock and hides it from lookups."""
+    store = ColumnarStore(make_phone_and_tablet())
+    phone = store.get_product_by_name("Phone")
+    store.remove_product(phone)
+    assert len(store) == 1
+    assert store.get_total_quantity() == 5
+    assert store.get_product_by_name("Phone") is None
+    assert phone not in store
+    try:
+        store.remove_product(phone)
+        assert False
+    except ValueError:
+        pass
+
+
+def test_names_survive_rename_and_removal():
+    """Test that packed names round-trip non-ASCII text, renames and removed slots."""
+    store = ColumnarStore.from_rows([("Café", 1.0, 1), ("Phone", 2.0, 1), ("Tablet", 3.0, 1)])
+    cafe, phone, tablet = store.get_all_products()
+    phone.name = "Smartphone \U0001f4f1"
+    store.remove_product(tablet)
+    assert [product.name for product in store.product_list] == ["Café", "Smartphone \U0001f4f1"]
+    assert store.get_product_by_name("Smartphone \U0001f4f1") == phone
+    assert not hasattr(cafe, "__dict__")
+    assert ProductView.__slots__ == ("_store", "_slot")
+
+
+def test_paging_does_not_build_a_view_per_product(make_products):
+    """Test that counting and paging leave the cached active list unbuilt."""
+    products = make_products(50)
+    store = ColumnarStore(products)
+    active = [p.name for p in products if p.active]
+    assert store.count_active_products() == len(active)
+    assert [p.name for p in store.get_products_page(10, 5)] == active[10:15]
+    assert store._active_cache is None
+    assert store.get_products_page(10, 5) == store.get_all_products()[10:15]
+    try:
+        store.get_products_page(0, -1)
+        assert False
+    except ValueError:
+        pass
+
+
+def test_add_duplicate_view_raises(make_phone_and_tablet):
+    """Test that adding a view of the same store again raises a ValueError."""
+    store = ColumnarStore(make_phone_and_tablet())
+    try:
+        store.add_product(store.get_all_products()[0])
+        assert False
+    except ValueError:
+        pass
+
+
+def test_add_products_copies_a_batch():
+    """Test that add_products copies products into new slots, all or nothing."""
+    store = ColumnarStore()
+    watch = Product("Watch", 250.0, 3)
+    watch.deactivate()
+    store.add_products([Product("Phone", 500.0, 10), watch])
+    assert [view.name for view in store.product_list] == ["Phone", "Watch"]
+    assert [view.name for view in store.get_all_products()] == ["Phone"]
+    assert store.get_total_quantity() == 13
+    try:
+        store.add_products([Product("Tablet", 300.0, 5), store.get_all_products()[0]])
+        assert False
+    except ValueError:
+        pass
+    assert len(store) == 2
+
+
+def check_bulk_operations_match_item_by_item(make_products):
+    """Compare every bulk operation with the equivalent per-product calls."""
+    products = make_products(50)
+    store = ColumnarStore(products)
+    views = store.product_list
+
+    assert store.inventory_value() == sum(p.price_cents * p.quantity for p in products)
+    low = sorted((p for p in products if p.quantity < 3), key=lambda p: p.quantity)
+    assert [v.name for v in store.low_stock(3)] == [p.name for p in low]
+
+    picks = [0, 5, 5, 17, 42]
+    store.bulk_restock([views[idx] for idx in picks], [10, 1, 2, 0, 3])
+    for idx, amount in zip(picks, [10, 1, 2, 0, 3]):
+        products[idx].set_quantity(products[idx].get_quantity() + amount)
+
+    store.bulk_set_quantities([views[1], views[2], views[1]], [4, 0, 9])
+    for idx, quantity in [(1, 4), (2, 0), (1, 9)]:
+        products[idx].set_quantity(quantity)
+
+    store.bulk_markdown([views[3], views[3], views[4]], 25)
+    for idx in (3, 4):
+        products[idx].price *= 0.75
+
+    for view, product in zip(views, products):
+        assert (view.price_cents, view.quantity, view.active) == (
+            product.price_cents, product.quantity, product.active
+        )
+    assert store.get_total_quantity() == sum(p.quantity for p in products)
+    assert store.get_all_products() == [v for v, p in zip(views, products) if p.active]
+
+
+def test_bulk_operations_match_item_by_item(make_products):
+    """Test bulk operations with the default backend (NumPy when installed)."""
+    check_bulk_operations_match_item_by_item(make_products)
+
+
+def test_bulk_operations_pure_python_fallback(make_products):
+    """Test bulk operations with NumPy disabled."""
+    saved = columnar_store.np
+    columnar_store.np = None
+    try:
+        check_bulk_operations_match_item_by_item(make_products)
+    finally:
+        columnar_store.np = saved
+
+
+def test_queries_run_while_rows_are_added(make_products):
+    """Test that aggregate queries and concurrent appends do not get in each other's way."""
+    store = ColumnarStore(make_products(50))
+    errors = []
+
+    def add_rows():
+        try:
+            for idx in range(2_000):
+                store.add_row(f"New {idx}", 1.0, 1)
+        except Exception as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=add_rows)
+    thread.start()
+    while thread.is_alive():
+        store.inventory_value()
+        store.low_stock(5)
+        store.price_range(1, 3)
+    thread.join()
+    assert errors == []
+    assert len(store) == 2_050
+
+
+def test_bulk_set_quantities_rejects_negative(make_products):
+    """Test that an invalid quantity leaves the whole batch unapplied."""
+    store = ColumnarStore(make_products(3))
+    views = store.product_list
+    try:
+        store.bulk_set_quantities(views, [5, -1, 5])
+        assert False
+    except ValueError:
+        pass
+    assert [v.quantity for v in views] == [0, 1, 2]
+
+
+def test_bulk_updates_that_overflow_are_not_applied(make_products):
+    """Test that a batch with a quantity beyond int64 leaves every slot unchanged."""
+    saved = columnar_store.np
+    for backend in (saved, None):
+        columnar_store.np = backend
+        try:
+            store = ColumnarStore(make_products(3))
+            views = store.product_list
+            for call in (
+                lambda: store.bulk_set_quantities(views, [5, 2 ** 63, 5]),
+                lambda: store.bulk_restock(views, [5, 2 ** 63 - 1, 5]),
+                lambda: store.bulk_restock([views[1], views[1]], [2 ** 62, 2 ** 62]),
+            ):
+                try:
+                    call()
+                    assert False
+                except OverflowError:
+                    pass
+                assert [v.quantity for v in views] == [0, 1, 2]
+            assert store.get_total_quantity() == 3
+        finally:
+            columnar_store.np = saved
+
+
+def test_search_follows_rows_and_removal():
+    """Test that searches see added rows and forget removed slots."""
+    store = ColumnarStore.from_rows([("Google Pixel 7", 500.0, 5), ("iPhone 15", 1200.0, 5)])
+    assert [p.name for p in store.search_tokens("pixel")] == ["Google Pixel 7"]
+    store.add_rows([("Pixel Buds", 100.0, 3)])
+    assert [p.name for p in store.search_tokens("pixel")] == ["Google Pixel 7", "Pixel Buds"]
+    store.remove_product(store.get_product_by_name("Pixel Buds"))
+    assert [p.name for p in store.search_prefix("pix")] == []
+    assert [p.name for p in store.search_prefix("IPHONE")] == ["iPhone 15"]
+
+
+def test_price_range_and_bulk_sold_out_listener():
+    """Test price range scans and sold-out events from bulk updates."""
+    store = ColumnarStore.from_rows(
+        [("Cable", 20.0, 5), ("Phone", 550.0, 5), ("Speaker", 300.0, 1)]
+    )
+    assert [p.name for p in store.price_range(200, 600)] == ["Speaker", "Phone"]
+    sold_out = []
+    store.add_sold_out_listener(lambda product: sold_out.append(product.name))
+    cable, phone, speaker = store.product_list
+    store.bulk_set_quantities([phone, speaker], [0, 4])
+    speaker.set_quantity(0)
+    assert sold_out == ["Phone", "Speaker"]
+    assert [p.name for p in store.price_range(0, 1000)] == ["Cable"]
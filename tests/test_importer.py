@@ -0,0 +1,140 @@
+"""
+Unit tests for the streaming catalog importer.
+
+These tests verify CSV and JSONL parsing, validation with line-numbered
+rejects, and chunked insertion into both store backends.
+"""
+
+import io
+
+from columnar_store import ColumnarStore
+from importer import import_feed
+from store import Store
+
+CSV_FEED = """name,price,quantity
+Phone,500,10
+Tablet,abc,5
+,100,1
+Laptop,900.5,2
+Watch,250,-3
+"""
+
+JSONL_FEED = """{"name": "Phone", "price": 500, "quantity": 10}
+{"name": "Tablet", "price": 300, "quantity": 2.5}
+not json
+
+{"name": "Laptop", "price": 900.5}
+{"name": "Watch", "price": 250, "quantity": 3}
+"""
+
+
+def test_csv_import_with_rejects():
+    """Test that valid CSV rows are imported and invalid ones reported with line numbers."""
+    store = Store([])
+    rejects = []
+    stats = import_feed(
+        store, io.StringIO(CSV_FEED), "csv", chunk_size=2,
+        on_reject=lambda line, record, error: rejects.append(line),
+    )
+    assert [(p.name, p.price, p.quantity) for p in store.get_all_products()] == [
+        ("Phone", 500.0, 10),
+        ("Laptop", 900.5, 2),
+    ]
+    assert rejects == [3, 4, 6]
+    assert (stats.imported, stats.rejected) == (2, 3)
+
+
+def test_jsonl_import_into_columnar_store():
+    """Test that JSONL rows are imported into a ColumnarStore in chunks."""
+    store = ColumnarStore()
+    rejects = []
+    stats = import_feed(
+        store, io.StringIO(JSONL_FEED), "jsonl", chunk_size=1,
+        on_reject=lambda line, record, error: rejects.append(line),
+    )
+    assert [p.name for p in store.get_all_products()] == ["Phone", "Watch"]
+    assert store.get_total_quantity() == 13
+    assert rejects == [2, 3, 5]
+    assert stats.imported == 2
+
+
+def test_csv_header_must_have_columns():
+    """Test that a CSV feed without the required header raises ValueError."""
+    try:
+        import_feed(Store([]), io.StringIO("title,cost\nPhone,1\n"), "csv")
+        assert False
+    except ValueError:
+        pass
+
+
+def test_parallel_import_matches_serial():
+    """Test that a process-pool import yields the same store and rejects as a serial one."""
+    lines = ["name,price,quantity\n"] + [
+        f"Item {idx},{idx % 7 + 0.5},{-1 if idx % 10 == 3 else idx}\n" for idx in range(50)
+    ]
+    results = []
+    for workers in (1, 2):
+        store = ColumnarStore()
+        rejects = []
+        stats = import_feed(
+            store, iter(lines), "csv", chunk_size=8, workers=workers,
+            on_reject=lambda line, record, error: rejects.append((line, type(error))),
+        )
+        rows = [(p.name, p.price, p.quantity) for p in store.get_all_products()]
+        results.append((rows, rejects, stats.imported, stats.rejected))
+    assert results[0] == results[1]
+    assert results[1][1][0] == (5, ValueError)
+
+
+def test_parallel_jsonl_import():
+    """Test that a JSONL feed is imported in parallel with line-numbered rejects."""
+    store = Store([])
+    rejects = []
+    stats = import_feed(
+        store, io.StringIO(JSONL_FEED), "jsonl", chunk_size=2, workers=2,
+        on_reject=lambda line, record, error: rejects.append(line),
+    )
+    assert [p.name for p in store.get_all_products()] == ["Phone", "Watch"]
+    assert rejects == [2, 3, 5]
+    assert stats.imported == 2
+
+
+def test_values_beyond_int64_are_rejected_by_both_paths():
+    """Test that huge quantities and prices are rejected the same way serially and in parallel."""
+    feed = (
+        '{"name": "Phone", "price": 500, "quantity": 10}\n'
+        '{"name": "Crate", "price": 1, "quantity": 18446744073709551616}\n'
+        '{"name": "Yacht", "price": 1e300, "quantity": 1}\n'
+    )
+    for workers in (1, 2):
+        store = Store([])
+        rejects = []
+        import_feed(
+            store, io.StringIO(feed), "jsonl", chunk_size=1, workers=workers,
+            on_reject=lambda line, record, error: rejects.append((line, type(error))),
+        )
+        assert [p.name for p in store.get_all_products()] == ["Phone"]
+        assert rejects == [(2, ValueError), (3, ValueError)]
+
+
+def test_parallel_import_keeps_exact_prices_and_rejects_deep_nesting():
+    """Test that large integer prices survive the process pool and nested lines are rejected."""
+    feed = (
+        '{"name": "Estate", "price": 90071992547409.93, "quantity": 1}\n'
+        '{"name": "Tower", "price": 9007199254740993, "quantity": 1}\n'
+        + "[" * 100_000 + "]" * 100_000 + "\n"
+        + '{"name": "Phone", "price": 500, "quantity": 10}\n'
+    )
+    results = []
+    for workers in (1, 2):
+        for store_class in (Store, ColumnarStore):
+            store = store_class([])
+            rejects = []
+            import_feed(
+                store, io.StringIO(feed), "jsonl", chunk_size=2, workers=workers,
+                on_reject=lambda line, record, error: rejects.append(line),
+            )
+            results.append(([(p.name, p.price_cents) for p in store.get_all_products()], rejects))
+    assert results[0][0][1] == ("Tower", 900719925474099300)
+    assert results[0][1] == [3]
+    assert all(result == results[0] for result in results)
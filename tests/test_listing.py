@@ -0,0 +1,26 @@
+"""
+Unit tests for the paginated product listing.
+
+These tests verify the text of rendered pages, including the numbering of
+products on later pages.
+"""
+
+from products import Product
+from store import Store
+from utils.listing import render_page
+
+
+def test_render_page_numbers_by_catalog_position():
+    """Test that later pages continue the numbering and report the position."""
+    store = Store([Product(f"Item {idx}", price=10, quantity=idx + 1) for idx in range(5)])
+    page = render_page(store, offset=2, limit=2)
+    assert "3. Item 2, Price: 10.00, Quantity: 3\n" in page
+    assert "4. Item 3, Price: 10.00, Quantity: 4\n" in page
+    assert "Item 4" not in page
+    assert "Showing 3-4 of 5 products." in page
+
+
+def test_render_empty_page():
+    """Test that a page past the end says that no products are available."""
+    store = Store([Product("Phone", price=500, quantity=1)])
+    assert render_page(store, offset=5) == "No products available.\n"
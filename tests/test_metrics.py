@@ -0,0 +1,88 @@
+"""
+Unit tests for the opt-in store instrumentation.
+
+These tests verify that enabling metrics records calls, errors and stock-outs,
+that disabling restores the original functions, and the histogram and text
+exposition formats.
+"""
+
+import commands
+import metrics
+from columnar_store import ColumnarStore
+from dispatcher import get_command_dispatcher
+from metrics import LatencyHistogram
+from products import Product
+from store import Store
+
+
+def test_enable_records_calls_errors_and_stock_outs():
+    """Test that instrumented calls, failures and sell-outs are recorded."""
+    original_order = Store.order
+    phone = Product("Phone", price=500, quantity=3)
+    store = Store([phone])
+    metrics.reset()
+    metrics.enable()
+    try:
+        assert Store.order is not original_order
+        store.order([(phone, 1)])
+        try:
+            store.order([(phone, 5)])
+            assert False
+        except ValueError:
+            pass
+        phone.buy(1)
+        store.get_total_quantity()
+        store.confirm(store.reserve(phone, 1))
+        data = metrics.snapshot()
+    finally:
+        metrics.disable()
+    assert Store.order is original_order
+    assert not metrics.is_enabled()
+    order_stats = data["operations"]["Store.order"]
+    assert (order_stats["count"], order_stats["errors"]) == (2, 1)
+    assert order_stats["buckets"][-1] == [float("inf"), 2]
+    assert data["operations"]["Product.buy"]["count"] == 1
+    assert data["operations"]["Store.reserve"]["count"] == 1
+    assert data["operations"]["Store.confirm"]["count"] == 1
+    assert data["stock_outs"] == 1
+    assert data["recent_stock_outs"] == ["Phone"]
+
+
+def test_subclass_overrides_and_dispatcher_are_instrumented(capsys):
+    """Test that ColumnarStore overrides and dispatched handlers are timed."""
+    columnar = ColumnarStore([Product("Phone", price=500, quantity=2)])
+    store = Store([Product("Tablet", price=300, quantity=3)])
+    dispatcher = get_command_dispatcher(store)
+    metrics.reset()
+    metrics.enable()
+    try:
+        columnar.get_all_products()
+        dispatcher["2"]()
+    finally:
+        metrics.disable()
+    assert "Total products in store: 3" in capsys.readouterr().out
+    operations = metrics.snapshot()["operations"]
+    assert operations["ColumnarStore.get_all_products"]["count"] == 1
+    assert operations["commands.handle_show_total_quantity"]["count"] == 1
+    assert commands.handle_show_total_quantity.__name__ == "handle_show_total_quantity"
+
+
+def test_histogram_buckets_and_text_exposition():
+    """Test bucket placement, cumulative counts and the exposition format."""
+    histogram = LatencyHistogram((0.001, 0.01))
+    for seconds in (0.0005, 0.001, 0.005, 2.0):
+        histogram.observe(seconds)
+    assert list(histogram.counts) == [2, 1, 1]
+    assert histogram.cumulative() == [(0.001, 2), (0.01, 3), (float("inf"), 4)]
+
+    metrics.reset()
+    metrics.enable()
+    try:
+        Store([]).get_total_quantity()
+    finally:
+        metrics.disable()
+    text = metrics.render_text()
+    assert "# TYPE bestbuy_operation_seconds histogram\n" in text
+    assert 'bestbuy_operation_seconds_count{op="Store.get_total_quantity"} 1\n' in text
+    assert 'bestbuy_operation_seconds_bucket{op="Store.get_total_quantity",le="+Inf"} 1\n' in text
+    assert text.endswith("bestbuy_stock_outs_total 0\n")
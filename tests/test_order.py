@@ -0,0 +1,45 @@
+"""
+Unit tests for the interactive ordering flow.
+
+These tests drive process_order with scripted input to verify quantity
+merging for repeated picks, paging and the final order.
+"""
+
+import builtins
+
+from products import Product
+from store import Store
+from utils.order import process_order
+
+
+def _run(store: Store, answers: list[str], monkeypatch) -> None:
+    """Run process_order with the given answers as user input."""
+    answers = iter(answers)
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(answers))
+    process_order(store)
+
+
+def test_repeated_picks_are_merged(monkeypatch, capsys):
+    """Test that picking a product twice orders the summed quantity once."""
+    phone = Product("Phone", price=500, quantity=10)
+    tablet = Product("Tablet", price=300, quantity=10)
+    store = Store([phone, tablet])
+    _run(store, ["1", "2", "2", "1", "1", "3", "0"], monkeypatch)
+    output = capsys.readouterr().out
+    assert "In cart: 5 x Phone (2 products)" in output
+    assert "Total cost: $2800.0" in output
+    assert (phone.quantity, tablet.quantity) == (5, 9)
+    assert output.count("Available products:") == 1
+
+
+def test_paging_and_numbers_beyond_first_page(monkeypatch, capsys):
+    """Test that products on later pages can be picked by their number."""
+    products = [Product(f"Item {idx}", price=1, quantity=5) for idx in range(45)]
+    store = Store(products)
+    _run(store, ["n", "n", "n", "p", "42", "2", "x", "0"], monkeypatch)
+    output = capsys.readouterr().out
+    assert "Showing 41-45 of 45 products." in output
+    assert "Showing 21-40 of 45 products." in output
+    assert "Invalid input" in output
+    assert products[41].quantity == 3
+    assert store.get_available_quantity() == 45 * 5 - 2
@@ -0,0 +1,121 @@
+"""
+Unit tests for the micro-batching order scheduler.
+
+These tests verify that batched carts resolve their own futures, keep the
+outcome of sequential ordering, and are flushed when the scheduler closes.
+"""
+
+import threading
+
+from order_scheduler import OrderScheduler
+from products import Product
+from store import Store
+
+
+def test_futures_resolve_per_cart():
+    """Test that each cart's future gets its own total or error."""
+    phone = Product("Phone", price=500, quantity=3)
+    tablet = Product("Tablet", price=300, quantity=5)
+    store = Store([phone, tablet])
+    with OrderScheduler(store, max_batch=10, max_wait=0.05) as scheduler:
+        futures = [
+            scheduler.submit([(phone, 2)]),
+            scheduler.submit([(phone, 2)]),
+            scheduler.submit([(tablet, 1), (phone, 1)]),
+        ]
+    assert futures[0].result() == 100000
+    assert isinstance(futures[1].exception(), ValueError)
+    assert futures[2].result() == 80000
+    assert phone.quantity == 0
+    assert tablet.quantity == 4
+
+
+def test_batches_respect_max_batch():
+    """Test that no batch is larger than max_batch."""
+    product = Product("Phone", price=1, quantity=100)
+    store = Store([product])
+    sizes = []
+    original = store.order_many
+
+    def recording_order_many(carts, on_error):
+        sizes.append(len(carts))
+        return original(carts, on_error)
+
+    store.order_many = recording_order_many
+    with OrderScheduler(store, max_batch=4, max_wait=0.01) as scheduler:
+        futures = [scheduler.submit([(product, 1)]) for _ in range(10)]
+    assert [future.result() for future in futures] == [100] * 10
+    assert max(sizes) <= 4
+    assert sum(sizes) == 10
+
+
+def test_concurrent_submitters_do_not_oversell():
+    """Test that carts from many threads never sell more than the stock."""
+    product = Product("Phone", price=500, quantity=50)
+    store = Store([product])
+    sold = []
+
+    def buyer(scheduler):
+        for _ in range(20):
+            try:
+                scheduler.order([(product, 1)])
+                sold.append(1)
+            except ValueError:
+                pass
+
+    with OrderScheduler(store, max_batch=8, max_wait=0.001) as scheduler:
+        threads = [threading.Thread(target=buyer, args=(scheduler,)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert len(sold) == 50
+    assert product.quantity == 0
+
+
+def test_submit_after_close_raises():
+    """Test that a closed scheduler rejects new carts."""
+    scheduler = OrderScheduler(Store([]))
+    scheduler.close()
+    try:
+        scheduler.submit([])
+        assert False
+    except RuntimeError:
+        pass
+
+
+def test_invalid_window_raises():
+    """Test that a non-positive batch size raises ValueError."""
+    try:
+        OrderScheduler(Store([]), max_batch=0)
+        assert False
+    except ValueError:
+        pass
+
+
+def test_stopped_worker_fails_every_waiting_cart():
+    """Test that carts queued behind a batch that stops the worker do not wait forever."""
+    store = Store([Product("Phone", price=1, quantity=10)])
+    phone = store.product_list[0]
+    started, release = threading.Event(), threading.Event()
+
+    def stopping_order_many(carts, on_error):
+        started.set()
+        release.wait()
+        raise SystemExit
+
+    store.order_many = stopping_order_many
+    scheduler = OrderScheduler(store, max_batch=1, max_wait=0)
+    first = scheduler.submit([(phone, 1)])
+    started.wait()
+    queued = [scheduler.submit([(phone, 1)]) for _ in range(3)]
+    release.set()
+    assert isinstance(first.exception(timeout=5), SystemExit)
+    for future in queued:
+        assert isinstance(future.exception(timeout=5), RuntimeError)
+    try:
+        scheduler.submit([(phone, 1)])
+        assert False
+    except RuntimeError:
+        pass
+    scheduler.close()
@@ -0,0 +1,99 @@
+"""
+Unit tests for promotion rules and the pricing engine.
+
+These tests verify each kind of rule, how rules on the same product combine,
+time windows and recompilation, and that Store orders charge promoted prices.
+"""
+
+from pricing import BundleDiscount, NthItemDiscount, PricingEngine, PricingRule, TieredDiscount
+from products import Product
+from store import Store
+
+
+def test_tiered_discount_uses_highest_tier_reached():
+    """Test that the best tier reached applies to the whole line."""
+    pen = Product("Pen", 1.0, 1000)
+    engine = PricingEngine([
+        TieredDiscount(pen, [(10, 5), (50, 10)]),
+        TieredDiscount(pen, [(20, 8)]),
+    ])
+    assert engine.total({pen: 9}) == 900
+    assert engine.total({pen: 10}) == 950
+    assert engine.total({pen: 20}) == 1840
+    assert engine.total({pen: 60}) == 5400
+
+
+def test_second_item_half_price_and_best_line_discount():
+    """Test n-th item discounts and that only the best line discount applies."""
+    shirt = Product("Shirt", 20.0, 100)
+    engine = PricingEngine([NthItemDiscount(shirt, 2, 50)])
+    assert engine.total({shirt: 1}) == 2000
+    assert engine.total({shirt: 3}) == 5000
+    engine.add_rule(TieredDiscount(shirt, [(10, 30)]))
+    assert engine.total({shirt: 4}) == 6000
+    assert engine.total({shirt: 10}) == 14000
+
+
+def test_bundles_consume_units_once():
+    """Test that each unit counts toward one bundle, larger discounts first."""
+    phone = Product("Phone", 500.0, 10)
+    case = Product("Case", 20.0, 10)
+    charger = Product("Charger", 30.0, 10)
+    engine = PricingEngine([
+        BundleDiscount([phone, case], 10),
+        BundleDiscount([phone, charger], 25),
+    ])
+    assert engine.total({phone: 1, case: 1, charger: 1}) == 55000 - 2500
+    assert engine.total({phone: 2, case: 1, charger: 1}) == 105000 - 3500
+    assert engine.total({case: 5}) == 10000
+
+
+def test_time_windows_recompile_when_crossed():
+    """Test that a sale applies only inside its window and can be removed."""
+    tv = Product("TV", 100.0, 10)
+    sale = TieredDiscount(tv, [(1, 20)], starts_at=1000.0, ends_at=2000.0)
+    engine = PricingEngine([sale])
+    assert engine.total({tv: 1}, now=999.0) == 10000
+    assert engine.total({tv: 1}, now=1000.0) == 8000
+    assert engine.total({tv: 1}, now=2000.0) == 10000
+    assert engine.total({tv: 1}, now=1500.0) == 8000
+    engine.remove_rule(sale)
+    assert engine.total({tv: 1}, now=1500.0) == 10000
+    try:
+        engine.remove_rule(sale)
+        assert False
+    except ValueError:
+        pass
+
+
+def test_store_orders_apply_promotions():
+    """Test that order, order_many and confirm charge promoted totals."""
+    shirt = Product("Shirt", 20.0, 100)
+    store = Store([shirt])
+    assert store.order([(shirt, 2)]) == 4000
+    store.pricing = PricingEngine([NthItemDiscount(shirt, 2, 50)])
+    assert store.order([(shirt, 1), (shirt, 1)]) == 3000
+    assert store.order_many([[(shirt, 2)], [(shirt, 4)]]).totals == [3000, 6000]
+    assert store.confirm(store.reserve(shirt, 2)) == 3000
+
+
+def test_invalid_rules_are_rejected():
+    """Test that rules with bad percentages, tiers or windows, or no effect, are rejected."""
+    pen = Product("Pen", 1.0, 10)
+    for build in (
+        lambda: TieredDiscount(pen, []),
+        lambda: TieredDiscount(pen, [(5, 120)]),
+        lambda: NthItemDiscount(pen, 0, 50),
+        lambda: BundleDiscount([], 5),
+        lambda: BundleDiscount([pen], 5, starts_at=10.0, ends_at=5.0),
+    ):
+        try:
+            build()
+            assert False
+        except ValueError:
+            pass
+    try:
+        PricingRule()
+        assert False
+    except TypeError:
+        pass
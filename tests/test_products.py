@@ -8,7 +8,7 @@ including initialization, validation, state toggling, and purchasing logic.
 import io
 from contextlib import redirect_stdout
 
-from products import Product
+from products import Product, format_cents
 
 
 def test_valid_initialization():
@@ -150,7 +150,7 @@ def test_show():
     output = buffer.getvalue()
 
     assert "Test Product" in output
-    assert "Price: 10.0" in output
+    assert "Price: 10.00" in output
     assert "Quantity: 5" in output
 
 
@@ -158,7 +158,7 @@ def test_buy_valid_quantity():
     """Test buying a valid quantity decreases stock and returns total price."""
     product = Product("Test Product", 10.0, 5)
     total = product.buy(2)
-    assert total == 20.0
+    assert total == 2000
     assert product.quantity == 3
 
 
@@ -166,7 +166,7 @@ def test_buy_reduces_to_zero():
     """Test buying the full quantity reduces stock to zero."""
     product = Product("Test Product", 10.0, 5)
     total = product.buy(5)
-    assert total == 50.0
+    assert total == 5000
     assert product.quantity == 0
 
 
@@ -216,6 +216,56 @@ def test_validate_stock_too_much():
         pass
 
 
+def test_from_trusted_rows():
+    """Test that bulk construction builds active products equal to the constructor's."""
+    products = Product.from_trusted_rows([("Phone", 500, 10), ("Tablet", 300.5, 0)])
+    assert [(p.name, p.price, p.quantity, p.active) for p in products] == [
+        ("Phone", 500.0, 10, True),
+        ("Tablet", 300.5, 0, True),
+    ]
+    assert products[0].buy(2) == 100000
+
+
+def test_prices_are_whole_cents():
+    """Test that prices are stored in cents and totals add up exactly."""
+    product = Product("Pen", 0.1, 1_000_000)
+    assert product.price_cents == 10
+    assert sum(product.buy(1) for _ in range(1000)) == 10_000
+    product.price = 19.99
+    assert (product.price_cents, product.price) == (1999, 19.99)
+    assert format_cents(product.buy(3)) == "59.97"
+    try:
+        Product("Pen", float("inf"), 1)
+        assert False
+    except ValueError:
+        pass
+
+
+def test_from_trusted_rows_rejects_invalid_row():
+    """Test that one invalid row rejects the whole batch with the validator's error."""
+    try:
+        Product.from_trusted_rows([("Phone", 500, 10), ("Tablet", 300, "ten")])
+        assert False
+    except TypeError:
+        pass
+    try:
+        Product.from_trusted_rows([("   ", 500, 10)])
+        assert False
+    except ValueError:
+        pass
+
+
+def test_product_has_no_instance_dict():
+    """Test that products are slotted and reject unknown attributes."""
+    product = Product("Test Product", 10.0, 5)
+    assert not hasattr(product, "__dict__")
+    try:
+        product.colour = "red"
+        assert False
+    except AttributeError:
+        pass
+
+
 if __name__ == "__main__":
     test_valid_initialization()
     test_invalid_name_type()
@@ -240,3 +290,7 @@ if __name__ == "__main__":
     test_buy_invalid_type()
     test_validate_stock_enough()
     test_validate_stock_too_much()
+    test_from_trusted_rows()
+    test_prices_are_whole_cents()
+    test_from_trusted_rows_rejects_invalid_row()
+    test_product_has_no_instance_dict()
@@ -0,0 +1,76 @@
+"""
+Unit tests for the product search index.
+
+These tests verify prefix and word search on an index that holds products
+in both its main and its recent run, and removal from either run, and that
+the slot-based index gives the same answers.
+"""
+
+from products import Product
+from search_index import SearchIndex, SlotSearchIndex, tokenize
+
+
+def test_tokenize_folds_case_and_splits_words():
+    """Test that names are split into case-folded words."""
+    assert tokenize("Google Pixel-7 PRO") == ["google", "pixel", "7", "pro"]
+
+
+def test_prefix_merges_main_and_recent_runs():
+    """Test that prefix results are in name order across both runs."""
+    index = SearchIndex(Product(f"Item {idx:04}", price=1, quantity=1) for idx in range(0, 2000, 2))
+    for idx in range(1, 2000, 2):
+        index.add(Product(f"item {idx:04}", price=1, quantity=1))
+    assert len(index) == 2000
+    names = [product.name for product in index.prefix("ITEM 00", limit=None)]
+    assert [name.casefold() for name in names] == [f"item {idx:04}" for idx in range(100)]
+    assert len(index.prefix("item", limit=10)) == 10
+
+
+def test_namesakes_keep_insertion_order():
+    """Test that products with the same folded name come back in the order they were added."""
+    first = Product("Phone", price=1, quantity=1)
+    second = Product("PHONE", price=2, quantity=1)
+    index = SearchIndex([first])
+    index.add(second)
+    assert index.prefix("phone") == [first, second]
+    assert index.tokens("phone") == [first, second]
+
+
+def test_remove_from_either_run():
+    """Test that removed products disappear from prefix and word results."""
+    old = Product("Google Pixel 7", price=1, quantity=1)
+    new = Product("Google Pixel 8", price=1, quantity=1)
+    index = SearchIndex([old])
+    index.add(new)
+    index.remove(old)
+    index.remove(new)
+    assert index.prefix("google") == []
+    assert index.tokens("pixel") == []
+    try:
+        index.remove(old)
+        assert False
+    except ValueError:
+        pass
+
+
+def test_slot_index_matches_product_index():
+    """Test that SlotSearchIndex answers like SearchIndex across runs, removal and deactivation."""
+    names = [f"{('Cable', 'cable', 'Phone Case')[idx % 3]} {idx % 700}" for idx in range(3000)]
+    products = [Product(name, price=1, quantity=1) for name in names]
+    active = [True] * len(names)
+    index = SearchIndex(products[:2000])
+    slots = SlotSearchIndex(names, active.__getitem__, range(2000))
+    for slot in range(2000, 3000):
+        index.add(products[slot])
+        slots.add(slot)
+    for slot in (5, 2500, 2999):
+        index.remove(products[slot])
+        slots.remove(slot)
+        names[slot] = None
+    active[7] = products[7].active = False
+    for query in ("cable 1", "phone", "CASE 69", "zzz"):
+        expected = [products.index(product) for product in index.prefix(query, limit=None)]
+        assert slots.prefix(query, limit=None) == expected
+        assert slots.prefix(query, limit=5) == expected[:5]
+        expected = [products.index(product) for product in index.tokens(query, limit=None)]
+        assert slots.tokens(query, limit=None) == expected
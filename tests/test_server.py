@@ -0,0 +1,124 @@
+"""
+Unit tests for the asyncio order server.
+
+These tests start a server on a free local port and talk to it over TCP to
+verify the JSON protocol, pipelined responses and concurrent orders.
+"""
+
+import asyncio
+import json
+
+from products import Product
+from server import OrderServer
+from store import Store
+
+
+async def _session(store: Store, requests: list, connections: int = 1) -> list:
+    """Send the requests pipelined on each connection and collect all responses."""
+    server = OrderServer(store)
+    port = await server.start()
+    try:
+        async def client():
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"".join(json.dumps(request).encode() + b"\n" for request in requests))
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in requests]
+            writer.close()
+            return responses
+
+        return await asyncio.gather(*(client() for _ in range(connections)))
+    finally:
+        await server.close()
+
+
+def test_list_total_and_order():
+    """Test that the basic operations return the store's data."""
+    store = Store([
+        Product("Phone", price=500, quantity=10),
+        Product("Tablet", price=300, quantity=5),
+    ])
+    [responses] = asyncio.run(_session(store, [
+        {"op": "list"},
+        {"op": "order", "items": [["Phone", 2], ["Tablet", 1]]},
+        {"op": "total"},
+    ]))
+    assert responses[0]["products"][0] == {"name": "Phone", "price": 500, "quantity": 10}
+    assert responses[1] == {"ok": True, "price": 1300}
+    assert responses[2] == {"ok": True, "total": 12}
+
+
+def test_list_is_paged():
+    """Test that list requests return at most the server's page limit."""
+    store = Store([Product(f"Item {idx}", price=1, quantity=1) for idx in range(1_500)])
+    [responses] = asyncio.run(_session(store, [
+        {"op": "list"},
+        {"op": "list", "offset": 1_400, "limit": 5_000},
+        {"op": "list", "offset": 10, "limit": 2},
+        {"op": "list", "limit": True},
+        {"op": "list", "offset": -1},
+    ]))
+    assert len(responses[0]["products"]) == 1_000
+    assert responses[0]["count"] == 1_500
+    assert len(responses[1]["products"]) == 100
+    assert [p["name"] for p in responses[2]["products"]] == ["Item 10", "Item 11"]
+    assert [response["ok"] for response in responses[3:]] == [False, False]
+
+
+def test_pipelined_responses_keep_request_order():
+    """Test that pipelined responses come back in order with their ids."""
+    store = Store([Product("Phone", price=500, quantity=3)])
+    [responses] = asyncio.run(_session(store, [
+        {"id": idx, "op": "order", "items": [["Phone", 1]]} for idx in range(5)
+    ]))
+    assert [response["id"] for response in responses] == list(range(5))
+    assert [response["ok"] for response in responses] == [True, True, True, False, False]
+
+
+def test_errors_are_reported():
+    """Test that malformed requests and failed orders get error responses."""
+    store = Store([Product("Phone", price=500, quantity=1)])
+    [responses] = asyncio.run(_session(store, [
+        {"op": "refund"},
+        {"op": "order", "items": [["Radio", 1]]},
+        {"op": "order", "items": [["Phone", 5]]},
+        {"op": "order"},
+    ]))
+    assert all(not response["ok"] for response in responses)
+    assert "Radio" in responses[1]["error"]
+    assert store.get_total_quantity() == 1
+
+
+def test_oversized_and_deeply_nested_lines_get_error_responses():
+    """Test that a too long line and a too deeply nested one are answered and skipped."""
+
+    async def session():
+        store = Store([Product("Phone", price=500, quantity=1)])
+        server = OrderServer(store, max_request_bytes=1 << 18)
+        port = await server.start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b'{"op": "list", "pad": "' + b"x" * 1_000_000 + b'"}\n')
+            writer.write(b"[" * 100_000 + b"]" * 100_000 + b"\n")
+            writer.write(b'{"op": "total"}\n')
+            await writer.drain()
+            responses = [json.loads(await asyncio.wait_for(reader.readline(), 5)) for _ in range(3)]
+            writer.close()
+            return responses
+        finally:
+            await server.close()
+
+    responses = asyncio.run(session())
+    assert "exceeds" in responses[0]["error"]
+    assert "nested" in responses[1]["error"]
+    assert responses[2] == {"ok": True, "total": 1}
+
+
+def test_concurrent_orders_do_not_oversell():
+    """Test that orders from many connections never sell more than the stock."""
+    store = Store([Product("Phone", price=500, quantity=50)])
+    results = asyncio.run(_session(
+        store, [{"op": "order", "items": [["Phone", 1]]}] * 20, connections=5
+    ))
+    sold = sum(response["ok"] for responses in results for response in responses)
+    assert sold == 50
+    assert store.get_total_quantity() == 0
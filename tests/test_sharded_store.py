@@ -0,0 +1,152 @@
+"""
+Unit tests for the ShardedStore class in the sharded_store module.
+
+These tests verify product placement, order routing, the all-or-nothing
+commit of orders spanning shards, merged queries and the worker process mode.
+"""
+
+import pytest
+
+from products import Product
+from sharded_store import ShardedStore, shard_for
+from store import BatchOrderError
+
+
+@pytest.fixture
+def catalog(make_products) -> list[Product]:
+    """Products named P0 to P19 with a price of 10 and 5 in stock."""
+    return make_products(20, name="P{}", price=10, quantity=5)
+
+
+def names_on_different_shards(store: ShardedStore) -> tuple[str, str]:
+    """Return two product names of the catalog that live on different shards."""
+    first = "P0"
+    for idx in range(1, 20):
+        if store.shard_of(f"P{idx}") != store.shard_of(first):
+            return first, f"P{idx}"
+    raise AssertionError("Catalog fits on one shard")
+
+
+def test_products_are_partitioned_by_name(catalog):
+    """Test that every product lands on the shard given by its name and queries merge."""
+    store = ShardedStore(catalog, shards=4)
+    for idx, shard in enumerate(store.shards):
+        for product in shard.product_list:
+            assert shard_for(product.name, 4) == idx
+    assert len(store) == 20
+    assert store.get_total_quantity() == 100
+    assert set(store.get_all_products()) == set(catalog)
+
+
+def test_order_across_shards_is_all_or_nothing(catalog):
+    """Test that a failing line on one shard leaves the stock of every shard unchanged."""
+    store = ShardedStore(catalog, shards=4)
+    first, second = names_on_different_shards(store)
+    try:
+        store.order([(first, 2), (second, 6)])
+        assert False
+    except ValueError:
+        pass
+    assert store.get_total_quantity() == 100
+    assert store.order([(first, 2), (second, 3)]) == 5000
+    assert store.get_total_quantity() == 95
+    # The holds of the second phase are gone once the order is settled
+    assert store.order([(first, 3), (second, 2)]) == 5000
+
+
+def test_order_validation(catalog):
+    """Test that invalid shopping lists and unknown products raise errors."""
+    store = ShardedStore(catalog, shards=2)
+    for shopping_list, error in (
+        ("P0", TypeError),
+        ([], ValueError),
+        ([(1, 1)], TypeError),
+        ([("P0", 0)], ValueError),
+        ([("Unknown", 1)], ValueError),
+    ):
+        try:
+            store.order(shopping_list)
+            assert False
+        except error:
+            pass
+    try:
+        ShardedStore([], shards=0)
+        assert False
+    except ValueError:
+        pass
+
+
+def test_order_many_reports_failures_in_cart_order(catalog):
+    """Test batch orders with single-shard, cross-shard and failing carts."""
+    store = ShardedStore(catalog, shards=4)
+    first, second = names_on_different_shards(store)
+    result = store.order_many(
+        [[(first, 1)], [(first, 1), (second, 1)], [("Unknown", 1)], [(second, 9)]]
+    )
+    assert result.totals == [1000, 2000, None, None]
+    assert sorted(result.failures) == [2, 3]
+    assert store.get_total_quantity() == 97
+
+
+def test_order_many_allocates_in_input_order(catalog):
+    """Test that a single-shard cart after a cross-shard cart does not get its stock first."""
+    store = ShardedStore(catalog, shards=4)
+    first, second = names_on_different_shards(store)
+    result = store.order_many([[(first, 3), (second, 1)], [(first, 3)], [(second, 4)]])
+    assert result.totals == [4000, None, 4000]
+    assert sorted(result.failures) == [1]
+
+
+def test_order_many_abort_changes_nothing(catalog):
+    """Test that a failing cart rejects the whole batch on every shard."""
+    store = ShardedStore(catalog, shards=4)
+    first, second = names_on_different_shards(store)
+    try:
+        store.order_many([[(first, 2)], [(first, 1), (second, 2)], [(second, 4)]], on_error="abort")
+        assert False
+    except BatchOrderError as error:
+        assert error.index == 2
+    assert store.get_total_quantity() == 100
+    result = store.order_many([[(first, 2)], [(first, 1), (second, 2)]], on_error="abort")
+    assert result.totals == [2000, 3000]
+    assert store.get_total_quantity() == 95
+
+
+def test_prepared_order_commits_after_deactivation(catalog):
+    """Test that deactivating a product between the two phases does not break the commit."""
+    store = ShardedStore(catalog, shards=4)
+    first, second = names_on_different_shards(store)
+    call_each = store._call_each
+
+    def deactivate_after_prepare(requests):
+        responses = call_each(requests)
+        if any(operation == "prepare" for operation, _ in requests.values()):
+            store.shards[store.shard_of(second)].get_product_by_name(second).deactivate()
+        return responses
+
+    store._call_each = deactivate_after_prepare
+    assert store.order([(first, 1), (second, 2)]) == 3000
+    assert store.get_total_quantity() == 97
+
+
+def test_worker_processes(catalog):
+    """Test that shards in worker processes route, commit and report errors like local ones."""
+    with ShardedStore(catalog, shards=3, processes=True) as store:
+        first, second = names_on_different_shards(store)
+        assert store.order([(first, 1), (second, 2)]) == 3000
+        try:
+            store.order([(first, 1), (second, 9)])
+            assert False
+        except ValueError:
+            pass
+        store.add_product(Product("New", price=1, quantity=7))
+        assert len(store) == 21
+        assert store.get_total_quantity() == 104
+        listed = {product.name: product.quantity for product in store.get_all_products()}
+        assert listed[first] == 4
+        assert listed["New"] == 7
+        try:
+            store.shards
+            assert False
+        except ValueError:
+            pass
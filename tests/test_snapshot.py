@@ -0,0 +1,105 @@
+"""
+Unit tests for binary inventory snapshots.
+
+These tests verify that Store and ColumnarStore round-trip through the snapshot
+format, and that damaged or foreign files are rejected.
+"""
+
+import os
+import tempfile
+import zlib
+from array import array
+
+from columnar_store import ColumnarStore
+from products import Product
+from snapshot import FLOAT_PRICES_VERSION, HEADER, MAGIC
+from store import Store
+
+
+def make_inventory():
+    """Build products covering active, sold-out and deactivated states."""
+    phone = Product("Phone", 499.99, 10)
+    tablet = Product("Tablet", 300.0, 5)
+    watch = Product("Wätch", 250.0, 0)
+    tablet.deactivate()
+    return [phone, tablet, watch]
+
+
+def test_store_round_trip(state):
+    """Test that a Store is restored with the same products, order and status."""
+    store = Store([])
+    for product in make_inventory():
+        store.add_product(product)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "store.snapshot")
+        store.save_snapshot(path)
+        loaded = Store.load_snapshot(path)
+    assert state(loaded) == state(store)
+    assert loaded.get_total_quantity() == 15
+    assert [p.name for p in loaded.get_all_products()] == ["Phone", "Wätch"]
+
+
+def test_columnar_round_trip_compacts_removed_slots(state):
+    """Test that a ColumnarStore snapshot skips removed slots."""
+    store = ColumnarStore()
+    for product in make_inventory():
+        store.add_product(product)
+    store.remove_product(store.get_product_by_name("Phone"))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "store.snapshot")
+        store.save_snapshot(path)
+        loaded = ColumnarStore.load_snapshot(path)
+        as_store = Store.load_snapshot(path)
+    assert state(loaded) == state(store)
+    assert state(as_store) == state(store)
+    assert loaded.get_total_quantity() == 5
+    assert len(loaded) == 2
+
+
+def test_float_price_snapshot_is_read_in_cents():
+    """Test that a version 2 snapshot with float64 prices loads with prices in cents."""
+    body = (
+        array("d", [499.99, 0.1]).tobytes()
+        + array("q", [10, 0]).tobytes()
+        + bytes([1, 0])
+        + "Phone\0Pen".encode()
+    )
+    header = HEADER.pack(MAGIC, FLOAT_PRICES_VERSION, 2, 9, 0, zlib.crc32(body))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "old.snapshot")
+        with open(path, "wb") as file:
+            file.write(header + body)
+        loaded = Store.load_snapshot(path)
+    assert [(p.name, p.price_cents, p.active) for p in loaded.product_list] == [
+        ("Phone", 49999, True),
+        ("Pen", 10, False),
+    ]
+
+
+def test_corrupt_snapshot_is_rejected():
+    """Test that a flipped byte is detected by the checksum."""
+    store = Store([Product("Phone", 500.0, 10)])
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "store.snapshot")
+        store.save_snapshot(path)
+        with open(path, "r+b") as file:
+            file.seek(-1, os.SEEK_END)
+            file.write(b"X")
+        try:
+            Store.load_snapshot(path)
+            assert False
+        except ValueError:
+            pass
+
+
+def test_foreign_file_is_rejected():
+    """Test that a file without the snapshot header raises ValueError."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "other.bin")
+        with open(path, "wb") as file:
+            file.write(b"not a snapshot at all, just some bytes")
+        try:
+            ColumnarStore.load_snapshot(path)
+            assert False
+        except ValueError:
+            pass
@@ -0,0 +1,34 @@
+"""
+Unit tests for the sorted secondary index.
+
+These tests verify range queries, key updates and removal, including the
+order of products that share a key.
+"""
+
+from products import Product
+from sorted_index import SortedIndex
+
+
+def test_range_bounds():
+    """Test inclusive, exclusive and open-ended ranges."""
+    products = [Product(f"Item {idx}", price=idx, quantity=1) for idx in range(5)]
+    index = SortedIndex((product, product.price) for product in products)
+    assert index.range(1, 3) == products[1:4]
+    assert index.range(1, 3, inclusive=False) == products[1:3]
+    assert index.range(None, 1) == products[:2]
+    assert index.range(3) == products[3:]
+    assert index.range(10, 20) == []
+
+
+def test_updates_move_products_between_keys():
+    """Test that re-keyed and removed products are found in their new places."""
+    products = [Product(f"Item {idx}", price=1, quantity=idx) for idx in range(3000)]
+    index = SortedIndex()
+    for product in products:
+        index.add(product, product.quantity)
+    index.add(products[2999], 0)
+    index.discard(products[1])
+    index.discard(products[1])
+    assert index.range(None, 3, inclusive=False) == [products[0], products[2999], products[2]]
+    assert len(index) == 2999
+    assert index.range(1000, 1002) == products[1000:1003]
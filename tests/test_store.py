@@ -5,8 +5,14 @@ These tests verify the functionality, validation logic, and error handling of th
 including product management, order processing, and data integrity.
 """
 
+import gc
+import threading
+import weakref
+
+import columnar_store
+from columnar_store import ColumnarStore
 from products import Product
-from store import Store
+from store import BatchOrderError, Store
 
 
 def test_store_initialization():
@@ -45,7 +51,7 @@ def test_order_valid_products():
     p2 = Product("Tablet", 300.0, 5)
     store = Store([p1, p2])
     total = store.order([(p1, 1), (p2, 2)])
-    assert total == 500.0 + 600.0
+    assert total == 50000 + 60000
     assert p1.quantity == 9
     assert p2.quantity == 3
 
@@ -100,3 +106,492 @@ def test_validate_shopping_list_empty():
         assert False
     except ValueError:
         pass
+
+
+def test_remove_missing_product_raises():
+    """Test that removing a product that is not in the store raises ValueError."""
+    p1 = Product("Phone", 500.0, 10)
+    store = Store([])
+    try:
+        store.remove_product(p1)
+        assert False
+    except ValueError:
+        pass
+
+
+def test_get_product_by_name():
+    """Test exact-name lookup, including after the product is removed."""
+    p1 = Product("Phone", 500.0, 10)
+    p2 = Product("Tablet", 300.0, 5)
+    store = Store([p1, p2])
+    assert store.get_product_by_name("Tablet") is p2
+    store.remove_product(p2)
+    assert store.get_product_by_name("Tablet") is None
+
+
+def test_catalog_keeps_insertion_order():
+    """Test that products are listed in insertion order after removals and re-adds."""
+    p1 = Product("Phone", 500.0, 10)
+    p2 = Product("Tablet", 300.0, 5)
+    p3 = Product("Laptop", 900.0, 2)
+    store = Store([p1, p2, p3])
+    store.remove_product(p1)
+    store.add_product(p1)
+    assert store.get_all_products() == [p2, p3, p1]
+    assert len(store) == 3
+    assert p1 in store
+
+
+def test_total_quantity_tracks_product_changes():
+    """Test that the running total follows buy and set_quantity on member products."""
+    p1 = Product("Phone", 500.0, 10)
+    p2 = Product("Tablet", 300.0, 5)
+    store = Store([p1, p2])
+    p1.buy(4)
+    p2.set_quantity(20)
+    assert store.get_total_quantity() == 26
+    store.remove_product(p2)
+    p2.set_quantity(1)
+    assert store.get_total_quantity() == 6
+
+
+def test_active_products_follow_status_changes():
+    """Test that deactivation and re-activation keep the listing in catalog order."""
+    p1 = Product("Phone", 500.0, 10)
+    p2 = Product("Tablet", 300.0, 5)
+    p3 = Product("Laptop", 900.0, 2)
+    store = Store([p1, p2, p3])
+    p1.deactivate()
+    p3.buy(2)
+    assert store.get_all_products() == [p2]
+    p1.activate()
+    p3.set_quantity(1)
+    p3.activate()
+    assert store.get_all_products() == [p1, p2, p3]
+
+
+def test_order_is_all_or_nothing():
+    """Test that a failing line leaves the stock of earlier lines untouched."""
+    p1 = Product("Phone", 500.0, 10)
+    p2 = Product("Tablet", 300.0, 5)
+    store = Store([p1, p2])
+    try:
+        store.order([(p1, 2), (p2, 6)])
+        assert False
+    except ValueError:
+        pass
+    assert p1.quantity == 10
+    assert p2.quantity == 5
+    assert store.get_total_quantity() == 15
+
+
+def test_failed_line_is_rolled_back_to_the_original_state():
+    """Test that a line failing after its decrement restores every product exactly."""
+
+    class FailingProduct(Product):
+        """Product whose stock removal fails after the stock was taken."""
+
+        __slots__ = ()
+
+        def _remove_stock(self, quantity):
+            super()._remove_stock(quantity)
+            raise RuntimeError("Disk full")
+
+    p1 = Product("Phone", 500.0, 2)
+    p2 = FailingProduct("Tablet", 300.0, 5)
+    store = Store([p1, p2])
+    try:
+        store.order([(p1, 2), (p2, 5)])
+        assert False
+    except RuntimeError:
+        pass
+    assert (p1.quantity, p1.is_active()) == (2, True)
+    assert (p2.quantity, p2.is_active()) == (5, True)
+    assert store.get_total_quantity() == 7
+    assert store.get_all_products() == [p1, p2]
+
+
+def test_order_aggregates_repeated_product():
+    """Test that repeated lines for one product are checked against stock together."""
+    p1 = Product("Phone", 500.0, 10)
+    store = Store([p1])
+    try:
+        store.order([(p1, 6), (p1, 5)])
+        assert False
+    except ValueError:
+        pass
+    assert p1.quantity == 10
+    assert store.order([(p1, 4), (p1, 6)]) == 500000
+    assert p1.quantity == 0
+    assert not p1.is_active()
+
+
+def test_order_totals_are_exact_cents():
+    """Test that totals of many cheap items add up exactly, with no float drift."""
+    pen = Product("Pen", 0.1, 1_000_000)
+    clip = Product("Clip", 0.2, 1_000_000)
+    store = Store([pen, clip])
+    total = sum(store.order([(pen, 1), (clip, 1)]) for _ in range(1000))
+    assert total == 30_000
+    assert store.order([(pen, 7), (clip, 3)]) == 130
+
+
+def test_concurrent_orders_never_oversell():
+    """Test that many threads ordering the same products never drive stock below zero."""
+    p1 = Product("Phone", 500.0, 100)
+    p2 = Product("Tablet", 300.0, 100)
+    store = Store([p1, p2])
+    sold = []
+
+    def buyer():
+        for _ in range(50):
+            try:
+                store.order([(p1, 1), (p2, 1)])
+                sold.append(1)
+            except ValueError:
+                pass
+
+    threads = [threading.Thread(target=buyer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(sold) == 100
+    assert p1.quantity == 0
+    assert p2.quantity == 0
+    assert store.get_total_quantity() == 0
+
+
+def test_order_many_skips_failed_carts_in_input_order():
+    """Test that stock is allocated in input order and failing carts are skipped."""
+    p1 = Product("Phone", 500.0, 3)
+    p2 = Product("Tablet", 300.0, 5)
+    store = Store([p1, p2])
+    result = store.order_many([
+        [(p1, 2)],
+        [(p1, 2), (p2, 1)],
+        [(p2, 1)],
+        "not-a-list",
+        [(p1, 1)],
+    ])
+    assert result.totals == [100000, None, 30000, None, 50000]
+    assert sorted(result.failures) == [1, 3]
+    assert result.succeeded == 3
+    assert p1.quantity == 0
+    assert not p1.is_active()
+    assert p2.quantity == 4
+    assert store.get_total_quantity() == 4
+
+
+def test_order_many_abort_changes_nothing():
+    """Test that the abort policy rejects the whole batch without touching stock."""
+    p1 = Product("Phone", 500.0, 3)
+    store = Store([p1])
+    try:
+        store.order_many([[(p1, 1)], [(p1, 5)]], on_error="abort")
+        assert False
+    except BatchOrderError as error:
+        assert error.index == 1
+    assert p1.quantity == 3
+
+
+def test_get_product_by_name_with_namesakes():
+    """Test that the earliest remaining product wins when names are shared."""
+    p1 = Product("Phone", 500.0, 10)
+    p2 = Product("Phone", 450.0, 3)
+    p3 = Product("Phone", 400.0, 1)
+    store = Store([p1, p2, p3])
+    assert store.get_product_by_name("Phone") is p1
+    store.remove_product(p2)
+    store.remove_product(p1)
+    assert store.get_product_by_name("Phone") is p3
+
+
+def test_add_products_is_all_or_nothing():
+    """Test that a batch containing a known product adds nothing."""
+    p1 = Product("Phone", 500.0, 10)
+    p2 = Product("Tablet", 300.0, 5)
+    store = Store([p1])
+    try:
+        store.add_products([p2, p1])
+        assert False
+    except ValueError:
+        pass
+    assert len(store) == 1
+    store.add_products([p2])
+    assert store.get_all_products() == [p1, p2]
+    assert store.get_total_quantity() == 15
+
+
+def test_reservation_holds_stock_until_confirmed():
+    """Test that reserved stock cannot be ordered by others and is bought on confirm."""
+    product = Product("Phone", price=500, quantity=5)
+    store = Store([product])
+    reservation = store.reserve(product, 3)
+    assert store.get_available_quantity(product) == 2
+    assert store.get_available_quantity() == 2
+    try:
+        store.order([(product, 3)])
+        assert False
+    except ValueError:
+        pass
+    assert store.confirm(reservation) == 150000
+    assert product.quantity == 2
+    assert store.get_available_quantity() == 2
+
+
+def test_release_and_expiry_return_stock():
+    """Test that released and expired reservations make their stock available again."""
+    product = Product("Phone", price=500, quantity=5)
+    store = Store([product])
+    released = store.reserve(product, 2)
+    expired = store.reserve(product, 3, ttl=0)
+    store.release(released)
+    assert store.expire_reservations() == 1
+    assert store.get_available_quantity(product) == 5
+    try:
+        store.confirm(expired)
+        assert False
+    except ValueError:
+        pass
+    assert product.quantity == 5
+
+
+def test_confirm_is_all_or_nothing():
+    """Test that confirming several reservations fails as a whole if one is expired."""
+    phone = Product("Phone", price=500, quantity=5)
+    tablet = Product("Tablet", price=300, quantity=5)
+    store = Store([phone, tablet])
+    valid = store.reserve(phone, 1)
+    stale = store.reserve(tablet, 1, ttl=0)
+    try:
+        store.confirm(valid, stale)
+        assert False
+    except ValueError:
+        pass
+    assert (phone.quantity, tablet.quantity) == (5, 5)
+    assert store.get_available_quantity(phone) == 4
+
+
+def test_hold_without_ttl_survives_expiry_and_deactivation():
+    """Test that a hold with ttl=None never expires and is sold even after deactivation."""
+    product = Product("Phone", price=500, quantity=5)
+    store = Store([product])
+    reservation = store.reserve(product, 2, ttl=None)
+    assert store.expire_reservations(now=float("1e18")) == 0
+    product.deactivate()
+    assert store.confirm(reservation) == 100000
+    assert product.quantity == 3
+
+
+def test_remove_product_releases_its_reservations():
+    """Test that removing a product drops its holds so they can no longer be confirmed."""
+    for store_class in (Store, ColumnarStore):
+        store = store_class([Product("Phone", price=100, quantity=10), Product("Tablet", 1, 1)])
+        phone = store.get_product_by_name("Phone")
+        tablet = store.get_product_by_name("Tablet")
+        reservation = store.reserve(phone, 8)
+        store.reserve(phone, 1)
+        kept = store.reserve(tablet, 1)
+        store.remove_product(phone)
+        assert store.get_available_quantity() == 0
+        assert store.confirm(kept) == 100
+        assert store._reservations_by_product == {}
+        try:
+            store.confirm(reservation)
+            assert False
+        except ValueError:
+            pass
+        # Nothing was sold; a removed columnar slot reads as zero stock
+        assert phone.quantity == (10 if store_class is Store else 0)
+        try:
+            store.reserve(phone, 1)
+            assert False
+        except ValueError:
+            pass
+
+
+def test_reserve_more_than_available_raises():
+    """Test that holds cannot exceed the stock left after other holds."""
+    product = Product("Phone", price=500, quantity=5)
+    store = Store([product])
+    store.reserve(product, 4)
+    try:
+        store.reserve(product, 2)
+        assert False
+    except ValueError:
+        pass
+
+
+def test_search_prefix_and_tokens():
+    """Test case-insensitive prefix and word search over product names."""
+    pixel = Product("Google Pixel 7", price=500, quantity=5)
+    pixel_pro = Product("Google Pixel 7 Pro", price=800, quantity=5)
+    iphone = Product("iPhone 15", price=1200, quantity=5)
+    store = Store([pixel, pixel_pro, iphone])
+    assert store.search_prefix("google p") == [pixel, pixel_pro]
+    assert store.search_prefix("IPH") == [iphone]
+    assert store.search_prefix("goo", limit=1) == [pixel]
+    assert store.search_tokens("pixel") == [pixel, pixel_pro]
+    assert store.search_tokens("PRO pixel") == [pixel_pro]
+    assert store.search_tokens("pixel 8") == []
+
+
+def test_search_index_follows_catalog_changes():
+    """Test that searches reflect added, removed and deactivated products."""
+    pixel = Product("Google Pixel 7", price=500, quantity=5)
+    store = Store([pixel])
+    assert store.search_tokens("pixel") == [pixel]
+    pixel_pro = Product("Google Pixel 7 Pro", price=800, quantity=5)
+    store.add_product(pixel_pro)
+    assert store.search_prefix("google") == [pixel, pixel_pro]
+    pixel.deactivate()
+    assert store.search_tokens("pixel") == [pixel_pro]
+    store.remove_product(pixel_pro)
+    assert store.search_prefix("google") == []
+    pixel.activate()
+    assert store.search_tokens("google") == [pixel]
+
+
+def test_price_range_follows_status_and_price_changes():
+    """Test that price range queries see deactivation, sell-outs and repricing."""
+    cheap = Product("Cable", price=20, quantity=5)
+    mid = Product("Speaker", price=300, quantity=1)
+    high = Product("Phone", price=550, quantity=5)
+    top = Product("Laptop", price=1450, quantity=5)
+    store = Store([cheap, mid, high, top])
+    assert store.price_range(200, 600) == [mid, high]
+    store.order([(mid, 1)])
+    assert store.price_range(200, 600) == [high]
+    top.price = 250
+    high.deactivate()
+    assert store.price_range(200, 600) == [top]
+    high.activate()
+    assert store.price_range(0, 10_000) == [cheap, top, high]
+
+
+def test_low_stock_and_sold_out_listener():
+    """Test that low-stock queries track stock levels and sell-outs are reported."""
+    phone = Product("Phone", price=500, quantity=3)
+    tablet = Product("Tablet", price=300, quantity=50)
+    store = Store([phone, tablet])
+    sold_out = []
+    store.add_sold_out_listener(sold_out.append)
+    assert store.low_stock(10) == [phone]
+    store.order([(phone, 3)])
+    tablet.set_quantity(5)
+    assert store.low_stock(10) == [phone, tablet]
+    assert store.low_stock(1) == [phone]
+    assert sold_out == [phone]
+    store.remove_sold_out_listener(sold_out.append)
+    tablet.set_quantity(0)
+    assert sold_out == [phone]
+
+
+def test_low_stock_order_is_the_same_for_both_backends():
+    """Test that Store and ColumnarStore both list low stock lowest first."""
+    rows = [("A", 1, 4), ("B", 1, 1), ("C", 1, 9), ("D", 1, 0), ("E", 1, 4)]
+    for store in (Store([Product(*row) for row in rows]), ColumnarStore.from_rows(rows)):
+        assert [product.name for product in store.low_stock(5)] == ["D", "B", "A", "E"]
+
+
+def test_low_stock_ties_follow_the_order_stock_was_reached():
+    """Test that both backends list products with equal stock in the order they reached it."""
+    rows = [("A", 1, 4), ("B", 1, 1), ("C", 1, 9), ("D", 1, 0), ("E", 1, 4)]
+    saved = columnar_store.np
+    stores = [lambda: Store([Product(*row) for row in rows]), lambda: ColumnarStore.from_rows(rows)]
+    try:
+        for backend in (saved, None):
+            columnar_store.np = backend
+            for build in stores:
+                store = build()
+                products = {product.name: product for product in store.product_list}
+                assert [product.name for product in store.low_stock(5)] == ["D", "B", "A", "E"]
+                products["E"].set_quantity(1)
+                products["C"].set_quantity(1)
+                store.bulk_restock([products["D"], products["A"]], [2, 0])
+                store.bulk_set_quantities([products["A"], products["B"], products["A"]], [3, 1, 2])
+                store.add_product(Product("F", 1, 1))
+                names = [product.name for product in store.low_stock(5)]
+                assert names == ["B", "E", "C", "F", "D", "A"]
+    finally:
+        columnar_store.np = saved
+
+
+def test_bulk_operations_match_item_by_item():
+    """Test that bulk updates give the same result as per-product calls."""
+    products = [Product(f"Item {idx}", price=idx + 1, quantity=idx % 3) for idx in range(6)]
+    copies = [Product(p.name, price=p.price, quantity=p.quantity) for p in products]
+    store = Store(products)
+    assert store.inventory_value() == sum(p.price_cents * p.quantity for p in products)
+    store.bulk_restock([products[0], products[1], products[1], products[3]], [4, 1, 2, 0])
+    for idx, amount in [(0, 4), (1, 1), (1, 2), (3, 0)]:
+        copies[idx].set_quantity(copies[idx].get_quantity() + amount)
+    store.bulk_set_quantities([products[2], products[4], products[2]], [7, 0, 5])
+    for idx, quantity in [(2, 7), (4, 0), (2, 5)]:
+        copies[idx].set_quantity(quantity)
+    store.bulk_markdown([products[5], products[5]], 25)
+    copies[5].price *= 0.75
+    for product, copy in zip(products, copies):
+        assert (product.price_cents, product.quantity, product.active) == (
+            copy.price_cents, copy.quantity, copy.active
+        )
+    assert store.get_total_quantity() == sum(p.quantity for p in copies)
+    for call in (
+        lambda: store.bulk_restock([Product("Other", price=1, quantity=1)], [1]),
+        lambda: store.bulk_set_quantities(products[:2], [3, -1]),
+        lambda: store.bulk_set_quantities(products[:2], [3]),
+    ):
+        try:
+            call()
+            assert False
+        except ValueError:
+            pass
+    assert products[0].quantity == copies[0].quantity
+
+
+def test_bulk_markdown_rejects_bad_percent():
+    """Test that an out-of-range or non-numeric percent is reported as such."""
+    for store in (ColumnarStore.from_rows([("A", 2.0, 1)]), Store([Product("A", 2.0, 1)])):
+        cases = ((-5, ValueError), (101, ValueError), ("10", TypeError), (True, TypeError))
+        for percent, error in cases:
+            try:
+                store.bulk_markdown(store.product_list, percent)
+                assert False
+            except error as raised:
+                assert "percent" in str(raised)
+        assert store.product_list[0].price == 2.0
+
+
+def test_discarded_store_is_freed_and_not_notified():
+    """Test that products do not keep a store alive once it is no longer used."""
+    product = Product("Phone", price=100, quantity=5)
+    kept = Store([product])
+    discarded = Store([product])
+    discarded_ref = weakref.ref(discarded)
+    del discarded
+    gc.collect()
+    assert discarded_ref() is None
+    product.set_quantity(2)
+    assert kept.get_total_quantity() == 2
+    other = Store([product])
+    assert len(product._stores) == 2
+    other.remove_product(product)
+    assert len(product._stores) == 1
+
+
+def test_products_page_follows_active_catalog_order():
+    """Test that pages are consecutive slices of the active products."""
+    products = [Product(f"Item {idx}", price=1, quantity=1) for idx in range(7)]
+    store = Store(products)
+    products[1].deactivate()
+    assert store.count_active_products() == 6
+    assert store.get_products_page(0, 4) == [products[0]] + products[2:5]
+    assert store.get_products_page(4, 4) == products[5:]
+    assert store.get_products_page(10, 4) == []
+    try:
+        store.get_products_page(-1)
+        assert False
+    except ValueError:
+        pass
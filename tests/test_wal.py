@@ -0,0 +1,236 @@
+"""
+Unit tests for the write-ahead log and store recovery.
+
+These tests verify that changes logged by a Store are replayed on top of the
+latest snapshot, that damaged log tails are ignored and that checkpoints
+compact the log.
+"""
+
+import os
+import tempfile
+import threading
+
+from columnar_store import ColumnarStore
+from products import Product
+from store import Store
+from wal import WriteAheadLog, read_log
+
+
+def test_recover_replays_changes(state, make_phone_and_tablet):
+    """Test that orders, restocks, activations and catalog changes survive a restart."""
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, "store.snapshot")
+        wal_path = os.path.join(directory, "store.wal")
+        store = Store.recover(snapshot_path, wal_path, make_phone_and_tablet())
+        phone = store.get_product_by_name("Phone")
+        tablet = store.get_product_by_name("Tablet")
+        store.order([(phone, 2), (tablet, 5)])
+        phone.set_quantity(40)
+        phone.deactivate()
+        store.add_product(Product("Watch", 250.0, 3))
+        store.remove_product(tablet)
+        store.order_many([[(store.get_product_by_name("Watch"), 1)]])
+        store._wal.close()
+
+        recovered = Store.recover(snapshot_path, wal_path, make_phone_and_tablet())
+        assert state(recovered) == state(store)
+        assert recovered.get_total_quantity() == store.get_total_quantity()
+        assert recovered.lsn == store.lsn
+
+
+def test_checkpoint_compacts_log(make_phone_and_tablet):
+    """Test that a checkpoint empties the log and recovery still matches."""
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, "store.snapshot")
+        wal_path = os.path.join(directory, "store.wal")
+        store = Store.recover(snapshot_path, wal_path, make_phone_and_tablet(), sync="none")
+        phone = store.get_product_by_name("Phone")
+        store.order([(phone, 1)])
+        store.checkpoint(snapshot_path)
+        assert list(read_log(wal_path)) == []
+        store.order([(phone, 2)])
+        store._wal.close()
+
+        recovered = Store.recover(snapshot_path, wal_path)
+        assert recovered.get_product_by_name("Phone").quantity == 7
+        assert [record["op"] for record in read_log(wal_path)] == ["order"]
+
+
+def test_restart_after_checkpoint_keeps_numbering(make_phone_and_tablet):
+    """Test that sales logged after a checkpoint and a restart survive the next recovery."""
+    for store_class in (Store, ColumnarStore):
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot_path = os.path.join(directory, "store.snapshot")
+            wal_path = os.path.join(directory, "store.wal")
+            store = store_class.recover(
+                snapshot_path, wal_path, make_phone_and_tablet(), sync="none"
+            )
+            for _ in range(5):
+                store.order([(store.get_product_by_name("Phone"), 1)])
+            store.checkpoint(snapshot_path)
+            store._wal.close()
+
+            store = store_class.recover(snapshot_path, wal_path)
+            assert store.lsn == 5
+            store.order([(store.get_product_by_name("Phone"), 3)])
+            store._wal.close()
+
+            recovered = store_class.recover(snapshot_path, wal_path)
+            assert recovered.get_product_by_name("Phone").quantity == 2
+            assert recovered.lsn == 6
+
+
+def test_logged_store_rejects_duplicate_names():
+    """Test that names stay unique while a log identifies products by name."""
+    for store_class in (Store, ColumnarStore):
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot_path = os.path.join(directory, "store.snapshot")
+            wal_path = os.path.join(directory, "store.wal")
+            store = store_class.recover(snapshot_path, wal_path, [Product("A", 1, 10)], sync="none")
+            for add in (
+                lambda: store.add_product(Product("A", 2, 10)),
+                lambda: store.add_products([Product("B", 2, 10), Product("B", 3, 10)]),
+                lambda: store.add_rows([("C", 2, 10), ("A", 3, 10)]),
+            ):
+                try:
+                    add()
+                    assert False
+                except ValueError:
+                    pass
+            assert [product.name for product in store.product_list] == ["A"]
+            store._wal.close()
+            try:
+                store_class.recover(
+                    snapshot_path, wal_path, [Product("A", 1, 1), Product("A", 2, 1)]
+                )
+                assert False
+            except ValueError:
+                pass
+
+
+def test_bulk_markdown_is_recovered(state, make_phone_and_tablet):
+    """Test that prices changed by bulk_markdown survive a restart for both backends."""
+    for store_class in (Store, ColumnarStore):
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot_path = os.path.join(directory, "store.snapshot")
+            wal_path = os.path.join(directory, "store.wal")
+            store = store_class.recover(snapshot_path, wal_path, make_phone_and_tablet())
+            store.bulk_markdown(store.product_list, 10)
+            store.bulk_restock(store.product_list[:1], [3])
+            store._wal.close()
+
+            recovered = store_class.recover(snapshot_path, wal_path, make_phone_and_tablet())
+            assert state(recovered) == state(store)
+            assert [p.price for p in recovered.product_list] == [450.0, 270.0]
+
+
+def test_torn_tail_is_ignored():
+    """Test that a partially written record is dropped and later records follow it."""
+    with tempfile.TemporaryDirectory() as directory:
+        wal_path = os.path.join(directory, "store.wal")
+        wal = WriteAheadLog(wal_path, sync="none")
+        wal.log({"op": "set_active", "name": "Phone", "active": False})
+        wal.close()
+        with open(wal_path, "ab") as file:
+            file.write(b'0badc0de {"lsn": 2, "op"')
+
+        wal = WriteAheadLog(wal_path, sync="none")
+        assert wal.lsn == 1
+        wal.log({"op": "set_active", "name": "Phone", "active": True})
+        wal.close()
+        assert [record["lsn"] for record in read_log(wal_path)] == [1, 2]
+
+
+def test_group_commit_with_concurrent_orders():
+    """Test that concurrent orders in group-commit mode all recover."""
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, "store.snapshot")
+        wal_path = os.path.join(directory, "store.wal")
+        products = [Product(f"Item {idx}", 1.0, 100) for idx in range(4)]
+        store = Store.recover(snapshot_path, wal_path, products, sync="group")
+
+        def buyer(product):
+            for _ in range(25):
+                store.order([(product, 1)])
+
+        threads = [threading.Thread(target=buyer, args=(product,)) for product in products]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        store._wal.close()
+
+        fresh = [Product(f"Item {idx}", 1.0, 100) for idx in range(4)]
+        recovered = Store.recover(snapshot_path, wal_path, fresh)
+        assert [p.quantity for p in recovered.product_list] == [75, 75, 75, 75]
+
+
+def test_columnar_store_recovery(state, make_phone_and_tablet):
+    """Test that a ColumnarStore logs view changes and bulk updates."""
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, "store.snapshot")
+        wal_path = os.path.join(directory, "store.wal")
+        store = ColumnarStore.recover(snapshot_path, wal_path, make_phone_and_tablet())
+        store.checkpoint(snapshot_path)
+        phone, tablet = store.get_all_products()
+        store.order([(phone, 3)])
+        tablet.set_quantity(0)
+        store.bulk_restock([phone, phone], [1, 2])
+        store.add_row("Watch", 250.0, 3)
+        store._wal.close()
+
+        recovered = ColumnarStore.recover(snapshot_path, wal_path)
+        assert state(recovered) == state(store)
+        assert recovered.get_total_quantity() == 13
+
+
+def test_replays_add_records_with_float_prices():
+    """Test that add records logged before prices were kept in cents still replay."""
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, "store.snapshot")
+        wal_path = os.path.join(directory, "store.wal")
+        wal = WriteAheadLog(wal_path, sync="none")
+        wal.wait(wal.append(
+            {"op": "add", "name": "Pen", "price": 0.29, "quantity": 4, "active": True}
+        ))
+        wal.close()
+        recovered = Store.recover(snapshot_path, wal_path)
+        assert recovered.get_product_by_name("Pen").price_cents == 29
+
+
+def test_failed_write_marks_log_as_failed(make_phone_and_tablet):
+    """Test that a failed write is never reported as durable and blocks later changes."""
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, "store.snapshot")
+        wal_path = os.path.join(directory, "store.wal")
+        store = Store.recover(snapshot_path, wal_path, make_phone_and_tablet())
+        phone = store.get_product_by_name("Phone")
+        wal = store._wal
+        write = wal._write
+
+        def failing_write(batch):
+            wal._write = write
+            raise OSError("No space left on device")
+
+        wal._write = failing_write
+        try:
+            store.order([(phone, 1)])
+            assert False
+        except OSError:
+            pass
+        # The failed order was applied in memory, but nothing claims it is durable
+        assert phone.quantity == 9
+        for change in (
+            lambda: store.order([(phone, 1)]),
+            lambda: wal.wait(wal.lsn),
+            lambda: store.add_product(Product("Watch", 250.0, 3)),
+        ):
+            try:
+                change()
+                assert False
+            except OSError:
+                pass
+        assert phone.quantity == 9
+        assert len(store) == 2
+        wal.close()
+        assert list(read_log(wal_path)) == []
@@ -0,0 +1,70 @@
+"""
+Non-interactive batch mode
+
+This module runs a script of store commands without any prompts:
+- Each line is a menu number (1 = list products, 2 = total quantity,
+  4 = quit) or a JSON request as accepted by commands.execute_request,
+  e.g. {"op": "order", "items": [["Google Pixel 7", 2]]}.
+- Blank lines and lines starting with # are skipped.
+- Every command is answered with one JSON line, so a session can be replayed
+  from a file and its results processed by other programs.
+
+"""
+
+import json
+from collections.abc import Iterable
+from typing import TextIO
+
+import commands
+from store import Store
+
+# Menu numbers accepted in batch scripts, as requests; None stops the script
+BATCH_MENU_COMMANDS = {"1": {"op": "list"}, "2": {"op": "total"}, "4": None}
+
+
+def run_batch(store: Store, lines: Iterable[str], output: TextIO) -> None:
+    """
+    Run a command script and write one JSON result line per command.
+
+    Failed commands, whatever the exception, are reported with "ok": false and
+    their line number, as the order server does, and the script goes on; a
+    quit command (4 or {"op": "quit"}) ends it early.
+
+    :param store: The store instance containing products.
+    :param lines: Script lines, e.g. an open file
+    :param output: Stream that receives the JSON results
+    """
+    write = output.write
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        request_id = None
+        try:
+            if line in BATCH_MENU_COMMANDS:
+                request = BATCH_MENU_COMMANDS[line]
+                if request is None:
+                    break
+            else:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object")
+                if request.get("op") == "quit":
+                    break
+            request_id = request.get("id")
+            response = commands.execute_request(store, request)
+        except (KeyError, TypeError, ValueError) as error:
+            response = {"ok": False, "error": str(error), "line": line_number}
+        except RecursionError:
+            response = {"ok": False, "error": "Request is nested too deeply", "line": line_number}
+        except Exception as error:
+            # E.g. OSError from a failed write-ahead log; the script goes on
+            response = {
+                "ok": False,
+                "error": f"Request failed: {type(error).__name__}",
+                "line": line_number,
+            }
+        if request_id is not None:
+            response["id"] = request_id
+        write(json.dumps(response) + "\n")
+    output.flush()
@@ -0,0 +1,81 @@
+"""
+Paginated product listing for the command line
+
+This module renders the active products of a store one page at a time:
+- Formatting a page of products as numbered lines.
+- Writing each page to the terminal with a single buffered write.
+- Letting the user page through the catalog on demand.
+
+Products are numbered by their position in the full active list, so a number
+shown on any page can be used to select the product.
+
+"""
+
+import sys
+
+from products import Product, format_cents
+from store import DEFAULT_PAGE_SIZE, Store
+
+
+def render_page(store: Store, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE) -> str:
+    """
+    Format one page of active products as text.
+
+    :param store: The store whose products are listed
+    :param offset: Number of active products to skip
+    :param limit: Largest number of products on the page
+    :return: The page, including a header and a position footer
+    """
+    return format_page(
+        store.get_products_page(offset, limit), offset, store.count_active_products()
+    )
+
+
+def format_page(products: list[Product], offset: int, total: int) -> str:
+    """
+    Format a page of products, numbered by their position in the full list.
+
+    :param products: The products on the page
+    :param offset: Position of the first product in the full list
+    :param total: Length of the full list
+    :return: The page, including a header and a position footer
+    """
+    if not products:
+        return "No products available.\n"
+    lines = ["\nAvailable products:\n"]
+    lines.extend(
+        f"{number}. {product.name}, Price: {format_cents(product.price_cents)}, "
+        f"Quantity: {product.quantity}\n"
+        for number, product in enumerate(products, start=offset + 1)
+    )
+    lines.append(f"Showing {offset + 1}-{offset + len(products)} of {total} products.\n\n")
+    return "".join(lines)
+
+
+def print_page(store: Store, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE) -> None:
+    """
+    Write one page of active products to the terminal in a single write.
+
+    :param store: The store whose products are listed
+    :param offset: Number of active products to skip
+    :param limit: Largest number of products on the page
+    """
+    sys.stdout.write(render_page(store, offset, limit))
+    sys.stdout.flush()
+
+
+def browse_products(store: Store, limit: int = DEFAULT_PAGE_SIZE) -> None:
+    """
+    Show the active products page by page until the user stops or the list ends.
+
+    :param store: The store whose products are listed
+    :param limit: Number of products per page
+    """
+    offset = 0
+    while True:
+        print_page(store, offset, limit)
+        offset += limit
+        if offset >= store.count_active_products():
+            return
+        if input("Press Enter for the next page or 'q' to stop: ").strip().lower() == "q":
+            return
@@ -2,16 +2,22 @@
 Order processing module
 
 This module provides functionality to interactively process a customer's order by:
-- Listing products available in the store.
-- Accepting product selections and desired quantities.
-- Submitting the shopping cart to the store for final order processing.
+- Listing products available in the store, one page at a time, on request.
+- Accepting product selections and desired quantities, merging repeated picks.
+- Reserving the selected stock right away, so that it cannot be sold to
+  someone else while the user is still choosing.
+- Confirming the reservations as one order, or releasing them if that fails.
 
 
 Author: Martin Haferanke
 Date: 2025-07-01
 """
 
-from store import Store
+import sys
+
+from products import Product, format_cents
+from store import DEFAULT_PAGE_SIZE, Store
+from utils.listing import format_page
 
 
 def process_order(store: Store) -> None:
@@ -20,33 +26,70 @@ def process_order(store: Store) -> None:
     the store, input their desired quantities, and finalize the order. Once the process
     is complete, the total cost of the shopping cart will be displayed.
 
+    The products are numbered once, from the store's cached list of active products,
+    and that numbered view stays fixed for the whole order. A page of it is only
+    printed when the user asks for one; adding an item prints a single cart line.
+    Picking a product again adds to its quantity in the cart. The cost of an order
+    therefore grows with the number of items picked, not with the catalog size.
+
+    Every selected line is reserved as soon as it is entered and the reservations
+    are confirmed together at the end, so the stock cannot run out between
+    selecting a product and placing the order. Reservations that were not
+    confirmed are released.
+
     :param store: The store object from which products will be retrieved and the
                   order will be processed
     :raises ValueError: If the user inputs an invalid product number or quantity
     :raises Exception: If an error occurs during order processing
     """
-    shopping_cart = []
     products = store.get_all_products()
+    cart: dict[Product, int] = {}
+    reservations = []
+    offset = 0
+    show_page = True
 
     while True:
         try:
 
-            store.print_products()
+            if show_page:
+                page = products[offset:offset + DEFAULT_PAGE_SIZE]
+                sys.stdout.write(format_page(page, offset, len(products)))
+                show_page = False
 
-            choice = int(input("Enter product number to buy (0 to finish): "))
+            answer = input(
+                "Enter product number to buy "
+                "(0 to finish, n/p for next/previous page, l to list): "
+            ).strip().lower()
+            if answer in ("n", "p", "l"):
+                if answer == "n" and offset + DEFAULT_PAGE_SIZE < len(products):
+                    offset += DEFAULT_PAGE_SIZE
+                elif answer == "p":
+                    offset = max(0, offset - DEFAULT_PAGE_SIZE)
+                show_page = True
+                continue
+            choice = int(answer)
             if choice == 0:
                 break
             if 1 <= choice <= len(products):
-                qty = int(input(f"Enter quantity for {products[choice - 1].name}: "))
+                product = products[choice - 1]
+                qty = int(input(f"Enter quantity for {product.name}: "))
                 if qty > 0:
-                    shopping_cart.append((products[choice - 1], qty))
+                    try:
+                        reservations.append(store.reserve(product, qty))
+                    except ValueError as e:
+                        print(f"Cannot add to cart: {e}")
+                        continue
+                    cart[product] = cart.get(product, 0) + qty
+                    print(f"In cart: {cart[product]} x {product.name} ({len(cart)} products)")
             else:
                 print("Invalid product number.")
         except ValueError:
             print("Invalid input. Please enter a valid number.")
 
     try:
-        total = store.order(shopping_cart)
-        print(f"Order placed successfully. Total cost: ${total}")
+        total = store.confirm(*reservations)
+        print(f"Order placed successfully. Total cost: ${format_cents(total)}")
     except Exception as e:
         print(f"Error processing order: {e}")
+    finally:
+        store.release(*reservations)
@@ -0,0 +1,288 @@
+"""
+Write-ahead log for store changes.
+
+This module provides an append-only log of committed orders, restocks,
+activations and catalog changes. A Store with an attached log records every
+change before acknowledging it, and Store.recover rebuilds the state after a
+crash by replaying the log on top of the most recent snapshot.
+
+Each record is one line holding a CRC-32 and a JSON object:
+
+    <crc32 as 8 hex digits> {"lsn": 42, "op": "order", ...}
+
+Records carry increasing log sequence numbers (LSNs). Reading stops at the
+first damaged or incomplete line, which is what a crash in the middle of a
+write leaves behind.
+
+Durability modes:
+- "always": every record is written and fsynced on its own.
+- "group": concurrent commits share one fsync; the first waiting committer
+  flushes everything buffered so far for the others (group commit).
+- "none": records are handed to the operating system without fsync.
+
+A failed write (a full disk, an I/O error) cannot tell which of the buffered
+records reached the disk, so it marks the log as failed: the failing wait and
+every later append or wait raises OSError, and nothing more is written. A
+process that hits this must recover from the files on disk.
+
+Classes:
+- WriteAheadLog: Appends records and makes them durable.
+
+Functions:
+- read_log: Iterates over the intact records of a log file.
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+
+SYNC_ALWAYS = "always"
+SYNC_GROUP = "group"
+SYNC_NONE = "none"
+
+
+def _encode(record: dict) -> bytes:
+    """
+    Encode a record as a checksummed log line.
+
+    :param record: JSON-serializable record including its LSN
+    :return: The encoded line
+    """
+    payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def read_log(path: str, after_lsn: int = 0) -> Iterator[dict]:
+    """
+    Iterate over the intact records of a log file in order.
+
+    :param path: Log file path; a missing file yields nothing
+    :param after_lsn: Only records with a greater LSN are returned
+    :return: Iterator of records
+    """
+    for record, _ in _scan(path):
+        if record["lsn"] > after_lsn:
+            yield record
+
+
+def _scan(path: str) -> Iterator[tuple[dict, int]]:
+    """
+    Iterate over the intact records of a log file with their encoded sizes.
+
+    :param path: Log file path; a missing file yields nothing
+    :return: Iterator of (record, line length in bytes)
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as file:
+        for line in file:
+            if not line.endswith(b"\n") or len(line) < 10:
+                return
+            payload = line[9:-1]
+            try:
+                if int(line[:8], 16) != zlib.crc32(payload):
+                    return
+                record = json.loads(payload)
+            except ValueError:
+                return
+            yield record, len(line)
+
+
+class WriteAheadLog:
+    """
+    An append-only, checksummed log file with configurable durability.
+
+    Appending only buffers a record and assigns its LSN; wait makes it durable
+    according to the sync mode. Splitting the two lets callers append while
+    holding their locks and wait for the disk after releasing them.
+
+    :param path: Log file path; an existing log is continued
+    :type path: str
+    :param sync: One of "always", "group" or "none"
+    :type sync: str
+    :param group_delay: Seconds a group-commit leader waits for more records before flushing
+    :type group_delay: float
+    :param start_lsn: Lowest LSN to continue from, e.g. the LSN of the snapshot the
+                      log continues. A compacted log may hold no records, so its
+                      file alone cannot tell where numbering stopped.
+    :type start_lsn: int
+
+    :raises ValueError: If the sync mode is unknown
+    """
+
+    def __init__(
+        self, path: str, sync: str = SYNC_GROUP, group_delay: float = 0.0, start_lsn: int = 0
+    ):
+        """Constructor method"""
+        if sync not in (SYNC_ALWAYS, SYNC_GROUP, SYNC_NONE):
+            raise ValueError(f"Unknown sync mode: {sync!r}")
+        self.path = path
+        self.sync = sync
+        self.group_delay = group_delay
+
+        last_lsn = start_lsn
+        valid_size = 0
+        for record, size in _scan(path):
+            last_lsn = max(last_lsn, record["lsn"])
+            valid_size += size
+        self._file = open(path, "ab")
+        # Cut off a torn tail so new records follow the last intact one
+        self._file.truncate(valid_size)
+
+        self._cond = threading.Condition()
+        self._pending: list[bytes] = []
+        self._lsn = last_lsn
+        self._durable_lsn = last_lsn
+        self._flushing = False
+        # The exception of the write that failed, see check
+        self._error: OSError | None = None
+
+    @property
+    def lsn(self) -> int:
+        """LSN of the last appended record."""
+        return self._lsn
+
+    @property
+    def failed(self) -> bool:
+        """Whether a write failed, so no further record can become durable."""
+        return self._error is not None
+
+    def check(self) -> None:
+        """
+        Raise if a write failed.
+
+        :raises OSError: If the log is marked as failed
+        """
+        if self._error is not None:
+            raise OSError(f"Write-ahead log failed: {self._error}") from self._error
+
+    def append(self, record: dict) -> int:
+        """
+        Assign the next LSN to a record and buffer it for writing.
+
+        :param record: JSON-serializable record without an "lsn" key
+        :return: The record's LSN, to be passed to wait
+        :raises OSError: If the log is marked as failed
+        """
+        with self._cond:
+            self.check()
+            self._lsn += 1
+            self._pending.append(_encode({"lsn": self._lsn, **record}))
+            return self._lsn
+
+    def wait(self, lsn: int) -> None:
+        """
+        Block until the record with the given LSN is durable.
+
+        In "group" mode the first waiter becomes the leader and flushes every
+        buffered record with one fsync, while later waiters wait for it.
+
+        :param lsn: LSN returned by append
+        :raises OSError: If the record could not be written; the log is then
+                         marked as failed
+        """
+        with self._cond:
+            while self._durable_lsn < lsn:
+                self.check()
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+                self._flushing = True
+                try:
+                    if self.sync == SYNC_GROUP and self.group_delay:
+                        self._cond.release()
+                        try:
+                            time.sleep(self.group_delay)
+                        finally:
+                            self._cond.acquire()
+                    batch, self._pending = self._pending, []
+                    batch_lsn = self._lsn
+                    self._cond.release()
+                    try:
+                        self._write(batch)
+                    except OSError as error:
+                        self._error = error
+                        raise
+                    finally:
+                        self._cond.acquire()
+                    self._durable_lsn = batch_lsn
+                finally:
+                    self._flushing = False
+                    self._cond.notify_all()
+
+    def log(self, record: dict) -> int:
+        """
+        Append a record and wait until it is durable.
+
+        :param record: JSON-serializable record without an "lsn" key
+        :return: The record's LSN
+        """
+        lsn = self.append(record)
+        self.wait(lsn)
+        return lsn
+
+    def _write(self, batch: list[bytes]) -> None:
+        """
+        Write a batch of encoded records and sync it according to the mode.
+
+        :param batch: Encoded records in LSN order
+        """
+        if self.sync == SYNC_ALWAYS:
+            for line in batch:
+                self._file.write(line)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            return
+        self._file.write(b"".join(batch))
+        self._file.flush()
+        if self.sync == SYNC_GROUP:
+            os.fsync(self._file.fileno())
+
+    def compact(self, up_to_lsn: int) -> None:
+        """
+        Drop the records that a snapshot already covers.
+
+        Records with a greater LSN are kept. The log is rewritten next to the
+        original and swapped in atomically. The log may end up empty, so open
+        it again with start_lsn set to the snapshot's LSN (Store.recover does).
+
+        :param up_to_lsn: LSN stored in the snapshot that replaces the records
+        :raises OSError: If the log is marked as failed
+        """
+        with self._cond:
+            while self._flushing:
+                self._cond.wait()
+            self.check()
+            self._write(self._pending)
+            self._pending = []
+            self._durable_lsn = self._lsn
+            self._file.close()
+
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "wb") as file:
+                for record in read_log(self.path, after_lsn=up_to_lsn):
+                    file.write(_encode(record))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+            self._file = open(self.path, "ab")
+
+    def close(self) -> None:
+        """Flush buffered records and close the log file; a failed log is closed without writing."""
+        with self._cond:
+            while self._flushing:
+                self._cond.wait()
+            if self._error is not None:
+                self._pending = []
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                return
+            self._write(self._pending)
+            self._pending = []
+            self._durable_lsn = self._lsn
+            self._file.close()